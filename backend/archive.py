@@ -0,0 +1,376 @@
+#!/usr/bin/env python
+"""
+Archive closed months of attendance to Parquet files for HRMS Lite.
+
+Only recent months of attendance are written to; older ones are read rarely and
+never change. This job moves every month that ended more than ARCHIVE_AFTER_MONTHS
+months ago out of the attendance table into one zstd-compressed Parquet file per
+month under ARCHIVE_DIR, so the table and its indexes stay bounded by the retention
+window. The rollups keep counting archived records, so the dashboard and summaries
+over whole months read them as before. Reads of individual records (history, the
+list, exports, the calendar and summaries over partial months) combine the table's
+rows with the files through `attendance_archive`, which memory-maps a file and lets
+pyarrow filter it. Archived months are read-only: writes dated in them are rejected.
+
+ARCHIVE_DIR/manifest.json lists the archived months. Archiving a month first adds it
+to the manifest as "archiving", which closes it to writes, and waits for write
+transactions already under way (writers check the manifest again before committing,
+so later ones see the month closed). Only then does it write the month's file, so
+the file holds exactly the month's rows, and it records the file in the manifest,
+deletes the rows from attendance ARCHIVE_DELETE_BATCH_SIZE at a time (on PostgreSQL
+a month with a partition of its own is detached and dropped instead; see
+partitions.py) and marks the month "archived". Until its file is recorded, reads
+take the month from the table; after that, from the file, skipping the exported rows
+still in the table, so a record is never seen twice or missed. Run this script
+monthly (cron), one run at a time; it finishes months a previous run left
+"archiving". Workers on several hosts need ARCHIVE_DIR on shared storage.
+
+Archived records are a snapshot. They keep the department the employee had when the
+month was archived, and deleting an employee removes their records from the table
+and their monthly rollups but leaves their archived records, which stay in the
+dashboard's daily counts and in list and export results. Needs pyarrow, an optional
+dependency, once anything is archived.
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import Counter
+from datetime import date, timedelta
+
+from sqlalchemy import and_, delete, func, select, text
+
+import partitions
+from database import READ_ONLY, SessionLocal
+from models.employee import Employee
+from models.attendance import Attendance
+
+try:
+    import pyarrow as pa  # Optional dependency: only needed once months are archived
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = pq = None
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "archive"))
+# Months kept in the attendance table besides the current one; 0 disables the job
+ARCHIVE_AFTER_MONTHS = int(os.getenv("ARCHIVE_AFTER_MONTHS", 0))
+ARCHIVE_DELETE_BATCH_SIZE = int(os.getenv("ARCHIVE_DELETE_BATCH_SIZE", 5000))
+# Rows per Parquet row group, and per batch when reading the table or a file
+ARCHIVE_BATCH_ROWS = 100000
+
+MANIFEST = "manifest.json"
+ARCHIVING, ARCHIVED = "archiving", "archived"
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Archived attendance needs pyarrow: pip install pyarrow")
+
+
+def _file_schema():
+    """Columns of an archive file, whose rows are ordered by (date, id)."""
+    return pa.schema([
+        ("id", pa.int64()),
+        ("employee_pk", pa.int32()),
+        ("employee_id", pa.string()),
+        ("department", pa.string()),
+        ("date", pa.date32()),
+        ("status", pa.string()),
+    ])
+
+
+def _month_end(month):
+    return partitions.add_months(month, 1) - timedelta(days=1)
+
+
+class Archive:
+    """The archived months under one directory, read through a per-worker copy of the manifest."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._months = {}
+        self._token = None
+        self._lock = threading.Lock()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def months(self):
+        """
+        Manifest entries by the month's first day. Re-read only when the manifest file
+        was replaced, so a lookup costs one stat().
+        """
+        try:
+            stat = os.stat(self._path(MANIFEST))
+            token = (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            token = None
+        with self._lock:
+            if token != self._token:
+                months = {}
+                if token is not None:
+                    with open(self._path(MANIFEST)) as manifest:
+                        for entry in json.load(manifest)["months"]:
+                            months[date.fromisoformat(f"{entry['month']}-01")] = entry
+                self._months, self._token = months, token
+            return self._months
+
+    def save(self, months):
+        """Replace the manifest with `months` (first day -> entry)."""
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = self._path(f"{MANIFEST}.{uuid.uuid4().hex}")
+        with open(temporary, "w") as manifest:
+            json.dump({"months": [months[month] for month in sorted(months)]}, manifest, indent=2)
+        os.replace(temporary, self._path(MANIFEST))
+
+    def is_archived(self, day):
+        return day.replace(day=1) in self.months()
+
+    def covering(self, start_date=None, end_date=None):
+        """
+        (first day, entry) of the archived months overlapping the date range that have
+        their file, oldest first. Months closed but not yet written are read from the table.
+        """
+        return [
+            (month, entry) for month, entry in sorted(self.months().items())
+            if "file" in entry
+            and (end_date is None or month <= end_date) and (start_date is None or _month_end(month) >= start_date)
+        ]
+
+    def hot_filters(self, start_date=None, end_date=None):
+        """
+        Conditions excluding rows of months still being archived that are already in
+        their file; add them to every read that also reads the archive.
+        """
+        return [
+            ~and_(Attendance.date >= month, Attendance.date <= _month_end(month), Attendance.id <= entry["max_id"])
+            for month, entry in self.covering(start_date, end_date) if entry["state"] == ARCHIVING
+        ]
+
+    def _tables(self, columns, start_date, end_date, after, equals):
+        """One pyarrow Table per archived month overlapping the range, filtered and in file order."""
+        months = self.covering(start_date, end_date)
+        if not months:
+            return
+        _require_pyarrow()
+        conditions = []
+        if start_date:
+            conditions.append(pc.field("date") >= start_date)
+        if end_date:
+            conditions.append(pc.field("date") <= end_date)
+        if after:
+            last_date, last_id = after
+            conditions.append(
+                (pc.field("date") > last_date) | ((pc.field("date") == last_date) & (pc.field("id") > last_id))
+            )
+        for column, value in equals.items():
+            if value is None:
+                continue
+            if isinstance(value, (set, frozenset, list, tuple)):
+                conditions.append(pc.field(column).isin(list(value)))
+            else:
+                conditions.append(pc.field(column) == value)
+        condition = None
+        for term in conditions:
+            condition = term if condition is None else condition & term
+        for _, entry in months:
+            yield pq.read_table(
+                self._path(entry["file"]), columns=list(columns), filters=condition, memory_map=True
+            )
+
+    def batches(self, columns, start_date=None, end_date=None, after=None, **equals):
+        """Archived records as pyarrow RecordBatches of `columns`; arguments and order as for `rows()`."""
+        for table in self._tables(columns, start_date, end_date, after, equals):
+            yield from table.to_batches(max_chunksize=ARCHIVE_BATCH_ROWS)
+
+    def rows(self, columns, start_date=None, end_date=None, after=None, **equals):
+        """
+        Archived records in the date range as tuples of `columns`, ordered by (date, id),
+        like the list endpoint. `after` is a (date, id) cursor; keyword arguments keep
+        records whose column equals a value, or is in a set of values.
+        """
+        for batch in self.batches(columns, start_date, end_date, after, **equals):
+            yield from zip(*(batch.column(name).to_pylist() for name in columns))
+
+    def counts(self, keys, start_date=None, end_date=None, **equals):
+        """Archived records in the date range counted by the `keys` columns, as a Counter of key tuples."""
+        counts = Counter()
+        for table in self._tables(keys, start_date, end_date, None, equals):
+            if table.num_rows:
+                for row in table.group_by(list(keys)).aggregate([([], "count_all")]).to_pylist():
+                    counts[tuple(row[key] for key in keys)] += row["count_all"]
+        return counts
+
+    def count(self, start_date=None, end_date=None, **equals):
+        """Number of archived records in the date range; whole unfiltered months come from the manifest."""
+        total = 0
+        for month, entry in self.covering(start_date, end_date):
+            whole_month = (start_date is None or start_date <= month) and (
+                end_date is None or end_date >= _month_end(month)
+            )
+            if whole_month and not any(value is not None for value in equals.values()):
+                total += entry["rows"]
+            else:
+                first, last = max(month, start_date or month), min(_month_end(month), end_date or _month_end(month))
+                total += sum(table.num_rows for table in self._tables(("id",), first, last, None, equals))
+        return total
+
+
+attendance_archive = Archive(ARCHIVE_DIR)
+
+
+def retention_start(today=None, after_months=ARCHIVE_AFTER_MONTHS):
+    """First day of the oldest month kept in the attendance table; None when archiving is disabled."""
+    if after_months <= 0:
+        return None
+    return partitions.add_months((today or date.today()).replace(day=1), -after_months)
+
+
+def pending_months(session_factory, before, archive=attendance_archive):
+    """First days of the months before `before` that still need archiving, oldest first."""
+    months = archive.months()
+    pending = {month for month, entry in months.items() if entry["state"] == ARCHIVING}
+    db = session_factory()
+    try:
+        oldest = db.query(func.min(Attendance.date)).filter(Attendance.date < before).scalar()
+        month = oldest.replace(day=1) if oldest else before
+        while month < before:
+            if month not in months and db.query(Attendance.id).filter(
+                Attendance.date >= month, Attendance.date <= _month_end(month)
+            ).first() is not None:
+                pending.add(month)
+            month = partitions.add_months(month, 1)
+    finally:
+        db.close()
+    return sorted(pending)
+
+
+def _wait_for_writers(db):
+    """
+    Wait for the write transactions on attendance under way when a month was closed,
+    so a snapshot taken afterwards sees what they commit.
+    """
+    if db.connection().dialect.name == "postgresql":
+        # Conflicts with the lock every INSERT, UPDATE and DELETE holds until it commits
+        db.execute(text("LOCK TABLE attendance IN SHARE MODE"))
+    # On SQLite the session's BEGIN IMMEDIATE already waited for the current writer
+    db.commit()
+
+
+def _write_file(db, archive, month):
+    """Write `month`'s attendance to its Parquet file; returns the manifest entry."""
+    schema = _file_schema()
+    name = f"attendance-{month:%Y-%m}.parquet"
+    temporary = archive._path(f"{name}.{uuid.uuid4().hex}")
+    records = db.execute(
+        select(
+            Attendance.id, Attendance.employee_pk, Employee.employee_id, Employee.department,
+            Attendance.date, Attendance.status
+        ).join(Employee, Employee.id == Attendance.employee_pk).where(
+            Attendance.date >= month, Attendance.date <= _month_end(month)
+        ).order_by(Attendance.date, Attendance.id).execution_options(yield_per=ARCHIVE_BATCH_ROWS)
+    )
+    rows = max_id = 0
+    os.makedirs(archive.directory, exist_ok=True)
+    try:
+        with pq.ParquetWriter(temporary, schema, compression="zstd") as writer:
+            for batch in records.partitions():
+                columns = list(zip(*batch))
+                writer.write_table(pa.Table.from_arrays(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+                ))
+                rows += len(batch)
+                max_id = max(max_id, *columns[0])
+        os.replace(temporary, archive._path(name))
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return {"month": f"{month:%Y-%m}", "file": name, "rows": rows, "max_id": max_id, "state": ARCHIVING}
+
+
+def _delete_archived_rows(db, month, max_id, batch_size):
+    """
+    Delete `month`'s rows up to `max_id` from attendance, committing per batch. The
+    month was closed before its file was written, so these are the rows in the file.
+    """
+    if partitions.drop_month(db.connection(), month, max_id):
+        db.commit()
+        return
+    db.rollback()
+    in_month = (Attendance.date >= month, Attendance.date <= _month_end(month))
+    while True:
+        batch = select(Attendance.id).where(*in_month, Attendance.id <= max_id).limit(batch_size)
+        deleted = db.execute(delete(Attendance).where(Attendance.id.in_(batch), *in_month)).rowcount
+        db.commit()
+        if deleted < batch_size:
+            break
+
+
+def archive_month(session_factory, month, batch_size=ARCHIVE_DELETE_BATCH_SIZE, archive=attendance_archive):
+    """
+    Move one month of attendance from the table to its archive file. The rollups are
+    left alone: they keep counting the archived records. Returns the number of records
+    archived; resumes a month a previous run left "archiving".
+    """
+    _require_pyarrow()
+    db = session_factory()
+    try:
+        entry = archive.months().get(month)
+        if entry is None:
+            # Writes dated in the month are rejected from here on
+            entry = {"month": f"{month:%Y-%m}", "state": ARCHIVING}
+            archive.save({**archive.months(), month: entry})
+        if "file" not in entry:
+            _wait_for_writers(db)
+            # A read-only transaction, so writers to other months don't wait for the snapshot
+            db.connection(execution_options=READ_ONLY)
+            entry = _write_file(db, archive, month)
+            db.rollback()
+            archive.save({**archive.months(), month: entry})
+        if entry["state"] == ARCHIVING:
+            _delete_archived_rows(db, month, entry["max_id"], batch_size)
+            archive.save({**archive.months(), month: {**entry, "state": ARCHIVED}})
+        logger.info(f"Archived {entry['rows']} attendance record(s) of {entry['month']}")
+        return entry["rows"]
+    except Exception:
+        db.rollback()
+        logger.exception(f"Archiving {month:%Y-%m} failed; run archive.py to resume")
+        raise
+    finally:
+        db.close()
+
+
+def _month(value):
+    return date.fromisoformat(f"{value}-01")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive closed months of attendance to Parquet files")
+    parser.add_argument(
+        "--before", type=_month, default=None,
+        help="Archive the months before this one (YYYY-MM); defaults to ARCHIVE_AFTER_MONTHS months ago"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=ARCHIVE_DELETE_BATCH_SIZE, help="Attendance rows deleted per transaction"
+    )
+    args = parser.parse_args()
+
+    before = args.before or retention_start()
+    if before is None:
+        print("Archiving is disabled: set ARCHIVE_AFTER_MONTHS or pass --before")
+        return
+    months = pending_months(SessionLocal, before)
+    for month in months:
+        records = archive_month(SessionLocal, month, args.batch_size)
+        print(f"Archived {month:%Y-%m}: {records} attendance record(s)")
+    print(f"Archive complete: {len(months)} month(s) before {before:%Y-%m}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+In-process API benchmark suite. Drives every router (employees, attendance, dashboard)
+through an ASGI client at a configurable concurrency and reports, per scenario,
+req/s, p50/p95/p99 latency and SQL statements per request (read from the
+Server-Timing header) as JSON.
+
+Seeds a fresh temporary SQLite database unless --database-url points at one that
+benchmarks.seed already filled; write scenarios only touch employees created for
+the run, so a seeded database can be reused. With --baseline, the run is compared
+with an earlier JSON report and the script exits 1 on a regression.
+
+    python -m benchmarks.api_suite --employees 2000 --days 90 --concurrency 32 --output bench.json
+    python -m benchmarks.api_suite --database-url sqlite:///./bench.db --baseline bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import httpx
+
+WRITER_EMPLOYEES = 1000
+SEED_START = date(2025, 1, 1)
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def build_scenarios(employees, days, departments, prefix):
+    """Scenario name -> function(i, rng) returning (method, url, request kwargs)."""
+    def seeded_employee(rng):
+        return f"EMP{rng.randrange(employees):07d}"
+
+    def seeded_range(rng, length):
+        first = SEED_START + timedelta(days=rng.randrange(max(days - length, 1)))
+        return first, first + timedelta(days=length - 1)
+
+    def writer(i):
+        return f"{prefix}{i % WRITER_EMPLOYEES:05d}"
+
+    def employee_payload(employee_id):
+        return {"employee_id": employee_id, "full_name": f"Bench {employee_id}",
+                "email": f"{employee_id.lower()}@bench.example.com", "department": "Benchmark"}
+
+    def import_body(i):
+        lines = (json.dumps(employee_payload(f"{prefix}I{i:06d}{row:02d}")) for row in range(50))
+        return "\n".join(lines).encode()
+
+    def week_query(rng):
+        first, last = seeded_range(rng, 7)
+        return f"start_date={first}&end_date={last}"
+
+    return {
+        "employees.list": lambda i, rng: ("GET", "/api/employees/?limit=100&include_total=false", {}),
+        "employees.list_by_department": lambda i, rng: (
+            "GET", f"/api/employees/?department=Department {rng.randrange(departments)}&limit=100", {}),
+        "employees.get": lambda i, rng: ("GET", f"/api/employees/{seeded_employee(rng)}", {}),
+        "employees.create": lambda i, rng: ("POST", "/api/employees/", {"json": employee_payload(f"{prefix}N{i:06d}")}),
+        "employees.import": lambda i, rng: (
+            "POST", "/api/employees/import?format=ndjson", {"content": import_body(i)}),
+        "attendance.mark": lambda i, rng: ("POST", "/api/attendance/", {"json": {
+            "employee_id": writer(i), "status": "Present",
+            "date": str(date(2000, 1, 1) + timedelta(days=i // WRITER_EMPLOYEES))}}),
+        "attendance.bulk": lambda i, rng: ("POST", "/api/attendance/bulk", {"json": {"records": [
+            {"employee_id": writer(i), "status": "Absent",
+             "date": str(date(2010, 1, 1) + timedelta(days=(i // WRITER_EMPLOYEES) * 50 + day))}
+            for day in range(50)]}}),
+        "attendance.employee_history": lambda i, rng: (
+            "GET", f"/api/attendance/employee/{seeded_employee(rng)}?{week_query(rng)}", {}),
+        "attendance.summary": lambda i, rng: ("GET", f"/api/attendance/employee/{seeded_employee(rng)}/summary", {}),
+        "attendance.summary_batch": lambda i, rng: ("POST", "/api/attendance/summary/batch", {"json": {
+            "employee_ids": [seeded_employee(rng) for _ in range(100)]}}),
+        "attendance.list": lambda i, rng: (
+            "GET", f"/api/attendance/?{week_query(rng)}&status=Absent&limit=100", {}),
+        "attendance.export": lambda i, rng: ("GET", f"/api/attendance/export?{week_query(rng)}", {}),
+        "dashboard.summary": lambda i, rng: ("GET", f"/api/dashboard/summary?{week_query(rng)}", {}),
+    }
+
+
+async def run_scenario(client, scenario, requests, concurrency, warmup, random_seed):
+    rng = random.Random(random_seed)
+    for i in range(warmup):
+        method, url, kwargs = scenario(requests + i, rng)
+        await client.request(method, url, **kwargs)
+
+    latencies, queries, failures = [], [], []
+    next_index = iter(range(requests))
+
+    async def worker():
+        for i in next_index:
+            method, url, kwargs = scenario(i, rng)
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append((time.perf_counter() - started) * 1000)
+            match = SERVER_TIMING_QUERIES.search(response.headers.get("server-timing", ""))
+            if match:
+                queries.append(int(match.group(1)))
+            if response.status_code >= 400:
+                failures.append(f"{response.status_code} {url}: {response.text[:200]}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "errors": len(failures),
+        "first_error": failures[0] if failures else None,
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(quantiles[49], 2),
+        "p95_ms": round(quantiles[94], 2),
+        "p99_ms": round(quantiles[98], 2),
+        # Streaming responses report the statements issued before their headers
+        "queries_per_request": round(statistics.mean(queries), 2) if queries else None,
+        "max_queries_per_request": max(queries) if queries else None,
+    }
+
+
+def find_regressions(results, baseline, max_regression):
+    """Scenarios whose p95, throughput or statements per request got worse than `baseline` allows."""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} -> {current['p95_ms']} ms")
+        if current["requests_per_sec"] < previous["requests_per_sec"] * (1 - max_regression):
+            regressions.append(f"{name}: {previous['requests_per_sec']} -> {current['requests_per_sec']} req/s")
+        if (current["queries_per_request"] or 0) > (previous["queries_per_request"] or 0) + 0.5:
+            regressions.append(
+                f"{name}: {previous['queries_per_request']} -> {current['queries_per_request']} queries/request")
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{name}: {previous['errors']} -> {current['errors']} errors")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=2000, help="Employees to seed (ignored with --database-url)")
+    parser.add_argument("--days", type=int, default=90, help="Attendance days to seed (ignored with --database-url)")
+    parser.add_argument("--departments", type=int, default=10)
+    parser.add_argument("--database-url", default=None, help="A database already seeded by benchmarks.seed")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=300, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--scenarios", default=None, help="Comma-separated scenario names (default: all)")
+    parser.add_argument("--cache-backend", default="none", help="CACHE_BACKEND for the app (default: none)")
+    parser.add_argument("--db-async", action="store_true", help="Run the app with DB_ASYNC=true")
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Also write the JSON report to this file")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed fractional slowdown")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='hrms-bench-'), 'bench.db')}"
+    # database.py and cache.py read their configuration at import time, so the app
+    # (and anything importing it) is imported only after the environment is set
+    os.environ.update({
+        "DATABASE_URL": database_url,
+        "CACHE_BACKEND": args.cache_backend,
+        "DB_ASYNC": "true" if args.db_async else "false",
+        "SERVER_TIMING_ENABLED": "true",
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+    })
+    from sqlalchemy import create_engine, func, select
+    from benchmarks.common import bulk_load, make_session_factory, seed, report, Rows
+    from models.employee import Employee
+    from models.attendance import Attendance
+
+    if args.database_url is None:
+        engine, _ = make_session_factory(database_url)
+        seed(engine, args.employees, args.days, args.departments, random_seed=args.random_seed)
+    else:
+        engine = create_engine(database_url)
+    with engine.connect() as connection:
+        employees = connection.execute(
+            select(func.count()).select_from(Employee).where(Employee.employee_id.like("EMP%"))
+        ).scalar()
+        first, last = connection.execute(select(func.min(Attendance.date), func.max(Attendance.date))).one()
+    days = (date.fromisoformat(str(last)) - date.fromisoformat(str(first))).days + 1 if first else 1
+
+    # Employees owned by this run, so write scenarios never collide with earlier runs
+    prefix = f"R{int(time.time() * 1000) % 36 ** 6:x}-"
+    bulk_load(engine, "employees", Rows(
+        ("employee_id", "full_name", "email", "department"),
+        lambda: ((f"{prefix}{k:05d}", f"Writer {k}", f"{prefix}{k:05d}@bench.example.com".lower(), "Benchmark")
+                 for k in range(WRITER_EMPLOYEES))
+    ))
+    dialect = engine.dialect.name
+    engine.dispose()
+
+    from main import app
+    scenarios = build_scenarios(employees, days, args.departments, prefix)
+    selected = args.scenarios.split(",") if args.scenarios else list(scenarios)
+    unknown = set(selected) - set(scenarios)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    async def run_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            return {
+                name: await run_scenario(client, scenarios[name], args.requests, args.concurrency,
+                                         args.warmup, args.random_seed)
+                for name in selected
+            }
+
+    results = {
+        "config": {
+            "employees": employees, "days": days, "concurrency": args.concurrency, "requests": args.requests,
+            "cache_backend": args.cache_backend, "db_async": args.db_async,
+            "database": dialect,
+        },
+        "scenarios": asyncio.run(run_all()),
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = find_regressions(results, json.load(baseline_file), args.max_regression)
+        results["regressions"] = regressions
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+    report(results)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
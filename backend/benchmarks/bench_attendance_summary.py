@@ -0,0 +1,68 @@
+"""
+Attendance summary benchmark for a manager screen: the previous four queries per
+employee (N x 4) versus one batch request covering all N employees.
+
+    python -m benchmarks.bench_attendance_summary --reports 200 --days 250
+"""
+import argparse
+
+from models.employee import Employee
+from models.attendance import Attendance
+from routes.attendance import _get_attendance_summaries
+from schemas.attendance import AttendanceSummaryBatchRequest
+from benchmarks.common import make_session_factory, seed, measure, report
+
+
+def legacy_summary(db, employee_id):
+    """The original implementation: existence check plus three count queries."""
+    employee = db.query(Employee).filter(Employee.employee_id == employee_id).first()
+    total = db.query(Attendance).filter(Attendance.employee_pk == employee.id).count()
+    present = db.query(Attendance).filter(
+        (Attendance.employee_pk == employee.id) & (Attendance.status == "Present")
+    ).count()
+    absent = db.query(Attendance).filter(
+        (Attendance.employee_pk == employee.id) & (Attendance.status == "Absent")
+    ).count()
+    return total, present, absent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=2000, help="Employees in the database")
+    parser.add_argument("--reports", type=int, default=200, help="Employees on the manager screen")
+    parser.add_argument("--days", type=int, default=250)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    engine, Session = make_session_factory(args.database_url)
+    seed(engine, args.employees, args.days)
+    employee_ids = [f"EMP{index:07d}" for index in range(args.reports)]
+
+    db = Session()
+    try:
+        report({
+            "attendance_rows": args.employees * args.days,
+            "reports": args.reports,
+            "legacy_n_times_4": measure(
+                engine, lambda: [legacy_summary(db, employee_id) for employee_id in employee_ids], args.repeat
+            ),
+            "batch": measure(
+                engine,
+                lambda: _get_attendance_summaries(db, AttendanceSummaryBatchRequest(employee_ids=employee_ids)),
+                args.repeat
+            ),
+            "batch_partial_month_range": measure(
+                engine,
+                lambda: _get_attendance_summaries(db, AttendanceSummaryBatchRequest(
+                    employee_ids=employee_ids, start_date="2025-03-10", end_date="2025-04-20"
+                )),
+                args.repeat
+            ),
+        })
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Dashboard summary benchmark: the previous five-query implementation versus the
+conditional-aggregation query, over all history and over a one-week range.
+
+    python -m benchmarks.bench_dashboard --employees 2000 --days 500   # 1M attendance rows
+"""
+import argparse
+from datetime import date, timedelta
+
+from models.employee import Employee
+from models.attendance import Attendance
+from routes.dashboard import _get_dashboard_summary
+from benchmarks.common import make_session_factory, seed, measure, report
+
+
+def legacy_dashboard_summary(db):
+    """The original implementation: five separate queries, three full scans of attendance."""
+    from sqlalchemy import func
+    total_employees = db.query(Employee).count()
+    total_attendance = db.query(Attendance).count()
+    present = db.query(Attendance).filter(Attendance.status == "Present").count()
+    absent = db.query(Attendance).filter(Attendance.status == "Absent").count()
+    dept_counts = db.query(Employee.department, func.count(Employee.id)).group_by(Employee.department).all()
+    return total_employees, total_attendance, present, absent, dict(dept_counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=500)
+    parser.add_argument("--departments", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    engine, Session = make_session_factory(args.database_url)
+    start = date(2025, 1, 1)
+    seed(engine, args.employees, args.days, args.departments, start=start)
+    last_day = start + timedelta(days=args.days - 1)
+
+    # Call the query function directly so cache hits don't skew the numbers
+    def current(start_date=None, end_date=None):
+        return _get_dashboard_summary(db, start_date, end_date)
+
+    db = Session()
+    try:
+        report({
+            "attendance_rows": args.employees * args.days,
+            "legacy_all_history": measure(engine, lambda: legacy_dashboard_summary(db), args.repeat),
+            "all_history": measure(engine, current, args.repeat),
+            "last_week": measure(engine, lambda: current(last_day - timedelta(days=6), last_day), args.repeat),
+        })
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
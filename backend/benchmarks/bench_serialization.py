@@ -0,0 +1,106 @@
+"""
+List serialization benchmark: ORM objects validated and serialized through the
+route's response_model (FastAPI's default path) versus column tuples encoded straight
+to JSON bytes by FastJSONResponse. Reports per-row CPU cost for fetching and for
+serializing; --profile prints the top functions of each path.
+
+    python -m benchmarks.bench_serialization --employees 1000 --days 100   # 100k rows
+"""
+import argparse
+import asyncio
+import cProfile
+import io
+import pstats
+import time
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from models.attendance import Attendance
+from routes.attendance import EXPORT_COLUMNS
+from schemas.attendance import AttendanceList
+from serialization import FastJSONResponse, orjson, rows_to_dicts
+from benchmarks.common import make_session_factory, seed, report
+
+RESPONSE_FIELD = create_model_field(name="Response_list", type_=AttendanceList, mode="serialization")
+
+
+def legacy_path(db):
+    """ORM rows -> response_model validation (from_attributes) -> JSON-mode dump -> json.dumps."""
+    started = time.perf_counter()
+    records = db.query(Attendance).all()
+    fetched = time.perf_counter()
+    content = asyncio.run(serialize_response(
+        field=RESPONSE_FIELD, response_content={"records": records, "total": len(records)}
+    ))
+    body = JSONResponse(content).body
+    return fetched - started, time.perf_counter() - fetched, body
+
+
+def fast_path(db):
+    """Column tuples -> dicts -> FastJSONResponse (orjson or pydantic-core)."""
+    started = time.perf_counter()
+    rows = db.query(*EXPORT_COLUMNS).all()
+    fetched = time.perf_counter()
+    records = rows_to_dicts(rows, [column.key for column in EXPORT_COLUMNS])
+    body = FastJSONResponse({"records": records, "total": len(rows), "next_cursor": None}).body
+    return fetched - started, time.perf_counter() - fetched, body
+
+
+def measure_path(session_factory, path, rows, repeat, profile):
+    fetch_times, serialize_times = [], []
+    profiler = cProfile.Profile() if profile else None
+    for _ in range(repeat):
+        db = session_factory()
+        try:
+            if profiler:
+                profiler.enable()
+            fetch_seconds, serialize_seconds, body = path(db)
+            if profiler:
+                profiler.disable()
+        finally:
+            db.close()
+        fetch_times.append(fetch_seconds)
+        serialize_times.append(serialize_seconds)
+
+    if profiler:
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats("tottime").print_stats(12)
+        print(f"--- {path.__name__} ---\n{output.getvalue()}")
+
+    fetch, serialize = min(fetch_times), min(serialize_times)
+    return {
+        "fetch_us_per_row": round(fetch / rows * 1e6, 3),
+        "serialize_us_per_row": round(serialize / rows * 1e6, 3),
+        "total_ms": round((fetch + serialize) * 1000, 1),
+        "body_bytes": len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--profile", action="store_true", help="Print cProfile output for each path")
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    engine, session_factory = make_session_factory(args.database_url)
+    seed(engine, args.employees, args.days)
+    rows = args.employees * args.days
+
+    legacy = measure_path(session_factory, legacy_path, rows, args.repeat, args.profile)
+    fast = measure_path(session_factory, fast_path, rows, args.repeat, args.profile)
+    report({
+        "rows": rows,
+        "encoder": "orjson" if orjson is not None else "pydantic-core",
+        "response_model": legacy,
+        "fast_json": fast,
+        "speedup": round(legacy["total_ms"] / fast["total_ms"], 1),
+    })
+
+
+if __name__ == "__main__":
+    main()
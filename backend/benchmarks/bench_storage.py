@@ -0,0 +1,159 @@
+"""
+Attendance storage benchmark: the previous row layout (employee_id string key and
+status string) versus the compact one (employees.id key and SMALLINT status).
+Builds the previous schema with the migrations up to 0004, loads synthetic data,
+measures table and index sizes and scan times, applies revision 0005 in place
+(timed) and measures again. The database at --database-url is wiped first.
+
+    python -m benchmarks.bench_storage --employees 2000 --days 500   # 1M attendance rows
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, text
+
+import migrate
+from database import Base
+from benchmarks.common import attendance_rows, bulk_load, load_employees, measure, report, Rows
+
+START = date(2025, 1, 1)
+# Equivalent queries for each layout; the compact one joins employees for the employee_id
+QUERIES = {
+    "legacy": {
+        "status_totals": "SELECT status, count(*) FROM attendance GROUP BY status",
+        "employee_month": """
+            SELECT id, employee_id, date, status FROM attendance
+            WHERE employee_id = :employee_id AND date BETWEEN :start AND :end
+        """,
+        "department_month": """
+            SELECT attendance.status, count(*) FROM attendance
+            JOIN employees ON employees.employee_id = attendance.employee_id
+            WHERE employees.department = :department AND attendance.date BETWEEN :start AND :end
+            GROUP BY attendance.status
+        """,
+    },
+    "compact": {
+        "status_totals": "SELECT status, count(*) FROM attendance GROUP BY status",
+        "employee_month": """
+            SELECT attendance.id, employees.employee_id, attendance.date, attendance.status FROM attendance
+            JOIN employees ON employees.id = attendance.employee_pk
+            WHERE employees.employee_id = :employee_id AND attendance.date BETWEEN :start AND :end
+        """,
+        "department_month": """
+            SELECT attendance.status, count(*) FROM attendance
+            JOIN employees ON employees.id = attendance.employee_pk
+            WHERE employees.department = :department AND attendance.date BETWEEN :start AND :end
+            GROUP BY attendance.status
+        """,
+    },
+}
+
+
+def reset(engine):
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE IF EXISTS alembic_version")
+
+
+def compact_storage(engine):
+    """Rewrite the attendance table and refresh planner statistics."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        if engine.dialect.name == "postgresql":
+            # Dropped columns stay in the heap until rows are rewritten (pg_repack does this online)
+            connection.exec_driver_sql("VACUUM FULL ANALYZE attendance")
+        else:
+            connection.exec_driver_sql("VACUUM")
+            connection.exec_driver_sql("ANALYZE")
+
+
+def sizes(engine):
+    """Bytes used by the attendance table and by each of its indexes."""
+    with engine.connect() as connection:
+        if engine.dialect.name == "postgresql":
+            table_bytes = connection.exec_driver_sql("SELECT pg_table_size('attendance')").scalar()
+            indexes = dict(connection.exec_driver_sql("""
+                SELECT indexrelname, pg_relation_size(indexrelid) FROM pg_stat_user_indexes
+                WHERE relname = 'attendance'
+            """).all())
+        else:
+            pages = dict(connection.exec_driver_sql("SELECT name, sum(pgsize) FROM dbstat GROUP BY name").all())
+            index_names = connection.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'attendance'"
+            ).scalars().all()
+            table_bytes = pages["attendance"]
+            indexes = {name: pages[name] for name in index_names}
+    return {
+        "table_mb": round(table_bytes / 2 ** 20, 2),
+        "indexes_mb": round(sum(indexes.values()) / 2 ** 20, 2),
+        "per_index_mb": {name: round(size / 2 ** 20, 2) for name, size in sorted(indexes.items())},
+    }
+
+
+def scans(engine, layout, args):
+    rng = random.Random(args.random_seed)
+    month = {"start": START.isoformat(), "end": (START + timedelta(days=30)).isoformat()}
+    queries = {name: text(sql) for name, sql in QUERIES[layout].items()}
+    with engine.connect() as connection:
+        def run(name, params):
+            return lambda: connection.execute(queries[name], params).all()
+
+        return {
+            "status_totals_full_scan": measure(engine, run("status_totals", {}), args.repeat),
+            "employee_month_x100": measure(engine, lambda: [
+                run("employee_month", {"employee_id": f"EMP{rng.randrange(args.employees):07d}", **month})()
+                for _ in range(100)
+            ], args.repeat),
+            "department_month": measure(engine, run("department_month", {"department": "Department 0", **month}),
+                                        args.repeat),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=500)
+    parser.add_argument("--departments", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='hrms-bench-'), 'bench.db')}"
+    engine = create_engine(url)
+    reset(engine)
+    migrate.run_migrations(url, "0004")
+    load_employees(engine, args.employees, args.departments)
+    bulk_load(engine, "attendance", Rows(
+        ("employee_id", "date", "status"),
+        lambda: (
+            (f"EMP{index:07d}", day, status)
+            for index, day, status in attendance_rows(args.employees, args.days, START, 0.1, args.random_seed)
+        )
+    ))
+    compact_storage(engine)
+    legacy = {**sizes(engine), **scans(engine, "legacy", args)}
+
+    started = time.perf_counter()
+    migrate.run_migrations(url, "0005")
+    migration_seconds = round(time.perf_counter() - started, 1)
+    migrated = sizes(engine)
+    compact_storage(engine)
+    compact = {**sizes(engine), **scans(engine, "compact", args)}
+
+    report({
+        "database": engine.dialect.name,
+        "attendance_rows": args.employees * args.days,
+        "legacy": legacy,
+        "migration_seconds": migration_seconds,
+        "compact_before_rewrite": {key: migrated[key] for key in ("table_mb", "indexes_mb")},
+        "compact": compact,
+    })
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
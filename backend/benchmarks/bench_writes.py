@@ -0,0 +1,139 @@
+"""
+Concurrent write benchmark for SQLite: the previous engine settings (rollback journal,
+pysqlite defaults) versus the tuned engine from database.py (WAL, busy_timeout,
+synchronous=NORMAL, BEGIN IMMEDIATE). Several processes stand in for gunicorn workers;
+each runs writer threads marking attendance through the route code and reader threads
+polling the dashboard summary on read-only sessions, as the read routes do. Fails if
+the tuned engine reports any "database is locked" error.
+
+    python -m benchmarks.bench_writes --processes 4 --threads 8 --writes 200
+"""
+import argparse
+import multiprocessing
+import statistics
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+import database
+from routes.attendance import _mark_attendance
+from routes.dashboard import _get_dashboard_summary
+from schemas.attendance import AttendanceCreate
+from benchmarks.common import make_session_factory, seed, report
+
+
+def build_engine(url, tuned):
+    if tuned:
+        return database.configure_engine(create_engine(url, **database.engine_options(url)))
+    return create_engine(url, connect_args={"check_same_thread": False})
+
+
+def run_worker(url, tuned, worker, threads, writes, employees, results):
+    engine = build_engine(url, tuned)
+    Session = sessionmaker(autoflush=False, bind=engine)
+    ReadSession = sessionmaker(autoflush=False, bind=engine.execution_options(**database.READ_ONLY))
+    latencies, errors, reads = [], [], [0]
+    stop = threading.Event()
+
+    def writer(thread):
+        for index in range(writes):
+            # Every (employee, date) pair is unique across all writers
+            slot = (worker * threads + thread) * writes + index
+            record = AttendanceCreate(
+                employee_id=f"EMP{slot % employees:07d}",
+                date=date(2030, 1, 1) + timedelta(days=slot // employees),
+                status="Present"
+            )
+            started = time.perf_counter()
+            db = Session()
+            try:
+                _mark_attendance(db, record)
+                latencies.append(time.perf_counter() - started)
+            except OperationalError as error:
+                errors.append(str(error.orig))
+            finally:
+                db.close()
+
+    def reader():
+        while not stop.is_set():
+            db = ReadSession()
+            try:
+                _get_dashboard_summary(db, None, None)
+                reads[0] += 1
+            except OperationalError as error:
+                errors.append(str(error.orig))
+            finally:
+                db.close()
+
+    writers = [threading.Thread(target=writer, args=(thread,)) for thread in range(threads)]
+    readers = [threading.Thread(target=reader) for _ in range(2)]
+    for thread in writers + readers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+    engine.dispose()
+    results.put({"latencies": latencies, "errors": errors, "reads": reads[0]})
+
+
+def run_mode(tuned, args):
+    engine, _ = make_session_factory()
+    seed(engine, args.employees, args.days)
+    url = engine.url.render_as_string(hide_password=False)
+    engine.dispose()
+
+    results = multiprocessing.Queue()
+    started = time.perf_counter()
+    processes = [
+        multiprocessing.Process(
+            target=run_worker, args=(url, tuned, worker, args.threads, args.writes, args.employees, results)
+        )
+        for worker in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency * 1000 for outcome in outcomes for latency in outcome["latencies"])
+    errors = [error for outcome in outcomes for error in outcome["errors"]]
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    return {
+        "writes_ok": len(latencies),
+        "writes_per_sec": round(len(latencies) / elapsed, 1),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "dashboard_reads": sum(outcome["reads"] for outcome in outcomes),
+        "p50_ms": round(quantiles[49], 2),
+        "p99_ms": round(quantiles[98], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=4, help="Simulated gunicorn workers")
+    parser.add_argument("--threads", type=int, default=8, help="Writer threads per process")
+    parser.add_argument("--writes", type=int, default=100, help="Writes per thread")
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=60)
+    args = parser.parse_args()
+
+    results = {
+        "writers": args.processes * args.threads,
+        "legacy": run_mode(False, args),
+        "tuned": run_mode(True, args),
+    }
+    report(results)
+    assert results["tuned"]["errors"] == 0, f"Tuned engine: {results['tuned']['first_error']}"
+
+
+if __name__ == "__main__":
+    main()
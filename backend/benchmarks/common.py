@@ -0,0 +1,168 @@
+"""
+Shared helpers for the benchmark scripts: a scratch database, fast reproducible
+synthetic seeding, SQL statement counting and latency measurement.
+"""
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+import models  # noqa: F401  (registers tables on Base.metadata)
+from database import Base
+from models.attendance import Attendance, STATUS_CODES
+from bulk import chunked
+import rollups
+
+SEED_CHUNK_SIZE = 10000
+SEED_PROGRESS_ROWS = 1_000_000
+
+
+def make_session_factory(database_url=None):
+    """Create a fresh schema on `database_url` (default: a temporary SQLite file)."""
+    if database_url is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="hrms-bench-"), "bench.db")
+        database_url = f"sqlite:///{path}"
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def bulk_load(engine, table, rows):
+    """
+    Load tuples of (column values as strings) into `table` as fast as the driver allows:
+    COPY on PostgreSQL, executemany on the raw sqlite3 connection otherwise.
+    Bypasses the ORM and Core entirely; returns the number of rows loaded.
+    """
+    columns = rows.columns
+    raw = engine.raw_connection()
+    loaded = 0
+    try:
+        cursor = raw.cursor()
+        if engine.dialect.name == "postgresql":
+            statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+            load_chunk = lambda chunk: cursor.copy_expert(  # noqa: E731
+                statement, io.StringIO("".join("\t".join(row) + "\n" for row in chunk))
+            )
+        elif engine.dialect.name == "sqlite":
+            cursor.execute("PRAGMA synchronous=OFF")  # scratch data; durability doesn't matter
+            statement = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+            load_chunk = lambda chunk: cursor.executemany(statement, chunk)  # noqa: E731
+        else:
+            raise NotImplementedError(f"Bulk loading is not supported on '{engine.dialect.name}'")
+
+        for chunk in chunked(rows, SEED_CHUNK_SIZE):
+            load_chunk(chunk)
+            loaded += len(chunk)
+            if loaded % SEED_PROGRESS_ROWS == 0:
+                print(f"  {table}: {loaded:,} rows", file=sys.stderr)
+        raw.commit()
+    finally:
+        raw.close()
+    return loaded
+
+
+class Rows:
+    """An iterable of row tuples that also carries its column names."""
+
+    def __init__(self, columns, generate):
+        self.columns = columns
+        self._generate = generate
+
+    def __iter__(self):
+        return self._generate()
+
+
+def load_employees(engine, employees, departments):
+    bulk_load(engine, "employees", Rows(
+        ("employee_id", "full_name", "email", "department"),
+        lambda: (
+            (f"EMP{index:07d}", f"Employee {index}", f"emp{index}@example.com", f"Department {index % departments}")
+            for index in range(employees)
+        )
+    ))
+
+
+def attendance_rows(employees, days, start, absent_rate, random_seed):
+    """(employee index, ISO date, status) for every employee and day, from a seeded RNG."""
+    rng = random.Random(random_seed)
+    for offset in range(days):
+        day = (start + timedelta(days=offset)).isoformat()
+        for index in range(employees):
+            yield index, day, "Absent" if rng.random() < absent_rate else "Present"
+
+
+def seed(engine, employees, days, departments=5, start=date(2025, 1, 1), absent_rate=0.1, random_seed=42):
+    """
+    Insert `employees` employees spread over `departments` departments and one
+    attendance row per employee per day for `days` days, then rebuild the attendance
+    rollups. Statuses are drawn from a seeded RNG, so the same arguments always
+    produce the same data. Secondary attendance indexes are dropped during the load
+    and rebuilt afterwards, which is much faster than maintaining them row by row.
+    """
+    load_employees(engine, employees, departments)
+
+    # The schema is fresh, so employee number `index` got employees.id index + 1
+    codes = {name: str(code) for name, code in STATUS_CODES.items()}
+    secondary_indexes = [index for index in Attendance.__table__.indexes if not index.unique]
+    for index in secondary_indexes:
+        index.drop(bind=engine)
+    bulk_load(engine, "attendance", Rows(
+        ("employee_pk", "date", "status"),
+        lambda: (
+            (str(index + 1), day, codes[status])
+            for index, day, status in attendance_rows(employees, days, start, absent_rate, random_seed)
+        )
+    ))
+    for index in secondary_indexes:
+        index.create(bind=engine)
+
+    with Session(engine) as db:
+        rollups.rebuild(db)
+    with engine.connect() as connection:
+        connection.exec_driver_sql("ANALYZE")
+        connection.commit()
+
+
+@contextmanager
+def count_queries(engine):
+    """Count SQL statements executed on `engine` inside the block."""
+    counter = {"queries": 0}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter["queries"] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def measure(engine, fn, repeat=5):
+    """Run `fn` `repeat` times; return median/min latency in ms and statements per run."""
+    timings = []
+    with count_queries(engine) as counter:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(timings), 2),
+        "min_ms": round(min(timings), 2),
+        "queries": counter["queries"] // repeat
+    }
+
+
+def report(results):
+    """Print benchmark results as JSON on stdout."""
+    print(json.dumps(results, indent=2, default=str))
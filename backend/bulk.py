@@ -0,0 +1,34 @@
+"""
+Helpers for set-based bulk writes.
+Batch endpoints use these to build multi-row INSERT ... ON CONFLICT statements
+for whichever database dialect the session is bound to.
+"""
+from itertools import islice
+from sqlalchemy.dialects import postgresql, sqlite
+
+# Rows per multi-row INSERT. Keeps bound parameters well under SQLite's
+# 32766-variable limit and PostgreSQL's 65535 for our widest tables.
+INSERT_CHUNK_SIZE = 1000
+
+
+def chunked(iterable, size):
+    """Yield successive lists of at most `size` items from any iterable."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def dialect_insert(db, model):
+    """
+    Return an INSERT construct for `model` that supports on_conflict_* clauses.
+    Raises NotImplementedError for dialects without native upsert support.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"Bulk upserts are not supported on '{dialect}'")
@@ -0,0 +1,309 @@
+"""
+Response cache for the summary endpoints.
+
+Entries are keyed by endpoint, parameters and the current *generation* of each tag
+they depend on (e.g. "dashboard", "employee:EMP001"). Writes call `invalidate(tag)`,
+which bumps that tag's generation so every dependent key changes at once; stale
+entries are never read again and age out through the LRU bound or TTL.
+The ETag is derived from the same key, so a matching If-None-Match on a live
+entry is answered with 304 without computing anything or touching the database.
+
+Backends: "memory" (per-process LRU with TTL, default), "redis" (any client with
+get/set/incr/mget, shared by all workers), or "none".
+
+The memory backend keeps its entries per worker, but a write in one worker must
+invalidate the others' too. Each tag therefore also has a change signal, as for the
+employee cache (see employee_cache.py), published on every bump and read into the
+tag's generation on every lookup. CACHE_SIGNAL selects it: "file" (default; one
+small file per tag in the system temp dir, covering the workers of one host),
+"redis" (REDIS_URL) or "none" (single worker only).
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+from database import DATABASE_URL
+from employee_cache import FileSignal, RedisSignal
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_TAG = "dashboard"
+
+
+def employee_tag(employee_id):
+    return f"employee:{employee_id}"
+
+
+class TagSignals:
+    """One change signal per tag, so other workers see exactly which tags were bumped."""
+
+    def __init__(self, signal_for):
+        self.signal_for = signal_for  # tag -> FileSignal or RedisSignal
+
+    def tokens(self, tags):
+        tokens = [self.signal_for(tag).token() for tag in tags]
+        return [token.decode() if isinstance(token, bytes) else token for token in tokens]
+
+    def publish(self, tag):
+        self.signal_for(tag).publish()
+
+
+def file_tag_signals(directory):
+    """TagSignals backed by one FileSignal per tag in `directory`."""
+    os.makedirs(directory, exist_ok=True)
+    return TagSignals(lambda tag: FileSignal(os.path.join(directory, hashlib.sha1(tag.encode()).hexdigest())))
+
+
+class MemoryBackend:
+    """
+    Thread-safe LRU with a per-entry TTL. Tag generations are kept outside the LRU,
+    and include the tag's signal token when `signals` (a TagSignals) is set.
+    """
+
+    def __init__(self, max_entries=1024, signals=None):
+        self.max_entries = max_entries
+        self.signals = signals
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def add(self, key, value, ttl):
+        """Set `key` only if it has no live entry; returns whether it was set."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[1] >= time.monotonic():
+                return False
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def generations(self, tags):
+        with self._lock:
+            local = [self._generations.get(tag, 0) for tag in tags]
+        if self.signals is None:
+            return local
+        # The local count keeps this worker's own writes precise if publishing fails
+        return [[count, token] for count, token in zip(local, self.signals.tokens(tags))]
+
+    def bump(self, tag):
+        with self._lock:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+        if self.signals is not None:
+            self.signals.publish(tag)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+class RedisBackend:
+    """Backend over a Redis-compatible client; values are stored as JSON with a TTL."""
+
+    def __init__(self, client, prefix="hrms:cache:"):
+        self.client = client
+        self.prefix = prefix
+        self.evictions = 0  # Redis evicts on its own; see its INFO stats
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+
+    def add(self, key, value, ttl):
+        return bool(self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)), nx=True))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def generations(self, tags):
+        values = self.client.mget([f"{self.prefix}gen:{tag}" for tag in tags])
+        return [int(value or 0) for value in values]
+
+    def bump(self, tag):
+        self.client.incr(f"{self.prefix}gen:{tag}")
+
+    def clear(self):
+        pass
+
+
+class CacheEntry:
+    """Result of a cache lookup for one request."""
+
+    def __init__(self, cache, key, etag, value, not_modified, ttl=None):
+        self.cache = cache
+        self.key = key
+        self.etag = etag
+        self.value = value
+        self.not_modified = not_modified
+        self.ttl = cache.ttl if ttl is None else ttl
+
+    def apply_headers(self, response):
+        """Advertise the ETag and ask clients to revalidate with If-None-Match."""
+        if self.etag:
+            response.headers["ETag"] = self.etag
+            response.headers["Cache-Control"] = "no-cache"
+
+    def not_modified_response(self):
+        return Response(status_code=304, headers={"ETag": self.etag})
+
+    def store(self, value):
+        """Cache a freshly computed response body and return its JSON-compatible form."""
+        value = jsonable_encoder(value)
+        if self.key is not None:
+            try:
+                self.cache.backend.set(self.key, value, self.ttl)
+            except Exception as exc:
+                logger.warning(f"Response cache write failed: {exc}")
+        return value
+
+
+class ResponseCache:
+    def __init__(self, backend, ttl=60):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def lookup(self, request, namespace, params, tags):
+        """
+        Resolve the cache key for `namespace` + `params` under the current tag generations.
+        Sets `not_modified` when the request's If-None-Match already matches the ETag.
+        Responses read from a replica (see replicas.py) are cached under keys of their
+        own, for no longer than the replica may lag, so primary reads never see them.
+        """
+        generations = []
+        if self.enabled:
+            try:
+                generations = self.backend.generations(tags)
+            except Exception as exc:
+                logger.warning(f"Response cache unavailable: {exc}")
+                return CacheEntry(self, None, None, None, False)
+
+        if not self.enabled:
+            return CacheEntry(self, None, None, None, False)
+
+        staleness = getattr(getattr(request, "state", None), "read_staleness", None)
+        ttl = self.ttl if staleness is None else max(1, min(self.ttl, int(staleness)))
+        raw_key = json.dumps(
+            [namespace, jsonable_encoder(params), list(tags), generations, staleness is not None], sort_keys=True
+        )
+        key = f"{namespace}:{hashlib.sha1(raw_key.encode()).hexdigest()}"
+        etag = f'"{key}"'
+
+        try:
+            value = self.backend.get(key)
+        except Exception as exc:
+            logger.warning(f"Response cache read failed: {exc}")
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if value is None:
+            return CacheEntry(self, key, etag, None, False, ttl)
+
+        # Only confirm an ETag while its entry is live, so the TTL also bounds how
+        # long a worker that missed an invalidation (a failed signal) can answer 304
+        not_modified = request.headers.get("if-none-match") == etag
+        return CacheEntry(self, key, etag, value, not_modified, ttl)
+
+    def invalidate(self, *tags):
+        """Invalidate every entry that depends on any of `tags`. Call after the write commits."""
+        if not self.enabled:
+            return
+        for tag in tags:
+            try:
+                self.backend.bump(tag)
+            except Exception as exc:
+                logger.warning(f"Response cache invalidation failed for {tag}: {exc}")
+
+    def clear(self):
+        if self.enabled:
+            self.backend.clear()
+        self.hits = self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.enabled else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.backend.evictions if self.enabled else 0,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+def build_signals():
+    """Create the cross-worker tag signals selected by CACHE_SIGNAL, for the memory backend."""
+    signal = os.getenv("CACHE_SIGNAL", "file").lower()
+    if signal == "none":
+        return None
+    if signal == "redis":
+        import redis  # Optional dependency, only needed for CACHE_SIGNAL=redis
+        client = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        return TagSignals(lambda tag: RedisSignal(client, key=f"hrms:response-cache:signal:{tag}"))
+    default_path = os.path.join(
+        tempfile.gettempdir(), f"hrms-response-cache-{hashlib.sha1(DATABASE_URL.encode()).hexdigest()[:12]}"
+    )
+    return file_tag_signals(os.getenv("CACHE_SIGNAL_DIR", default_path))
+
+
+def build_backend(backend=None, max_entries=None, prefix="hrms:cache:", signals=None):
+    """
+    Create a backend; defaults to the one selected by CACHE_BACKEND and CACHE_MAX_ENTRIES.
+    A memory backend publishes and reads tag generations through `signals`, if given.
+    """
+    backend = (backend or os.getenv("CACHE_BACKEND", "memory")).lower()
+    if backend == "none":
+        return None
+    if backend == "redis":
+        import redis  # Optional dependency, only needed for the redis backend
+        return RedisBackend(redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")), prefix=prefix)
+    return MemoryBackend(max_entries=max_entries or int(os.getenv("CACHE_MAX_ENTRIES", 1024)), signals=signals)
+
+
+response_cache = ResponseCache(build_backend(signals=build_signals()), ttl=int(os.getenv("CACHE_TTL_SECONDS", 60)))
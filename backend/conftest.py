@@ -0,0 +1,49 @@
+"""
+Shared pytest fixtures for the API tests.
+Points the app at a throwaway SQLite database and archive directory before anything imports them.
+"""
+import os
+import shutil
+import tempfile
+
+import pytest
+
+_test_db = os.path.join(tempfile.mkdtemp(prefix="hrms-test-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_test_db}"
+os.environ["ARCHIVE_DIR"] = os.path.join(os.path.dirname(_test_db), "archive")
+
+
+@pytest.fixture
+def client():
+    """TestClient against a freshly created schema."""
+    from fastapi.testclient import TestClient
+    from cache import response_cache
+    from employee_cache import employee_cache
+    from idempotency import idempotency_store
+    from database import Base, engine
+    from main import app
+
+    response_cache.clear()
+    employee_cache.clear()
+    shutil.rmtree(os.environ["ARCHIVE_DIR"], ignore_errors=True)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    idempotency_store.clear()  # A table by default, so after create_all
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def make_employee(client):
+    """Create an employee through the API and return its payload."""
+    def _make(employee_id, department="Engineering"):
+        payload = {
+            "employee_id": employee_id,
+            "full_name": f"Employee {employee_id}",
+            "email": f"{employee_id.lower()}@example.com",
+            "department": department
+        }
+        response = client.post("/api/employees/", json=payload)
+        assert response.status_code == 201, response.text
+        return payload
+    return _make
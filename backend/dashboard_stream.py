@@ -0,0 +1,244 @@
+"""
+Live dashboard updates over Server-Sent Events.
+
+`GET /api/dashboard/stream` sends the dashboard summary once, as a "snapshot" event,
+then a "delta" event with only the fields that changed after every employee or
+attendance write. Nested mappings (employees_by_department) carry only the changed
+keys, null for removed ones. A client that falls more than one change behind gets a
+new snapshot instead.
+
+Each worker runs one hub, started with its first subscriber and stopped after its
+last one leaves. Subscribers asking for the same period share a channel, so a change
+costs one summary computation per channel and worker, however many dashboards are
+open. Changes are coalesced: the hub recomputes at most every
+DASHBOARD_STREAM_MIN_INTERVAL_SECONDS.
+
+Writes call `notify()` after they commit. It wakes this worker's hub and publishes a
+signal that the other workers' hubs poll every DASHBOARD_STREAM_POLL_SECONDS. As for
+the employee cache, DASHBOARD_STREAM_SIGNAL is "file" (workers on one host, the
+default), "redis" (REDIS_URL; several hosts) or "none" (a single worker). Idle
+streams get a comment every DASHBOARD_STREAM_HEARTBEAT_SECONDS to keep proxies from
+closing them.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+
+from database import DATABASE_URL, ReadSessionLocal
+from employee_cache import FileSignal, RedisSignal
+
+logger = logging.getLogger(__name__)
+
+# Reconnect delay EventSource clients use after the connection drops
+RETRY_MS = 3000
+
+
+def summary_delta(old, new):
+    """Fields of `new` that differ from `old`; mappings are compared key by key, removed keys map to None."""
+    delta = {}
+    for key, value in new.items():
+        previous = old.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            changed = {item: count for item, count in value.items() if previous.get(item) != count}
+            changed.update({item: None for item in previous if item not in value})
+            if changed:
+                delta[key] = changed
+        elif previous != value:
+            delta[key] = value
+    return delta
+
+
+def format_event(event, data, version):
+    return f"id: {version}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class Channel:
+    """Latest summary for one period, shared by every subscriber asking for it."""
+
+    def __init__(self, key, compute):
+        self.key = key
+        self.compute = compute
+        self.version = 0
+        self.snapshot = None
+        self.delta = None
+        self.subscribers = 0
+        self._changed = asyncio.Event()
+        self._computing = asyncio.Lock()
+
+    def update(self, snapshot):
+        """Store a freshly computed summary; wakes subscribers if anything changed."""
+        if self.snapshot is not None:
+            delta = summary_delta(self.snapshot, snapshot)
+            if not delta:
+                return
+            self.delta = delta
+        self.version += 1
+        self.snapshot = snapshot
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait(self, version):
+        """Wait until the channel moves past `version`."""
+        if self.version == version:
+            await self._changed.wait()
+
+
+class DashboardStream:
+    def __init__(self, signal=None, poll_interval=1.0, min_interval=0.5, heartbeat=15.0, session_factory=ReadSessionLocal):
+        self.signal = signal
+        self.poll_interval = poll_interval
+        self.min_interval = min_interval
+        self.heartbeat = heartbeat
+        self.session_factory = session_factory
+        self.channels = {}
+        self.computations = 0
+        self.notifications = 0
+        self._loop = None
+        self._wake = None
+        self._task = None
+        self._dirty = False
+        self._seen_token = None
+
+    def _read_token(self):
+        if self.signal is None:
+            return None
+        try:
+            return self.signal.token()
+        except Exception as exc:
+            logger.warning(f"Dashboard stream signal unavailable: {exc}")
+            return self._seen_token  # Keep serving; local changes still arrive through notify()
+
+    def notify(self):
+        """Tell this worker's and the other workers' subscribers that the dashboard changed. Call after the write commits."""
+        self.notifications += 1
+        if self.signal is not None:
+            try:
+                self.signal.publish()
+            except Exception as exc:
+                logger.warning(f"Dashboard stream signal publish failed: {exc}")
+        self._dirty = True
+        loop, wake = self._loop, self._wake
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                pass  # The hub's event loop has closed
+
+    def _compute(self, channel):
+        db = self.session_factory()
+        try:
+            return jsonable_encoder(channel.compute(db, *channel.key))
+        finally:
+            db.close()
+            self.computations += 1
+
+    async def _refresh(self, channel):
+        channel.update(await run_in_threadpool(self._compute, channel))
+
+    async def join(self, start_date, end_date, compute):
+        """
+        Subscribe to the summary `compute(db, start_date, end_date)` and return its
+        channel with a current snapshot. Pair with `leave()`.
+        """
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            # Read before computing any snapshot, so a change in between is picked up
+            self._seen_token = await run_in_threadpool(self._read_token)
+            self._dirty = False
+            self._task = self._loop.create_task(self._run())
+        key = (start_date, end_date)
+        channel = self.channels.get(key)
+        if channel is None:
+            channel = self.channels[key] = Channel(key, compute)
+        channel.subscribers += 1
+        try:
+            async with channel._computing:
+                if channel.snapshot is None:
+                    await self._refresh(channel)
+        except BaseException:
+            await self.leave(channel)
+            raise
+        return channel
+
+    async def leave(self, channel):
+        channel.subscribers -= 1
+        if channel.subscribers <= 0 and self.channels.get(channel.key) is channel:
+            del self.channels[channel.key]
+
+    async def events(self, channel):
+        """SSE messages for one subscriber of `channel`: a snapshot, then deltas and heartbeats."""
+        version = channel.version
+        yield f"retry: {RETRY_MS}\n" + format_event("snapshot", channel.snapshot, version)
+        while True:
+            try:
+                await asyncio.wait_for(channel.wait(version), self.heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if channel.version == version + 1:
+                message = format_event("delta", channel.delta, channel.version)
+            else:
+                message = format_event("snapshot", channel.snapshot, channel.version)
+            version = channel.version
+            yield message
+
+    async def _run(self):
+        """Recompute every channel after local or other workers' changes, while anyone is subscribed."""
+        try:
+            while self.channels:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                token = await run_in_threadpool(self._read_token)
+                if not self._dirty and token == self._seen_token:
+                    continue
+                self._dirty, self._seen_token = False, token
+                for channel in list(self.channels.values()):
+                    try:
+                        await self._refresh(channel)
+                    except Exception:
+                        logger.exception("Dashboard stream refresh failed; retrying on the next change")
+                # Changes during the pause are picked up together by the next pass
+                await asyncio.sleep(self.min_interval)
+        finally:
+            self._task = self._loop = self._wake = None
+
+    def stats(self):
+        return {
+            "subscribers": sum(channel.subscribers for channel in self.channels.values()),
+            "channels": len(self.channels),
+            "computations": self.computations,
+            "notifications": self.notifications,
+        }
+
+
+def build_signal():
+    """Create the cross-worker signal selected by DASHBOARD_STREAM_SIGNAL."""
+    signal = os.getenv("DASHBOARD_STREAM_SIGNAL", "file").lower()
+    if signal == "none":
+        return None
+    if signal == "redis":
+        import redis  # Optional dependency, only needed for DASHBOARD_STREAM_SIGNAL=redis
+        return RedisSignal(redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")),
+                           key="hrms:dashboard-stream:generation")
+    default_path = os.path.join(
+        tempfile.gettempdir(), f"hrms-dashboard-stream-{hashlib.sha1(DATABASE_URL.encode()).hexdigest()[:12]}"
+    )
+    return FileSignal(os.getenv("DASHBOARD_STREAM_SIGNAL_FILE", default_path))
+
+
+dashboard_stream = DashboardStream(
+    build_signal(),
+    poll_interval=float(os.getenv("DASHBOARD_STREAM_POLL_SECONDS", 1)),
+    min_interval=float(os.getenv("DASHBOARD_STREAM_MIN_INTERVAL_SECONDS", 0.5)),
+    heartbeat=float(os.getenv("DASHBOARD_STREAM_HEARTBEAT_SECONDS", 15)),
+)
@@ -1,10 +1,21 @@
 import os
 import logging
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Union
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import UniqueConstraint, create_engine, event, exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
 
+try:
+    import fcntl  # POSIX only: orders SQLite writers across worker processes
+except ImportError:
+    fcntl = None
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -25,39 +36,327 @@ if DATABASE_URL and DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
     logger.info("Converted postgres:// to postgresql://")
 
-# Connection pooling and engine configuration
-connect_args = {}
-pool_settings = {}
-
-# SQLite-specific settings
-if "sqlite" in DATABASE_URL:
-    connect_args = {"check_same_thread": False}
-    pool_settings = {"connect_args": connect_args}
-    logger.debug("Using SQLite connection settings")
-# PostgreSQL and other database settings
-else:
-    pool_settings = {
-        "pool_size": int(os.getenv("DB_POOL_SIZE", 3)),
-        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 5)),
-        "pool_pre_ping": True,  # Verify connections before using
-        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 600))  # Recycle connections every 10 mins
+# Connection pool profiles per dialect. Every value can be overridden with the
+# matching environment variable: DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+# DB_POOL_RECYCLE and DB_POOL_PRE_PING.
+POOL_PROFILES = {
+    # Sized for a few gunicorn workers each running a 40-thread request pool.
+    # Idle connections are recycled before typical server/proxy idle timeouts.
+    "postgresql": {"pool_size": 10, "max_overflow": 20, "pool_timeout": 30, "pool_recycle": 1800},
+    # SQLite connections are cheap; the pool mostly bounds concurrent writers.
+    "sqlite": {"pool_size": 5, "max_overflow": 10, "pool_timeout": 30, "pool_recycle": -1},
+}
+
+# Applied to every new SQLite connection. WAL lets readers proceed while one writer
+# commits, busy_timeout makes writers queue instead of failing with "database is
+# locked", and synchronous=NORMAL is durable across application crashes in WAL mode.
+# busy_timeout only helps transactions that take the write lock when they begin, so
+# configure_engine() starts transactions with BEGIN IMMEDIATE, except on connections
+# with the READ_ONLY execution options (ReadSessionLocal), which begin deferred.
+# foreign_keys makes SQLite enforce foreign keys like PostgreSQL does; write routes
+# rely on the violation instead of checking that the referenced row exists.
+SQLITE_PRAGMAS = {
+    "foreign_keys": "ON",
+    "journal_mode": "WAL",
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+    "synchronous": "NORMAL",
+    "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", 20000)),  # negative means KiB
+}
+
+# Connections idle for longer than this are pinged on checkout; recently used ones
+# are trusted, and a dead connection still invalidates the pool on its first error.
+DB_PING_AFTER_IDLE_SECONDS = float(os.getenv("DB_PING_AFTER_IDLE_SECONDS", 60))
+
+# Execution options of engines that only read. On SQLite their transactions begin
+# deferred, so a long read (a streamed export, an open session) doesn't hold the write lock.
+READ_ONLY = {"read_only": True}
+
+
+class PoolMetricsMixin:
+    """Records how often and how long callers wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = {"checkouts": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0, "timeouts": 0}
+        self._metrics_lock = threading.Lock()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._metrics_lock:
+                self.metrics["timeouts"] += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._metrics_lock:
+                self.metrics["checkouts"] += 1
+                self.metrics["wait_seconds_total"] += waited
+                self.metrics["wait_seconds_max"] = max(self.metrics["wait_seconds_max"], waited)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics, pool._metrics_lock = self.metrics, self._metrics_lock
+        return pool
+
+
+class InstrumentedQueuePool(PoolMetricsMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(PoolMetricsMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url, async_driver=False):
+    """Keyword arguments for create_engine() from the dialect's profile plus env overrides."""
+    backend = url.split(":", 1)[0].split("+", 1)[0]
+    profile = dict(POOL_PROFILES.get(backend, POOL_PROFILES["postgresql"]))
+    overrides = {
+        "pool_size": ("DB_POOL_SIZE", int),
+        "max_overflow": ("DB_MAX_OVERFLOW", int),
+        "pool_timeout": ("DB_POOL_TIMEOUT", float),
+        "pool_recycle": ("DB_POOL_RECYCLE", int),
+    }
+    for option, (variable, cast) in overrides.items():
+        if os.getenv(variable):
+            profile[option] = cast(os.getenv(variable))
+
+    options = {
+        **profile,
+        "poolclass": InstrumentedAsyncQueuePool if async_driver else InstrumentedQueuePool,
+        # Pessimistic ping on every checkout costs a round-trip per request; off by default
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "false").lower() == "true",
+        # LIFO reuse keeps a small hot set of connections, so surplus ones sit idle and get recycled
+        "pool_use_lifo": True,
+        "echo": os.getenv("SQL_ECHO", "false").lower() == "true",  # Log all SQL statements if enabled
     }
-    logger.debug(f"Using database pool settings: {pool_settings}")
+    if backend == "sqlite" and not async_driver:
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
+
+def configure_engine(engine):
+    """Attach SQLite pragmas and idle-connection liveness checks to `engine`."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    if sync_engine.dialect.name == "sqlite":
+        @event.listens_for(sync_engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            # Turn off pysqlite's own BEGIN, which it only emits before DML; _begin_immediate() takes over
+            dbapi_connection.isolation_level = None
+            cursor = dbapi_connection.cursor()
+            for pragma, value in SQLITE_PRAGMAS.items():
+                cursor.execute(f"PRAGMA {pragma}={value}")
+            cursor.close()
+
+        # SQLite's busy handler polls, so with many waiting writers some lose every race
+        # and time out. Writers queue on a lock instead: writer threads of this process
+        # on writer_queue, then worker processes on an flock() of a file next to the
+        # database, which the kernel hands over as soon as it is released. Async engines
+        # run every transaction on the event loop, where blocking would stall it.
+        writer_queue = None if sync_engine is not engine else threading.Lock()
+        database_file = sync_engine.url.database
+        writer_files = {}  # pid -> lock file; a forked worker must open its own
+
+        def _writer_file():
+            if fcntl is None or database_file in (None, "", ":memory:"):
+                return None
+            pid = os.getpid()
+            if pid not in writer_files:
+                writer_files.clear()
+                writer_files[pid] = open(f"{database_file}-writers", "a")
+            return writer_files[pid]
+
+        @event.listens_for(sync_engine, "begin")
+        def _begin_immediate(connection):
+            # A deferred transaction that reads first and then writes has to upgrade its
+            # lock, and in WAL mode SQLite fails that upgrade with "database is locked" at
+            # once instead of waiting out busy_timeout. Taking the write lock up front
+            # makes concurrent writers queue on busy_timeout instead.
+            if connection.get_execution_options().get("read_only"):
+                connection.exec_driver_sql("BEGIN")
+                return
+            try:
+                if writer_queue is not None:
+                    writer_queue.acquire()
+                    connection.info["queued_writer"] = None
+                    writer_file = _writer_file()
+                    if writer_file is not None:
+                        fcntl.flock(writer_file, fcntl.LOCK_EX)
+                        connection.info["queued_writer"] = writer_file
+                connection.exec_driver_sql("BEGIN IMMEDIATE")
+            except BaseException:
+                _leave_writer_queue(connection.info)
+                raise
+
+        def _leave_writer_queue(info):
+            if "queued_writer" not in info:
+                return
+            writer_file = info.pop("queued_writer")
+            if writer_file is not None:
+                fcntl.flock(writer_file, fcntl.LOCK_UN)
+            writer_queue.release()
+
+        # Before the COMMIT or ROLLBACK itself; the next writer's BEGIN IMMEDIATE waits it out
+        event.listen(sync_engine, "commit", lambda connection: _leave_writer_queue(connection.info))
+        event.listen(sync_engine, "rollback", lambda connection: _leave_writer_queue(connection.info))
+        # In case a connection goes back to the pool without either
+        event.listen(sync_engine, "checkin", lambda dbapi_connection, record: _leave_writer_queue(record.info))
+        return engine
+
+    @event.listens_for(sync_engine, "checkin")
+    def _mark_idle(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < DB_PING_AFTER_IDLE_SECONDS:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception as error:
+            # The pool discards this connection and retries with a fresh one
+            raise exc.DisconnectionError(f"Idle connection failed liveness check: {error}")
+        finally:
+            cursor.close()
+
+    return engine
+
+
+def pool_stats(engine):
+    """Current occupancy and cumulative wait metrics for `engine`'s pool."""
+    pool = getattr(engine, "sync_engine", engine).pool
+    stats = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+    }
+    metrics = dict(getattr(pool, "metrics", {}))
+    if metrics:
+        metrics["wait_seconds_avg"] = metrics["wait_seconds_total"] / metrics["checkouts"] if metrics["checkouts"] else 0.0
+        stats.update({key: round(value, 6) if isinstance(value, float) else value for key, value in metrics.items()})
+    return stats
+
 
 # Create database engine with configuration
-engine = create_engine(
-    DATABASE_URL,
-    **pool_settings,
-    echo=os.getenv("SQL_ECHO", "false").lower() == "true"  # Log all SQL statements if enabled
-)
+engine = configure_engine(create_engine(DATABASE_URL, **engine_options(DATABASE_URL)))
+logger.debug(f"Using database pool settings: {engine.pool.status()}")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Sessions for reads only; see READ_ONLY
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine.execution_options(**READ_ONLY))
 Base = declarative_base()
 
-def get_db():
+# Async mode: request handlers get an AsyncSession on an asyncpg/aiosqlite engine.
+# The sync engine above is still used by streaming endpoints, scripts and migrations.
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() == "true"
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url):
+    """Map a sync database URL onto its async driver, e.g. postgresql:// -> postgresql+asyncpg://."""
+    scheme, rest = url.split("://", 1)
+    backend = scheme.split("+", 1)[0]
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}'")
+    return f"{ASYNC_DRIVERS[backend]}://{rest}"
+
+
+async_engine = None
+AsyncSessionLocal = None
+AsyncReadSessionLocal = None
+if DB_ASYNC:
+    async_engine = configure_engine(
+        create_async_engine(to_async_url(DATABASE_URL), **engine_options(DATABASE_URL, async_driver=True))
+    )
+    # Objects are returned to FastAPI after commit, outside the session's greenlet,
+    # so they must not expire and lazy-load
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    AsyncReadSessionLocal = async_sessionmaker(
+        async_engine.execution_options(**READ_ONLY), autoflush=False, expire_on_commit=False
+    )
+    logger.info("Async database mode enabled")
+
+DBSession = Union[Session, AsyncSession]
+
+
+def _get_sync_db():
     """Dependency function to get database session."""
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def _get_async_db():
+    """Dependency function to get an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+get_db = _get_async_db if DB_ASYNC else _get_sync_db
+
+
+def violated_constraint(error, table):
+    """
+    Name of the constraint or unique index on `table` that an IntegrityError violated,
+    or None if the driver doesn't say. PostgreSQL drivers report the name; on a
+    partitioned table that is the partition's copy of a unique constraint, which is
+    mapped back through the key columns in the error detail. SQLite only reports the
+    columns of a unique violation, which are matched the same way, and names nothing
+    for a foreign key violation, so the table's foreign key is assumed when it has
+    exactly one.
+    """
+    original = error.orig
+    cause = getattr(original, "__cause__", None)  # asyncpg, wrapped by SQLAlchemy's adapter
+    diagnostics = getattr(original, "diag", None)  # psycopg2
+    name = getattr(diagnostics, "constraint_name", None) or getattr(cause, "constraint_name", None)
+    if name:
+        if name in {constraint.name for constraint in table.constraints} | {index.name for index in table.indexes}:
+            return name
+        detail = getattr(diagnostics, "message_detail", None) or getattr(cause, "detail", None) or ""
+        if detail.startswith("Key ("):
+            columns = [column.strip() for column in detail[len("Key ("):detail.index(")")].split(",")]
+            return _unique_with_columns(table, columns) or name
+        return name
+
+    message = str(original)
+    if message.startswith("FOREIGN KEY constraint failed"):
+        foreign_keys = list(table.foreign_key_constraints)
+        return foreign_keys[0].name if len(foreign_keys) == 1 else None
+    if message.startswith("UNIQUE constraint failed: "):
+        columns = [column.strip().split(".", 1)[-1] for column in message.split(": ", 1)[1].split(",")]
+        return _unique_with_columns(table, columns)
+    return None
+
+
+def _unique_with_columns(table, columns):
+    candidates = [index for index in table.indexes if index.unique] + [
+        constraint for constraint in table.constraints if isinstance(constraint, UniqueConstraint)
+    ]
+    for candidate in candidates:
+        if [column.name for column in candidate.columns] == columns:
+            return candidate.name
+    return None
+
+
+async def run_db(db, fn, *args, **kwargs):
+    """
+    Run `fn(session, *args, **kwargs)` written against the sync Session API.
+    With an AsyncSession it runs via run_sync, so driver I/O is awaited on the event loop;
+    with a sync Session it runs in the threadpool, as sync route handlers did before.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
@@ -0,0 +1,208 @@
+"""
+Per-worker cache of which employee IDs exist.
+
+Attendance routes need to know whether an employee exists to answer 404, and which
+employees.id row an employee_id names to read attendance, which references it.
+Employees are created and deleted rarely, so each worker keeps a bounded LRU of
+employee_id -> employees.id (False for unknown IDs). Known IDs live for
+EMPLOYEE_CACHE_TTL_SECONDS and unknown ones (negative entries) for the shorter
+EMPLOYEE_CACHE_NEGATIVE_TTL_SECONDS.
+
+Creating, importing or deleting employees calls `invalidate()` after the commit,
+which clears this worker's cache and publishes a signal; every other worker sees the
+signal on its next lookup and clears its cache too. Signals (EMPLOYEE_CACHE_SIGNAL):
+
+- "file" (default): the signal is a file in the system temp dir, replaced on every
+  change with a random token; workers read it once per lookup. Covers all workers
+  on one host.
+- "redis": a generation counter in Redis (REDIS_URL), read once per lookup. Covers
+  workers on several hosts.
+- "none": no cross-worker signal; entries only expire. Use with a single worker.
+
+A lookup that started before an invalidation never stores its result, so a read
+racing a create can't cache a stale "missing".
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from database import DATABASE_URL
+from models.employee import Employee
+
+logger = logging.getLogger(__name__)
+
+
+class FileSignal:
+    """Change signal shared by the workers of one host through a file's identity."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def token(self):
+        # The file's random content, not its inode and mtime: a freed inode can come
+        # back within one mtime tick, and with it an old token
+        try:
+            with open(self.path) as signal_file:
+                return signal_file.read()
+        except FileNotFoundError:
+            return None
+
+    def publish(self):
+        # os.replace swaps the file atomically, so readers see the old token or the new one
+        temporary = f"{self.path}.{uuid.uuid4().hex}"
+        with open(temporary, "w") as signal_file:
+            signal_file.write(uuid.uuid4().hex)
+        os.replace(temporary, self.path)
+
+
+class RedisSignal:
+    """Change signal shared through a Redis counter."""
+
+    def __init__(self, client, key="hrms:employee-cache:generation"):
+        self.client = client
+        self.key = key
+
+    def token(self):
+        return self.client.get(self.key)
+
+    def publish(self):
+        self.client.incr(self.key)
+
+
+class EmployeeExistenceCache:
+    def __init__(self, signal=None, max_entries=10000, ttl=300, negative_ttl=30):
+        self.signal = signal
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._seen_token = self._read_token()
+        self._lock = threading.Lock()
+
+    def _read_token(self):
+        if self.signal is None:
+            return None
+        try:
+            return self.signal.token()
+        except Exception as exc:
+            logger.warning(f"Employee cache signal unavailable: {exc}")
+            return object()  # Never equal to the last token, so the cache is dropped
+
+    def _sync(self):
+        """Drop every entry if another worker signalled a change. Call with the lock held."""
+        token = self._read_token()
+        if token != self._seen_token:
+            self._seen_token = token
+            self._entries.clear()
+            self._generation += 1
+
+    def get(self, employee_id):
+        """
+        Return (employee_pk, generation): employee_pk is the employee's employees.id, or
+        False when the ID is known not to exist, and None on a miss. Pass the
+        generation to `put()` with the result of the database lookup.
+        """
+        with self._lock:
+            self._sync()
+            item = self._entries.get(employee_id)
+            if item is not None and item[1] < time.monotonic():
+                del self._entries[employee_id]
+                item = None
+            if item is None:
+                self.misses += 1
+                return None, self._generation
+            self._entries.move_to_end(employee_id)
+            if item[0]:
+                self.hits += 1
+            else:
+                self.negative_hits += 1
+            return item[0], self._generation
+
+    def put(self, employee_id, employee_pk, generation):
+        with self._lock:
+            self._sync()
+            if generation != self._generation:
+                return  # Invalidated while the caller was reading the database
+            ttl = self.ttl if employee_pk else self.negative_ttl
+            self._entries[employee_id] = (employee_pk, time.monotonic() + ttl)
+            self._entries.move_to_end(employee_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def resolve(self, db, employee_id):
+        """The employees.id of active employee `employee_id`, or None; from the cache or one indexed lookup."""
+        employee_pk, generation = self.get(employee_id)
+        if employee_pk is None:
+            employee_pk = db.query(Employee.id).filter(
+                Employee.employee_id == employee_id, Employee.deleted_at.is_(None)
+            ).scalar() or False
+            # A lagging replica may not have seen a change yet (see replicas.py)
+            if not db.info.get("replica"):
+                self.put(employee_id, employee_pk, generation)
+        return employee_pk or None
+
+    def invalidate(self):
+        """Forget every entry here and in the other workers. Call after the write commits."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.invalidations += 1
+            if self.signal is not None:
+                try:
+                    self.signal.publish()
+                    self._seen_token = self.signal.token()
+                except Exception as exc:
+                    logger.warning(f"Employee cache signal publish failed: {exc}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.hits = self.negative_hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self):
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0
+        }
+
+
+def build_signal():
+    """Create the cross-worker signal selected by EMPLOYEE_CACHE_SIGNAL."""
+    signal = os.getenv("EMPLOYEE_CACHE_SIGNAL", "file").lower()
+    if signal == "none":
+        return None
+    if signal == "redis":
+        import redis  # Optional dependency, only needed for EMPLOYEE_CACHE_SIGNAL=redis
+        return RedisSignal(redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
+    # One file per database, so unrelated deployments on a host don't disturb each other
+    default_path = os.path.join(
+        tempfile.gettempdir(), f"hrms-employee-cache-{hashlib.sha1(DATABASE_URL.encode()).hexdigest()[:12]}"
+    )
+    return FileSignal(os.getenv("EMPLOYEE_CACHE_SIGNAL_FILE", default_path))
+
+
+employee_cache = EmployeeExistenceCache(
+    build_signal(),
+    max_entries=int(os.getenv("EMPLOYEE_CACHE_MAX_ENTRIES", 10000)),
+    ttl=int(os.getenv("EMPLOYEE_CACHE_TTL_SECONDS", 300)),
+    negative_ttl=int(os.getenv("EMPLOYEE_CACHE_NEGATIVE_TTL_SECONDS", 30)),
+)
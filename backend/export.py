@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+"""
+Columnar exports of attendance for payroll and BI jobs.
+
+Writes attendance joined with the employee's department as Apache Parquet or an
+Arrow IPC stream, both through `GET /api/attendance/export/columnar` and this
+script. Rows are read from a server-side cursor EXPORT_BATCH_ROWS at a time and each
+batch becomes one record batch (one Parquet row group), so memory stays bounded.
+Date range, department and status filters are applied in SQL, and to archived
+months (see archive.py) through pyarrow's filters.
+
+Exports can be incremental on created_at. Every export reports a watermark: the
+database's current time minus EXPORT_SETTLE_SECONDS, which leaves transactions still
+in flight time to commit. The API returns it in X-Export-Watermark; the script keeps
+it in --watermark-file. Pass it as the next run's `created_after` to fetch only the
+rows created since. An incremental export covers [created_after, watermark), so
+consecutive runs neither miss nor repeat rows. A full export includes every row, so
+the first incremental run after one may repeat rows from its last
+EXPORT_SETTLE_SECONDS; consumers should key rows on id. Incremental exports skip
+archived months, whose rows were created before the month closed. Status changes keep
+created_at and aren't exported again. Full exports include archived records, with a
+null created_at.
+
+Needs pyarrow, an optional dependency:
+
+    python export.py --format parquet --output attendance.parquet --department Engineering
+    python export.py --output new-attendance.parquet --watermark-file attendance.watermark  # nightly
+"""
+import argparse
+import os
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+from archive import attendance_archive
+from database import ReadSessionLocal
+from models.attendance import Attendance
+from models.employee import Employee
+
+try:
+    import pyarrow as pa  # Optional dependency: only needed for columnar exports
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", 50000))
+EXPORT_SETTLE_SECONDS = int(os.getenv("EXPORT_SETTLE_SECONDS", 60))
+
+PARQUET, ARROW = "parquet", "arrow"
+MEDIA_TYPES = {PARQUET: "application/vnd.apache.parquet", ARROW: "application/vnd.apache.arrow.stream"}
+EXTENSIONS = {PARQUET: "parquet", ARROW: "arrows"}
+# Columns read from archive files; created_at isn't archived
+ARCHIVE_COLUMNS = ("id", "employee_id", "department", "date", "status")
+
+
+def require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Columnar exports need pyarrow: pip install pyarrow")
+
+
+def export_schema():
+    """Columns of an export, whose rows are ordered by (date, id)."""
+    return pa.schema([
+        ("id", pa.int64()),
+        ("employee_id", pa.string()),
+        ("department", pa.string()),
+        ("date", pa.date32()),
+        ("status", pa.string()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+    ])
+
+
+def as_utc(value):
+    """`value` as an aware UTC datetime; naive datetimes are taken to be UTC, as SQLite stores them."""
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def watermark(db, settle_seconds=None):
+    """Upper bound on created_at for an export starting now; the next incremental export starts there."""
+    settle = EXPORT_SETTLE_SECONDS if settle_seconds is None else settle_seconds
+    return as_utc(db.execute(select(func.now())).scalar()) - timedelta(seconds=settle)
+
+
+def record_batches(db, start_date=None, end_date=None, department=None, status=None,
+                   created_after=None, created_before=None, batch_size=EXPORT_BATCH_ROWS, archive=attendance_archive):
+    """
+    Matching attendance as pyarrow RecordBatches of export_schema(): archived months
+    first, then the table's rows created in [created_after, created_before). Archived
+    records are left out of incremental exports.
+    """
+    require_pyarrow()
+    schema = export_schema()
+    if created_after is None:
+        for batch in archive.batches(ARCHIVE_COLUMNS, start_date, end_date, department=department, status=status):
+            yield pa.RecordBatch.from_arrays(
+                [*batch.columns, pa.nulls(batch.num_rows, schema.field("created_at").type)], schema=schema
+            )
+
+    query = select(
+        Attendance.id, Employee.employee_id, Employee.department, Attendance.date, Attendance.status,
+        Attendance.created_at
+    ).join(Employee, Employee.id == Attendance.employee_pk).where(*archive.hot_filters(start_date, end_date))
+    if start_date:
+        query = query.where(Attendance.date >= start_date)
+    if end_date:
+        query = query.where(Attendance.date <= end_date)
+    if department:
+        query = query.where(Employee.department == department, Employee.deleted_at.is_(None))
+    if status:
+        query = query.where(Attendance.status == status)
+    if created_after is not None:
+        query = query.where(Attendance.created_at >= created_after)
+    if created_before is not None:
+        query = query.where(Attendance.created_at < created_before)
+    records = db.execute(
+        query.order_by(Attendance.date, Attendance.id).execution_options(yield_per=batch_size)
+    )
+    for rows in records.partitions():
+        columns = list(zip(*rows))
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+        )
+
+
+def open_writer(sink, export_format):
+    """A writer of export_schema() batches to `sink`, a path or binary file object."""
+    require_pyarrow()
+    if export_format == PARQUET:
+        return pq.ParquetWriter(sink, export_schema(), compression="zstd")
+    if export_format == ARROW:
+        return pa.ipc.new_stream(sink, export_schema())
+    raise ValueError(f"Unknown export format {export_format!r}")
+
+
+class _ChunkSink:
+    """Binary file object that keeps what is written until a streaming response takes it."""
+
+    def __init__(self):
+        self.closed = False
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_export(session_factory, export_format, **options):
+    """
+    Yield an export's bytes batch by batch, for a streaming response. Owns its session,
+    since the response outlives the request scope. `options` are record_batches()'s.
+    """
+    sink = _ChunkSink()
+    db = session_factory()
+    try:
+        writer = open_writer(sink, export_format)
+        for batch in record_batches(db, **options):
+            writer.write_batch(batch)
+            chunk = sink.take()
+            if chunk:
+                yield chunk
+        writer.close()
+        yield sink.take()
+    finally:
+        db.close()
+
+
+def export_to_file(session_factory, path, export_format, **options):
+    """Write an export to `path`, replacing it only once complete; returns the number of rows."""
+    temporary = f"{path}.{uuid.uuid4().hex}"
+    rows = 0
+    db = session_factory()
+    try:
+        with open(temporary, "wb") as output:
+            writer = open_writer(output, export_format)
+            for batch in record_batches(db, **options):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+            writer.close()
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    finally:
+        db.close()
+    return rows
+
+
+def _read_watermark(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as watermark_file:
+        return as_utc(datetime.fromisoformat(watermark_file.read().strip()))
+
+
+def _write_watermark(path, value):
+    temporary = f"{path}.{uuid.uuid4().hex}"
+    with open(temporary, "w") as watermark_file:
+        watermark_file.write(value.isoformat())
+    os.replace(temporary, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export attendance with departments to Parquet or Arrow IPC")
+    parser.add_argument("--format", choices=(PARQUET, ARROW), default=PARQUET)
+    parser.add_argument("--output", required=True, help="File to write; replaced once the export completes")
+    parser.add_argument("--start-date", type=date.fromisoformat, default=None)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None)
+    parser.add_argument("--department", default=None)
+    parser.add_argument("--status", choices=("Present", "Absent"), default=None)
+    parser.add_argument(
+        "--created-after", type=datetime.fromisoformat, default=None,
+        help="Only rows created at or after this time (ISO 8601, UTC unless it has an offset)"
+    )
+    parser.add_argument(
+        "--watermark-file", default=None,
+        help="Read --created-after from this file and store the new watermark there after the export"
+    )
+    args = parser.parse_args()
+
+    created_after = as_utc(args.created_after)
+    if args.watermark_file and created_after is None:
+        created_after = _read_watermark(args.watermark_file)
+    db = ReadSessionLocal()
+    try:
+        next_watermark = watermark(db)
+    finally:
+        db.close()
+    rows = export_to_file(
+        ReadSessionLocal, args.output, args.format, start_date=args.start_date, end_date=args.end_date,
+        department=args.department, status=args.status, created_after=created_after,
+        created_before=next_watermark if created_after else None
+    )
+    if args.watermark_file:
+        _write_watermark(args.watermark_file, next_watermark)
+    print(f"Exported {rows} attendance record(s) to {args.output}")
+    print(f"Watermark: {next_watermark.isoformat()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Idempotency-Key support for write requests.
+
+A client that may retry a POST/PUT/PATCH/DELETE sends a unique `Idempotency-Key`
+header. The first request with that key runs normally, and its response (status,
+content type and body) is stored for IDEMPOTENCY_TTL_SECONDS. Retries with the same
+key and the same request are answered from the store with `Idempotent-Replayed: true`
+and never reach the route or the database.
+
+- The key is reserved with an atomic add before the request runs, so a concurrent
+  retry gets 409 (with Retry-After) instead of a second write. The reservation
+  expires after IDEMPOTENCY_LOCK_SECONDS in case a worker dies mid-request.
+- Reusing a key for a different method, path, query or body gets 422.
+- 5xx responses and unhandled errors are not stored; the key is released so the
+  client's retry runs again.
+- The request body is read into memory to fingerprint it, so keyed requests larger
+  than IDEMPOTENCY_MAX_BODY_BYTES get 413; send large uploads without a key.
+- Streamed responses (e.g. the employee import's progress report) are passed
+  through, not stored, and release the key: a retry runs again.
+
+IDEMPOTENCY_BACKEND selects the store: "database" (default; the idempotency_keys
+table, shared by every worker using the database), "redis" (shared, REDIS_URL),
+"memory" (per worker: only with a single worker, since a retry reaching another
+worker would run again) or "none". Store calls run in the threadpool.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+
+from cache import build_backend
+from database import SessionLocal
+from models.idempotency import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+MAX_KEY_LENGTH = 255
+MAX_BODY_BYTES = int(os.getenv("IDEMPOTENCY_MAX_BODY_BYTES", 1024 * 1024))
+
+
+class DatabaseBackend:
+    """Backend over the idempotency_keys table; add() relies on its primary key being unique."""
+
+    evictions = 0  # Expired rows are deleted by add(), not evicted
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+
+    def get(self, key):
+        with self.session_factory() as db:
+            row = db.get(IdempotencyKey, key)
+            return json.loads(row.value) if row is not None and row.expires_at > time.time() else None
+
+    def set(self, key, value, ttl):
+        with self.session_factory() as db:
+            db.merge(IdempotencyKey(key=key, value=json.dumps(value), expires_at=time.time() + ttl))
+            db.commit()
+
+    def add(self, key, value, ttl):
+        """Insert `key` unless it has a live row; returns whether it was inserted."""
+        now = time.time()
+        with self.session_factory() as db:
+            # Expired rows go first, this key's included, so it can be claimed again
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now))
+            db.add(IdempotencyKey(key=key, value=json.dumps(value), expires_at=now + ttl))
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                return False
+            return True
+
+    def delete(self, key):
+        with self.session_factory() as db:
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key))
+            db.commit()
+
+    def clear(self):
+        with self.session_factory() as db:
+            db.execute(delete(IdempotencyKey))
+            db.commit()
+
+
+def build_store_backend(backend=None):
+    """Create the backend selected by IDEMPOTENCY_BACKEND and IDEMPOTENCY_MAX_KEYS."""
+    backend = (backend or os.getenv("IDEMPOTENCY_BACKEND", "database")).lower()
+    if backend == "database":
+        return DatabaseBackend()
+    return build_backend(backend, max_entries=int(os.getenv("IDEMPOTENCY_MAX_KEYS", 10000)), prefix="hrms:")
+
+
+class IdempotencyStore:
+    """Reservations and stored responses keyed by a hash of the client's Idempotency-Key."""
+
+    def __init__(self, backend, ttl=86400, lock_ttl=60):
+        self.backend = backend
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    @staticmethod
+    def storage_key(idempotency_key):
+        return "idempotency:" + hashlib.sha256(idempotency_key.encode()).hexdigest()[:32]
+
+    def reserve(self, key, fingerprint):
+        """Claim `key` for a new request; returns None if claimed, else the existing record."""
+        for _ in range(2):
+            if self.backend.add(key, {"fingerprint": fingerprint}, self.lock_ttl):
+                return None
+            record = self.backend.get(key)
+            if record is not None:
+                return record
+            # The previous record expired between add() and get(); claim it again
+        return None
+
+    def complete(self, key, fingerprint, status_code, content_type, body):
+        self.backend.set(key, {
+            "fingerprint": fingerprint,
+            "status": status_code,
+            "content_type": content_type,
+            "body": body.decode("latin-1"),
+        }, self.ttl)
+
+    def release(self, key):
+        self.backend.delete(key)
+
+    def clear(self):
+        if self.enabled:
+            self.backend.clear()
+
+
+def _fingerprint(scope, body):
+    request_line = f"{scope['method']} {scope['path']}?{scope.get('query_string', b'').decode('latin-1')}"
+    return hashlib.sha256(request_line.encode() + b"\n" + body).hexdigest()
+
+
+async def _read_body(receive, limit):
+    """The request body, or None as soon as it exceeds `limit` bytes."""
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _replay(record):
+    return Response(
+        content=record["body"].encode("latin-1"),
+        status_code=record["status"],
+        media_type=record["content_type"],
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware replaying stored responses for repeated Idempotency-Keys; see the module docstring."""
+
+    def __init__(self, app, store=None, max_body_bytes=MAX_BODY_BYTES):
+        self.app = app
+        self.store = store or idempotency_store
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS or not self.store.enabled:
+            await self.app(scope, receive, send)
+            return
+        raw_key = dict(scope["headers"]).get(b"idempotency-key")
+        if raw_key is None:
+            await self.app(scope, receive, send)
+            return
+
+        idempotency_key = raw_key.decode("latin-1").strip()
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                status_code=400,
+                content={"detail": f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"}
+            )
+            await response(scope, receive, send)
+            return
+
+        body = await _read_body(receive, self.max_body_bytes)
+        if body is None:
+            response = JSONResponse(
+                status_code=413,
+                content={"detail": f"Requests with an Idempotency-Key are limited to {self.max_body_bytes} bytes"}
+            )
+            await response(scope, receive, send)
+            return
+        fingerprint = _fingerprint(scope, body)
+        key = self.store.storage_key(idempotency_key)
+        try:
+            record = await run_in_threadpool(self.store.reserve, key, fingerprint)
+        except Exception as exc:
+            logger.warning(f"Idempotency store unavailable, processing without it: {exc}")
+            record, key = None, None
+
+        if record is not None:
+            if record["fingerprint"] != fingerprint:
+                response = JSONResponse(
+                    status_code=422,
+                    content={"detail": "Idempotency-Key was already used for a different request"}
+                )
+            elif "status" not in record:
+                response = JSONResponse(
+                    status_code=409,
+                    content={"detail": "A request with this Idempotency-Key is still being processed"},
+                    headers={"Retry-After": "1"}
+                )
+            else:
+                response = _replay(record)
+            await response(scope, receive, send)
+            return
+
+        body_sent = False
+
+        async def replay_body():
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        status_code, content_type, chunks, streamed = 500, None, [], False
+
+        async def capture(message):
+            nonlocal status_code, content_type, streamed
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"").decode("latin-1") or None
+            elif message["type"] == "http.response.body":
+                # A body sent in several messages is streamed; keep none of it
+                if message.get("more_body", False):
+                    streamed = True
+                    chunks.clear()
+                elif not streamed:
+                    chunks.append(message.get("body", b""))
+            await send(message)
+
+        completed = False
+        try:
+            await self.app(scope, replay_body, capture)
+            completed = status_code < 500 and not streamed
+        finally:
+            if key is not None:
+                try:
+                    if completed:
+                        await run_in_threadpool(
+                            self.store.complete, key, fingerprint, status_code, content_type, b"".join(chunks)
+                        )
+                    else:
+                        await run_in_threadpool(self.store.release, key)
+                except Exception as exc:
+                    logger.warning(f"Idempotency store write failed: {exc}")
+
+
+idempotency_store = IdempotencyStore(
+    build_store_backend(),
+    ttl=int(os.getenv("IDEMPOTENCY_TTL_SECONDS", 86400)),
+    lock_ttl=int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", 60)),
+)
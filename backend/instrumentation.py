@@ -0,0 +1,242 @@
+"""
+Per-request database instrumentation.
+
+SQLAlchemy cursor hooks time every statement and add it to the current request's
+stats (held in a context variable, so it follows the request into the threadpool
+and into AsyncSession.run_sync). RequestMetricsMiddleware then:
+
+- adds a `Server-Timing` header with the query count, DB time and total time,
+- aggregates per-route counters and histograms served as Prometheus text at /metrics,
+- logs statements slower than SLOW_QUERY_MS with the *types* of their bound
+  parameters (never the values), and requests issuing more than
+  REQUEST_QUERY_WARN statements, which is how N-query patterns show up.
+
+Metrics are per worker process; scrape each worker or aggregate in Prometheus.
+"""
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from starlette.routing import Match
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+REQUEST_QUERY_WARN = int(os.getenv("REQUEST_QUERY_WARN", 25))
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+
+class RequestStats:
+    """Statements issued while serving one request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement = None
+
+    def record(self, statement, seconds):
+        # SQLite's explicit BEGIN (see database.py) isn't a query; other drivers begin
+        # implicitly. Its time, which includes waiting for the write lock, still counts.
+        if not statement.startswith("BEGIN"):
+            self.queries += 1
+        self.db_seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+
+_current_stats = ContextVar("request_db_stats", default=None)
+
+
+def _shape(parameters):
+    """Describe bound parameters by type, collapsing runs, e.g. ['str*3', 'date']."""
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    shapes = []
+    for value in parameters or ():
+        name = type(value).__name__
+        if shapes and shapes[-1][0] == name:
+            shapes[-1][1] += 1
+        else:
+            shapes.append([name, 1])
+    return [name if count == 1 else f"{name}*{count}" for name, count in shapes]
+
+
+def parameter_shapes(parameters, executemany):
+    if executemany:
+        return f"{len(parameters)} x {_shape(parameters[0]) if parameters else []}"
+    return _shape(parameters)
+
+
+def instrument_engine(engine):
+    """Time every statement executed on `engine` (sync or async) and attribute it to the current request."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_started"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, seconds)
+        if seconds * 1000 >= SLOW_QUERY_MS:
+            metrics.slow_query()
+            logger.warning(
+                f"Slow query ({seconds * 1000:.1f} ms): {' '.join(statement.split())} "
+                f"parameters={parameter_shapes(parameters, executemany)}"
+            )
+
+    return engine
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+
+class MetricsRegistry:
+    """Per-route request, query and DB-time metrics for this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}  # (method, route, status) -> count
+            self.durations = {}  # route -> Histogram of request seconds
+            self.query_counts = {}  # route -> Histogram of statements per request
+            self.db_seconds = {}  # route -> total DB seconds
+            self.slow_queries = 0
+
+    def slow_query(self):
+        with self._lock:
+            self.slow_queries += 1
+
+    def observe(self, method, route, status_code, seconds, stats):
+        with self._lock:
+            key = (method, route, str(status_code))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.durations.setdefault(route, Histogram(DURATION_BUCKETS)).observe(seconds)
+            self.query_counts.setdefault(route, Histogram(QUERY_COUNT_BUCKETS)).observe(stats.queries)
+            self.db_seconds[route] = self.db_seconds.get(route, 0.0) + stats.db_seconds
+
+    def render(self, extra_gauges=()):
+        """Prometheus text exposition format. `extra_gauges` is an iterable of (name, help, {labels: value})."""
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name, help_text, histograms):
+            header(name, "histogram", help_text)
+            for route, hist in sorted(histograms.items()):
+                for bound, count in zip(hist.buckets, hist.counts):
+                    lines.append(f'{name}_bucket{{route="{route}",le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{route="{route}",le="+Inf"}} {hist.count}')
+                lines.append(f'{name}_sum{{route="{route}"}} {hist.sum}')
+                lines.append(f'{name}_count{{route="{route}"}} {hist.count}')
+
+        with self._lock:
+            header("hrms_http_requests_total", "counter", "HTTP requests by method, route and status.")
+            for (method, route, status_code), count in sorted(self.requests.items()):
+                lines.append(f'hrms_http_requests_total{{method="{method}",route="{route}",status="{status_code}"}} {count}')
+            histogram("hrms_http_request_duration_seconds", "Request latency in seconds.", self.durations)
+            histogram("hrms_db_queries_per_request", "SQL statements issued per request.", self.query_counts)
+            header("hrms_db_seconds_total", "counter", "Time spent executing SQL, by route.")
+            for route, seconds in sorted(self.db_seconds.items()):
+                lines.append(f'hrms_db_seconds_total{{route="{route}"}} {seconds}')
+            header("hrms_db_slow_queries_total", "counter", "Statements slower than SLOW_QUERY_MS.")
+            lines.append(f"hrms_db_slow_queries_total {self.slow_queries}")
+
+        for name, help_text, samples in extra_gauges:
+            header(name, "gauge", help_text)
+            for labels, value in samples.items():
+                label_text = ",".join(f'{key}="{label}"' for key, label in labels)
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def _route_template(scope):
+    """The matched route's path template, looked up in the router for responses sent before routing."""
+    route = scope.get("route")
+    if route is None and "app" in scope:
+        # e.g. replays and rejections sent by IdempotencyMiddleware
+        partial = None
+        for candidate in scope["app"].router.routes:
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                route = candidate
+                break
+            if match == Match.PARTIAL and partial is None:
+                partial = candidate
+        route = route or partial
+    return getattr(route, "path", "unmatched")
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware collecting per-request query stats; see the module docstring."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if SERVER_TIMING_ENABLED:
+                    # Streaming responses send headers before their queries finish
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    timing = (
+                        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries", '
+                        f"app;dur={elapsed_ms:.2f}"
+                    )
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            route = _route_template(scope)
+            seconds = time.perf_counter() - started
+            metrics.observe(scope["method"], route, status_code, seconds, stats)
+            if stats.queries > REQUEST_QUERY_WARN:
+                logger.warning(
+                    f"{scope['method']} {route} issued {stats.queries} queries "
+                    f"({stats.db_seconds * 1000:.1f} ms in DB); slowest: {' '.join((stats.slowest_statement or '').split())}"
+                )
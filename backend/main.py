@@ -1,7 +1,7 @@
 import os
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 import logging
 from dotenv import load_dotenv
 
@@ -17,7 +17,14 @@ logger.info(f"Starting HRMS Lite API in {os.getenv('ENVIRONMENT', 'development')
 
 # Import models to register them
 import models
-from database import Base, engine
+from database import engine, async_engine, pool_stats
+from cache import response_cache
+from employee_cache import employee_cache
+from dashboard_stream import dashboard_stream
+from idempotency import IdempotencyMiddleware
+import replicas
+from replicas import ReadYourWritesMiddleware
+from instrumentation import RequestMetricsMiddleware, instrument_engine, metrics
 from routes.employees import router as employee_router
 from routes.attendance import router as attendance_router
 from routes.dashboard import router as dashboard_router
@@ -39,16 +46,34 @@ def get_allowed_origins():
 
 allowed_origins = get_allowed_origins()
 
+# Retried writes carrying an Idempotency-Key get the original response replayed.
+# Registered first so CORS and instrumentation wrap it and replays still get their headers.
+app.add_middleware(IdempotencyMiddleware)
+
+# After a successful write, the client reads from the primary until replicas catch up.
+# Wraps idempotency so replayed writes renew the cookie too.
+app.add_middleware(ReadYourWritesMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "Idempotent-Replayed", "X-Export-Watermark"],
 )
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Per-request query counts and DB time: Server-Timing headers, /metrics and slow-query logs
+app.add_middleware(RequestMetricsMiddleware)
+instrument_engine(engine)
+if async_engine is not None:
+    instrument_engine(async_engine)
+for replica in replicas.replica_set.replicas if replicas.replica_set else ():
+    instrument_engine(replica.engine)
+    if replica.async_engine is not None:
+        instrument_engine(replica.async_engine)
+
+# Tables are created and upgraded by migrations (python migrate.py), not at worker startup
 
 # Global exception handler
 @app.exception_handler(Exception)
@@ -64,7 +89,7 @@ app.include_router(attendance_router)
 app.include_router(dashboard_router)
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {
         "message": "HRMS Lite API is running",
         "docs": "/docs",
@@ -72,9 +97,65 @@ def read_root():
     }
 
 @app.get("/health")
-def health_check():
+async def health_check():
     return {"status": "healthy", "service": "hrms-lite"}
 
+@app.get("/health/cache")
+async def cache_stats():
+    """Response cache hit/miss/eviction counters for this worker."""
+    return response_cache.stats()
+
+@app.get("/health/employee-cache")
+async def employee_cache_stats():
+    """Employee existence cache hit rate, negative hits, evictions and invalidations for this worker."""
+    return employee_cache.stats()
+
+@app.get("/health/dashboard-stream")
+async def dashboard_stream_stats():
+    """Open dashboard streams, their channels and summary computations for this worker."""
+    return dashboard_stream.stats()
+
+@app.get("/health/pool")
+async def pool_health():
+    """Connection pool occupancy and checkout wait times for this worker."""
+    stats = {"sync": pool_stats(engine)}
+    if async_engine is not None:
+        stats["async"] = pool_stats(async_engine)
+    return stats
+
+@app.get("/health/replicas")
+async def replica_health():
+    """Read replica lag, health and read counts for this worker; null when no replicas are configured."""
+    return replicas.replica_set.stats() if replicas.replica_set else None
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus metrics for this worker: per-route requests, latency, query counts and DB time."""
+    pools = {"sync": engine}
+    if async_engine is not None:
+        pools["async"] = async_engine
+    pool_samples = {name: pool_stats(pool_engine) for name, pool_engine in pools.items()}
+    gauges = [
+        (f"hrms_db_pool_{key}", f"Connection pool {key.replace('_', ' ')}.",
+         {(("pool", name),): stats[key] for name, stats in pool_samples.items()})
+        for key in ("checked_out", "overflow", "size", "wait_seconds_max")
+    ]
+    cache = response_cache.stats()
+    gauges.append(("hrms_cache_hit_rate", "Response cache hit rate.", {(): cache["hit_rate"]}))
+    employees = employee_cache.stats()
+    gauges.append(("hrms_employee_cache_hit_rate", "Employee existence cache hit rate.", {(): employees["hit_rate"]}))
+    gauges.append(("hrms_employee_cache_entries", "Employee existence cache entries.", {(): employees["entries"]}))
+    gauges.append(("hrms_dashboard_stream_subscribers", "Open dashboard event streams.",
+                   {(): dashboard_stream.stats()["subscribers"]}))
+    if replicas.replica_set:
+        replica_samples = replicas.replica_set.stats()["replicas"]
+        gauges.append(("hrms_replica_healthy", "Whether the read replica is used for reads.",
+                       {(("replica", sample["name"]),): int(sample["healthy"]) for sample in replica_samples}))
+        gauges.append(("hrms_replica_lag_seconds", "Read replica lag at its last check.",
+                       {(("replica", sample["name"]),): sample["lag_seconds"]
+                        for sample in replica_samples if sample["lag_seconds"] is not None}))
+    return metrics.render(gauges)
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -1,31 +1,60 @@
 #!/usr/bin/env python
 """
 Database migration script for HRMS Lite
-This script recreates the database with the updated schema including the unique constraint on attendance
+Applies the versioned Alembic migrations in migrations/versions, upgrading the
+database in place without dropping data. Run it before starting new API workers
+(the Procfile does this in the release phase); the app itself never creates tables.
+
+Databases created before migrations existed (by create_all) have no version table;
+they are stamped at the initial revision and then upgraded like any other.
+
+    python migrate.py                 # upgrade to the latest revision
+    python migrate.py --revision 0002 # upgrade to a specific revision
+    alembic downgrade 0002            # downgrades go through the Alembic CLI
+    python migrate.py --sql           # print the SQL instead of running it
 """
+import argparse
 import os
-from sqlalchemy import create_engine, text
-from database import Base, DATABASE_URL
-from models.employee import Employee
-from models.attendance import Attendance
-
-def reset_database():
-    """Drop all tables and recreate them with updated schema"""
-    # Create engine
-    engine = create_engine(DATABASE_URL)
-    
-    # Drop all existing tables
-    print("Dropping existing tables...")
-    Base.metadata.drop_all(bind=engine)
-    
-    # Create all tables with new schema
-    print("Creating tables with updated schema...")
-    Base.metadata.create_all(bind=engine)
-    
-    print("Database migration completed successfully!")
-    print("Tables created:")
-    print("  - employees (with employee_id as unique primary key)")
-    print("  - attendance (with unique constraint on (employee_id, date))")
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
+from database import DATABASE_URL
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+INITIAL_REVISION = "0001"
+
+
+def alembic_config(connection=None):
+    config = Config(ALEMBIC_INI)
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def run_migrations(url=DATABASE_URL, revision="head"):
+    """Upgrade the database at `url` to `revision`, adopting pre-migration databases first."""
+    engine = create_engine(url)
+    try:
+        with engine.connect() as connection:
+            tables = set(inspect(connection).get_table_names())
+            connection.commit()  # let Alembic own the transactions from here
+            config = alembic_config(connection)
+            if "alembic_version" not in tables and "employees" in tables:
+                print(f"Existing unversioned database found; stamping revision {INITIAL_REVISION}")
+                command.stamp(config, INITIAL_REVISION)
+            command.upgrade(config, revision)
+    finally:
+        engine.dispose()
+
 
 if __name__ == "__main__":
-    reset_database()
+    parser = argparse.ArgumentParser(description="Apply HRMS Lite schema migrations")
+    parser.add_argument("--revision", default="head", help="Target revision (default: head)")
+    parser.add_argument("--sql", action="store_true", help="Print the upgrade SQL instead of executing it")
+    args = parser.parse_args()
+
+    if args.sql:
+        command.upgrade(alembic_config(), args.revision, sql=True)
+    else:
+        run_migrations(revision=args.revision)
+        print("Database migration completed successfully!")
@@ -0,0 +1,61 @@
+"""
+Alembic environment for HRMS Lite.
+Migrations run against config.attributes["connection"] when one is passed in (see
+migrate.py), otherwise against the sqlalchemy.url option or DATABASE_URL.
+"""
+import logging
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+import models  # noqa: F401  registers every table on Base.metadata
+from database import Base, DATABASE_URL
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+logger = logging.getLogger("alembic.env")
+target_metadata = Base.metadata
+
+
+def _configure(**kwargs):
+    context.configure(
+        target_metadata=target_metadata,
+        # One transaction per revision, so a failure leaves earlier revisions applied
+        transaction_per_migration=True,
+        # SQLite can't ALTER most things in place; batch mode copies the table instead
+        render_as_batch=True,
+        compare_type=True,
+        **kwargs
+    )
+
+
+def run_migrations_offline():
+    """Emit the migration SQL to stdout instead of executing it (`alembic upgrade head --sql`)."""
+    _configure(url=config.get_main_option("sqlalchemy.url") or DATABASE_URL, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    engine = create_engine(config.get_main_option("sqlalchemy.url") or DATABASE_URL, poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+    engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,69 @@
+"""
+Helpers for migrations that must run while the API keeps serving traffic.
+
+- create_index_online / drop_index_online use CREATE/DROP INDEX CONCURRENTLY on
+  PostgreSQL, which does not block writes. CONCURRENTLY can't run in a transaction,
+  so these step out of the revision's transaction into autocommit mode.
+- backfill_in_batches runs a data-copying statement once per key range, committing
+  each batch on its own so no single transaction holds locks on a large table.
+  id_ranges produces those key ranges for tables with an integer id.
+"""
+import logging
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+logger = logging.getLogger("alembic.online")
+
+# Rows per batch when backfilling by id range
+BACKFILL_BATCH_ROWS = int(os.getenv("MIGRATION_BATCH_ROWS", 50000))
+
+
+def _is_postgresql():
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def create_index_online(name, table, columns, unique=False):
+    """Create an index without blocking writes on PostgreSQL; a no-op if it already exists."""
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, columns, unique=unique, if_not_exists=True, postgresql_concurrently=True)
+    else:
+        op.create_index(name, table, columns, unique=unique, if_not_exists=True)
+
+
+def drop_index_online(name, table):
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+    else:
+        op.drop_index(name, table_name=table, if_exists=True)
+
+
+def backfill_in_batches(statement, batches, description):
+    """
+    Execute `statement` once per parameter dict in `batches`, each in its own transaction.
+    Re-running after an interruption is only safe if `statement` is idempotent per batch.
+    """
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        done = 0
+        for params in batches:
+            bind.execute(statement, params)  # autocommit: each batch commits on its own
+            done += 1
+            if done % 12 == 0:
+                logger.info(f"{description}: {done} batches done")
+        logger.info(f"{description}: complete ({done} batches)")
+
+
+def id_ranges(table, batch_rows=None):
+    """
+    {"low": ..., "high": ...} parameter dicts covering `table`.id in half-open ranges of
+    `batch_rows` ids, for statements filtering on `id >= :low AND id < :high`.
+    """
+    batch_rows = batch_rows or BACKFILL_BATCH_ROWS
+    first, last = op.get_bind().execute(sa.text(f"SELECT min(id), max(id) FROM {table}")).one()
+    if first is None:
+        return []
+    return [{"low": low, "high": low + batch_rows} for low in range(first, last + 1, batch_rows)]
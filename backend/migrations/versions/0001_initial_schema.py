@@ -0,0 +1,51 @@
+"""Initial schema: employees and attendance
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "employees",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("employee_id", sa.String(), nullable=False),
+        sa.Column("full_name", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("department", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_employees_id", "employees", ["id"])
+    op.create_index("ix_employees_employee_id", "employees", ["employee_id"], unique=True)
+    op.create_index("ix_employees_email", "employees", ["email"], unique=True)
+
+    op.create_table(
+        "attendance",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("employee_id", sa.String(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(["employee_id"], ["employees.employee_id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("employee_id", "date", name="uq_employee_attendance_date"),
+    )
+    op.create_index("ix_attendance_id", "attendance", ["id"])
+
+
+def downgrade():
+    op.drop_index("ix_attendance_id", table_name="attendance")
+    op.drop_table("attendance")
+    op.drop_index("ix_employees_email", table_name="employees")
+    op.drop_index("ix_employees_employee_id", table_name="employees")
+    op.drop_index("ix_employees_id", table_name="employees")
+    op.drop_table("employees")
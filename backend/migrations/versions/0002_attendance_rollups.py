@@ -0,0 +1,94 @@
+"""Attendance rollup tables, backfilled one month at a time
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+Each month is summarised by its own INSERT ... SELECT and committed separately,
+so a large attendance table is never locked by one long transaction. Attendance
+written while the backfill runs may be missed; run `python rebuild_rollups.py
+--check` once the new release is live.
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import backfill_in_batches
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+attendance = sa.table("attendance", sa.column("date", sa.Date))
+
+
+def _months(first, last):
+    month = first.replace(day=1)
+    while month <= last:
+        following = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+        yield {"month": month, "next_month": following}
+        month = following
+
+
+def _backfill():
+    if op.get_context().as_sql:
+        # Offline SQL scripts can't see the data; run rebuild_rollups.py after applying them
+        return
+    bind = op.get_bind()
+    first, last = bind.execute(sa.select(sa.func.min(attendance.c.date), sa.func.max(attendance.c.date))).one()
+    if first is None:
+        return
+
+    in_month = "attendance.date >= :month AND attendance.date < :next_month"
+    daily = sa.text(f"""
+        INSERT INTO attendance_daily_rollup (date, department, status, count)
+        SELECT attendance.date, employees.department, attendance.status, count(*)
+        FROM attendance JOIN employees ON employees.employee_id = attendance.employee_id
+        WHERE {in_month}
+        GROUP BY attendance.date, employees.department, attendance.status
+    """)
+    monthly = sa.text(f"""
+        INSERT INTO attendance_monthly_rollup (employee_id, month, status, count)
+        SELECT attendance.employee_id, :month, attendance.status, count(*)
+        FROM attendance
+        WHERE {in_month}
+        GROUP BY attendance.employee_id, attendance.status
+    """)
+    month_params = (sa.bindparam("month", type_=sa.Date), sa.bindparam("next_month", type_=sa.Date))
+    daily, monthly = daily.bindparams(*month_params), monthly.bindparams(*month_params)
+    months = list(_months(first, last))
+    backfill_in_batches(daily, months, "attendance_daily_rollup backfill")
+    backfill_in_batches(monthly, months, "attendance_monthly_rollup backfill")
+
+
+def upgrade():
+    # Databases that ran create_all() already have maintained rollups; leave them alone
+    if not op.get_context().as_sql:
+        existing = set(sa.inspect(op.get_bind()).get_table_names())
+        if {"attendance_daily_rollup", "attendance_monthly_rollup"} <= existing:
+            return
+
+    op.create_table(
+        "attendance_daily_rollup",
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("department", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("date", "department", "status"),
+    )
+    op.create_table(
+        "attendance_monthly_rollup",
+        sa.Column("employee_id", sa.String(), nullable=False),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("employee_id", "month", "status"),
+    )
+    _backfill()
+
+
+def downgrade():
+    op.drop_table("attendance_monthly_rollup")
+    op.drop_table("attendance_daily_rollup")
@@ -0,0 +1,29 @@
+"""Employee search and attendance range indexes, built online
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from migrations.online import create_index_online, drop_index_online
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("ix_employees_full_name", "employees", ["full_name"]),
+    ("ix_employees_department", "employees", ["department"]),
+    ("ix_attendance_date_status", "attendance", ["date", "status"]),
+    ("ix_attendance_employee_date_status", "attendance", ["employee_id", "date", "status"]),
+)
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        create_index_online(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        drop_index_online(name, table)
@@ -0,0 +1,69 @@
+"""Cascade attendance deletes from employees and add employees.deleted_at
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+PostgreSQL swaps the foreign key for an ON DELETE CASCADE one created NOT VALID,
+which only briefly locks the tables, and validates it afterwards outside the
+revision's transaction while writes continue. SQLite can't alter a foreign key,
+so attendance is copied into a new table that has it.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+FOREIGN_KEY = "attendance_employee_id_fkey"
+
+
+def _attendance_table(ondelete):
+    """The attendance table as of revision 0003, with the given ON DELETE rule."""
+    return sa.Table(
+        "attendance", sa.MetaData(),
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("employee_id", sa.String(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(["employee_id"], ["employees.employee_id"], name=FOREIGN_KEY, ondelete=ondelete),
+        sa.UniqueConstraint("employee_id", "date", name="uq_employee_attendance_date"),
+        sa.Index("ix_attendance_id", "id"),
+        sa.Index("ix_attendance_date_status", "date", "status"),
+        sa.Index("ix_attendance_employee_date_status", "employee_id", "date", "status"),
+    )
+
+
+def _replace_foreign_key(ondelete):
+    if op.get_bind().dialect.name != "postgresql":
+        with op.batch_alter_table("attendance", recreate="always", copy_from=_attendance_table(ondelete)):
+            pass
+        return
+
+    op.drop_constraint(FOREIGN_KEY, "attendance", type_="foreignkey")
+    op.create_foreign_key(
+        FOREIGN_KEY, "attendance", "employees", ["employee_id"], ["employee_id"],
+        ondelete=ondelete, postgresql_not_valid=True
+    )
+    with op.get_context().autocommit_block():
+        op.execute(f"ALTER TABLE attendance VALIDATE CONSTRAINT {FOREIGN_KEY}")
+
+
+def upgrade():
+    # Databases adopted from create_all (see migrate.py) may already have the column,
+    # and ones created from revision 0005's models already have a cascading key
+    context = op.get_context()
+    inspector = None if context.as_sql else sa.inspect(op.get_bind())
+    if inspector is None or "deleted_at" not in {column["name"] for column in inspector.get_columns("employees")}:
+        op.add_column("employees", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True))
+    if inspector is None or FOREIGN_KEY in {key["name"] for key in inspector.get_foreign_keys("attendance")}:
+        _replace_foreign_key("CASCADE")
+
+
+def downgrade():
+    _replace_foreign_key(None)
+    with op.batch_alter_table("employees") as batch:
+        batch.drop_column("deleted_at")
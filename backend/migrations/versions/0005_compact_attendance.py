@@ -0,0 +1,247 @@
+"""Compact attendance rows: integer employee key and SMALLINT status
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+attendance.employee_id, the employee's string ID, is replaced by employee_pk, a
+foreign key to employees.id, and attendance.status becomes a SMALLINT code (1 Present,
+2 Absent; see models/attendance.py). The redundant index on attendance.id is dropped.
+
+PostgreSQL converts attendance in place while the previous release keeps writing: the
+new columns are added and kept filled by a trigger, existing rows are backfilled one id
+range per transaction, the new indexes are built CONCURRENTLY and the new constraints
+are validated without blocking writes. The closing swap only drops and renames. SQLite
+copies attendance into a new table one id range per transaction, with triggers
+mirroring writes made meanwhile, and swaps the tables. Attendance rows whose employee
+doesn't exist stop the migration on both: PostgreSQL fails to validate the new
+constraints, SQLite checks that the copy is complete before the swap.
+
+Attendance writes from the previous release fail once the swap commits, until its
+workers are replaced, so run this in the release phase (see migrate.py).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import backfill_in_batches, create_index_online, id_ranges
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+LEGACY_FOREIGN_KEY = "attendance_employee_id_fkey"
+FOREIGN_KEY = "attendance_employee_pk_fkey"
+UNIQUE = "uq_employee_attendance_date"
+FILLED_CHECK = "ck_attendance_compact_filled"
+INDEXES = (
+    ("ix_attendance_date_status", ["date", "status"]),
+    ("ix_attendance_employee_date_status", ["employee_pk", "date", "status"]),
+)
+
+# Status codes as of this revision
+STATUS_CODE = "CASE {} WHEN 'Present' THEN 1 WHEN 'Absent' THEN 2 END"
+STATUS_NAME = "CASE {} WHEN 1 THEN 'Present' WHEN 2 THEN 'Absent' END"
+IN_RANGE = "attendance.id >= :low AND attendance.id < :high"
+SQLITE_TRIGGERS = ("insert", "update", "delete")
+
+
+def _attendance_columns(compact):
+    if compact:
+        return [
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("employee_pk", sa.Integer(), nullable=False),
+            sa.Column("date", sa.Date(), nullable=False),
+            sa.Column("status", sa.SmallInteger(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+            sa.ForeignKeyConstraint(["employee_pk"], ["employees.id"], name=FOREIGN_KEY, ondelete="CASCADE"),
+            sa.UniqueConstraint("employee_pk", "date", name=UNIQUE),
+        ]
+    return [
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("employee_id", sa.String(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(
+            ["employee_id"], ["employees.employee_id"], name=LEGACY_FOREIGN_KEY, ondelete="CASCADE"
+        ),
+        sa.UniqueConstraint("employee_id", "date", name=UNIQUE),
+    ]
+
+
+def _backfill(statement, description):
+    statement = sa.text(statement)
+    if op.get_context().as_sql:
+        # Offline SQL scripts can't see the data; one statement covers every row
+        op.execute(statement.bindparams(low=0, high=2 ** 31))
+    else:
+        backfill_in_batches(statement, id_ranges("attendance"), description)
+
+
+def _upgrade_postgresql():
+    op.add_column("attendance", sa.Column("employee_pk", sa.Integer(), nullable=True))
+    op.add_column("attendance", sa.Column("status_code", sa.SmallInteger(), nullable=True))
+    # Fills the new columns on rows the previous release writes from here on
+    op.execute(f"""
+        CREATE FUNCTION attendance_fill_compact() RETURNS trigger AS $$
+        BEGIN
+            NEW.employee_pk := (SELECT id FROM employees WHERE employees.employee_id = NEW.employee_id);
+            NEW.status_code := {STATUS_CODE.format("NEW.status")};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER attendance_fill_compact BEFORE INSERT OR UPDATE OF employee_id, status ON attendance
+        FOR EACH ROW EXECUTE FUNCTION attendance_fill_compact()
+    """)
+
+    _backfill(f"""
+        UPDATE attendance SET
+            employee_pk = (SELECT employees.id FROM employees WHERE employees.employee_id = attendance.employee_id),
+            status_code = {STATUS_CODE.format("attendance.status")}
+        WHERE {IN_RANGE} AND attendance.employee_pk IS NULL
+    """, "attendance employee_pk/status backfill")
+
+    # Built under temporary names next to the old ones; the swap renames them
+    create_index_online("uq_attendance_employee_pk_date", "attendance", ["employee_pk", "date"], unique=True)
+    create_index_online("ix_attendance_date_status_code", "attendance", ["date", "status_code"])
+    create_index_online("ix_attendance_employee_pk_date_status", "attendance", ["employee_pk", "date", "status_code"])
+    op.create_foreign_key(
+        FOREIGN_KEY, "attendance", "employees", ["employee_pk"], ["id"], ondelete="CASCADE", postgresql_not_valid=True
+    )
+    # A validated CHECK lets SET NOT NULL skip its table scan (PostgreSQL 12+)
+    op.execute(
+        f"ALTER TABLE attendance ADD CONSTRAINT {FILLED_CHECK} "
+        "CHECK (employee_pk IS NOT NULL AND status_code IS NOT NULL) NOT VALID"
+    )
+    with op.get_context().autocommit_block():
+        op.execute(f"ALTER TABLE attendance VALIDATE CONSTRAINT {FOREIGN_KEY}")
+        op.execute(f"ALTER TABLE attendance VALIDATE CONSTRAINT {FILLED_CHECK}")
+
+    op.execute("DROP TRIGGER attendance_fill_compact ON attendance")
+    op.execute("DROP FUNCTION attendance_fill_compact()")
+    op.drop_constraint(UNIQUE, "attendance", type_="unique")
+    op.drop_constraint(LEGACY_FOREIGN_KEY, "attendance", type_="foreignkey")
+    op.drop_index("ix_attendance_id", table_name="attendance", if_exists=True)
+    # Dropping the columns drops the old indexes on them
+    op.drop_column("attendance", "employee_id")
+    op.drop_column("attendance", "status")
+    op.alter_column("attendance", "employee_pk", nullable=False)
+    op.alter_column("attendance", "status_code", nullable=False)
+    op.alter_column("attendance", "status_code", new_column_name="status")
+    op.drop_constraint(FILLED_CHECK, "attendance", type_="check")
+    op.execute(f"ALTER TABLE attendance ADD CONSTRAINT {UNIQUE} UNIQUE USING INDEX uq_attendance_employee_pk_date")
+    op.execute("ALTER INDEX ix_attendance_date_status_code RENAME TO ix_attendance_date_status")
+    op.execute("ALTER INDEX ix_attendance_employee_pk_date_status RENAME TO ix_attendance_employee_date_status")
+
+
+def _check_copied_everything():
+    """Abort before the swap if the copy skipped rows, as PostgreSQL's validation does.
+
+    The copy joins employees, so it skips attendance rows whose employee_id matches
+    no employee: SQLite doesn't enforce foreign keys unless asked to, and databases
+    written without them can hold such rows. Dropping them silently would lose data.
+    """
+    if op.get_context().as_sql:
+        return
+    orphans = op.get_bind().execute(sa.text("""
+        SELECT attendance.employee_id, COUNT(*) FROM attendance
+        WHERE NOT EXISTS (SELECT 1 FROM attendance_compact WHERE attendance_compact.id = attendance.id)
+        GROUP BY attendance.employee_id ORDER BY attendance.employee_id
+    """)).all()
+    if orphans:
+        counts = ", ".join(f"{employee_id} ({count})" for employee_id, count in orphans)
+        raise RuntimeError(
+            f"{sum(count for _, count in orphans)} attendance rows reference employees that don't exist: "
+            f"{counts}. Delete them or add the employees, then run the migration again."
+        )
+
+
+def _upgrade_sqlite():
+    # Leftovers of an interrupted run
+    for trigger in SQLITE_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS attendance_compact_{trigger}")
+    op.execute("DROP TABLE IF EXISTS attendance_compact")
+
+    op.create_table("attendance_compact", *_attendance_columns(compact=True))
+    insert = "INSERT OR REPLACE INTO attendance_compact (id, employee_pk, date, status, created_at)"
+    # Mirror writes made while the copy runs
+    for trigger in ("insert", "update"):
+        op.execute(f"""
+            CREATE TRIGGER attendance_compact_{trigger} AFTER {trigger.upper()} ON attendance BEGIN
+                {insert}
+                SELECT NEW.id, employees.id, NEW.date, {STATUS_CODE.format("NEW.status")}, NEW.created_at
+                FROM employees WHERE employees.employee_id = NEW.employee_id;
+            END
+        """)
+    op.execute("""
+        CREATE TRIGGER attendance_compact_delete AFTER DELETE ON attendance BEGIN
+            DELETE FROM attendance_compact WHERE id = OLD.id;
+        END
+    """)
+
+    _backfill(f"""
+        {insert}
+        SELECT attendance.id, employees.id, attendance.date, {STATUS_CODE.format("attendance.status")},
+            attendance.created_at
+        FROM attendance JOIN employees ON employees.employee_id = attendance.employee_id
+        WHERE {IN_RANGE}
+    """, "attendance copy")
+
+    _check_copied_everything()
+    op.drop_table("attendance")  # Drops the triggers with it
+    op.rename_table("attendance_compact", "attendance")
+    for name, columns in INDEXES:
+        op.create_index(name, "attendance", columns)
+
+
+def upgrade():
+    # Databases adopted from create_all (see migrate.py) may already be compact
+    if not op.get_context().as_sql and "employee_pk" in {
+        column["name"] for column in sa.inspect(op.get_bind()).get_columns("attendance")
+    }:
+        return
+    if op.get_bind().dialect.name == "postgresql":
+        _upgrade_postgresql()
+    else:
+        _upgrade_sqlite()
+
+
+def downgrade():
+    # Not online: the previous release can't read compact rows anyway
+    if op.get_bind().dialect.name == "postgresql":
+        op.add_column("attendance", sa.Column("employee_id", sa.String(), nullable=True))
+        op.add_column("attendance", sa.Column("status_name", sa.String(), nullable=True))
+        op.execute(f"""
+            UPDATE attendance SET
+                employee_id = (SELECT employees.employee_id FROM employees WHERE employees.id = attendance.employee_pk),
+                status_name = {STATUS_NAME.format("attendance.status")}
+        """)
+        op.drop_constraint(UNIQUE, "attendance", type_="unique")
+        op.drop_constraint(FOREIGN_KEY, "attendance", type_="foreignkey")
+        op.drop_column("attendance", "employee_pk")
+        op.drop_column("attendance", "status")
+        op.alter_column("attendance", "employee_id", nullable=False)
+        op.alter_column("attendance", "status_name", nullable=False)
+        op.alter_column("attendance", "status_name", new_column_name="status")
+        op.create_unique_constraint(UNIQUE, "attendance", ["employee_id", "date"])
+        op.create_foreign_key(
+            LEGACY_FOREIGN_KEY, "attendance", "employees", ["employee_id"], ["employee_id"], ondelete="CASCADE"
+        )
+    else:
+        op.create_table("attendance_legacy", *_attendance_columns(compact=False))
+        op.execute(f"""
+            INSERT INTO attendance_legacy (id, employee_id, date, status, created_at)
+            SELECT attendance.id, employees.employee_id, attendance.date,
+                {STATUS_NAME.format("attendance.status")}, attendance.created_at
+            FROM attendance JOIN employees ON employees.id = attendance.employee_pk
+        """)
+        op.drop_table("attendance")
+        op.rename_table("attendance_legacy", "attendance")
+    op.create_index("ix_attendance_id", "attendance", ["id"])
+    op.create_index("ix_attendance_date_status", "attendance", ["date", "status"])
+    op.create_index("ix_attendance_employee_date_status", "attendance", ["employee_id", "date", "status"])
@@ -0,0 +1,127 @@
+"""Partition attendance by month on PostgreSQL
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+attendance becomes a table range partitioned on date (see partitions.py). The
+existing table is attached as the partition attendance_history, covering every date
+before the month after the later of today and the newest record, so no row moves:
+the unique (id, date) index it needs is built CONCURRENTLY and a CHECK on its bound
+is validated without blocking writes, which lets the attach skip its scan. The
+closing swap only renames and attaches. Later months get partitions of their own and
+attendance_default takes dates past the last one. The primary key becomes
+(id, date), since PostgreSQL requires the partition key in every unique constraint;
+ids still come from attendance_id_seq.
+
+Offline (--sql) scripts bound attendance_history by today's date and create no
+monthly partitions; run partitions.py afterwards. SQLite has no partitioning and is
+left alone; archive.py keeps its attendance table bounded.
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import create_index_online
+from partitions import DEFAULT_PARTITION, add_months, ensure_partitions, is_partitioned
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+HISTORY = "attendance_history"
+BOUNDS_CHECK = "ck_attendance_history_bounds"
+FOREIGN_KEY = "attendance_employee_pk_fkey"
+UNIQUE = "uq_employee_attendance_date"
+INDEXES = (
+    ("ix_attendance_date_status", ["date", "status"]),
+    ("ix_attendance_employee_date_status", ["employee_pk", "date", "status"]),
+)
+# Names the old table's constraints and indexes take as the history partition, freeing
+# the originals for the partitioned table
+HISTORY_CONSTRAINTS = ((UNIQUE, f"{HISTORY}_employee_pk_date_key"),)
+HISTORY_INDEXES = (
+    ("ix_attendance_date_status", f"{HISTORY}_date_status_idx"),
+    ("ix_attendance_employee_date_status", f"{HISTORY}_employee_pk_date_status_idx"),
+)
+
+
+def _boundary():
+    """First day of the month after the later of today and the newest record."""
+    latest = date.today()
+    if not op.get_context().as_sql:
+        newest = op.get_bind().execute(sa.text("SELECT max(date) FROM attendance")).scalar()
+        latest = max(latest, newest or latest)
+    return add_months(latest.replace(day=1), 1)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    context = op.get_context()
+    if not context.as_sql and is_partitioned(op.get_bind()):
+        return
+    boundary = _boundary()
+
+    # Built under temporary names; the swap renames them
+    op.execute(f"""
+        CREATE TABLE attendance_partitioned (
+            id integer NOT NULL DEFAULT nextval('attendance_id_seq'::regclass),
+            employee_pk integer NOT NULL,
+            date date NOT NULL,
+            status smallint NOT NULL,
+            created_at timestamp with time zone DEFAULT now(),
+            CONSTRAINT attendance_partitioned_pkey PRIMARY KEY (id, date),
+            CONSTRAINT uq_attendance_partitioned UNIQUE (employee_pk, date),
+            CONSTRAINT {FOREIGN_KEY} FOREIGN KEY (employee_pk) REFERENCES employees (id) ON DELETE CASCADE
+        ) PARTITION BY RANGE (date)
+    """)
+    for name, columns in INDEXES:
+        op.execute(f"CREATE INDEX {name}_partitioned ON attendance_partitioned ({', '.join(columns)})")
+
+    # ATTACH PARTITION reuses the partition's matching indexes and skips its scan when a
+    # validated CHECK implies the bound; both are prepared while writes continue
+    create_index_online(f"{HISTORY}_pkey", "attendance", ["id", "date"], unique=True)
+    op.execute(f"ALTER TABLE attendance ADD CONSTRAINT {BOUNDS_CHECK} CHECK (date < '{boundary}') NOT VALID")
+    with context.autocommit_block():
+        op.execute(f"ALTER TABLE attendance VALIDATE CONSTRAINT {BOUNDS_CHECK}")
+
+    op.execute("LOCK TABLE attendance IN ACCESS EXCLUSIVE MODE")
+    # The parent's primary key attaches to a partition constraint on the same columns
+    op.execute("ALTER TABLE attendance DROP CONSTRAINT attendance_pkey")
+    op.execute(f"ALTER TABLE attendance ADD CONSTRAINT {HISTORY}_pkey PRIMARY KEY USING INDEX {HISTORY}_pkey")
+    op.execute(f"ALTER TABLE attendance RENAME TO {HISTORY}")
+    for old, new in HISTORY_CONSTRAINTS:
+        op.execute(f"ALTER TABLE {HISTORY} RENAME CONSTRAINT {old} TO {new}")
+    for old, new in HISTORY_INDEXES:
+        op.execute(f"ALTER INDEX {old} RENAME TO {new}")
+
+    op.execute("ALTER TABLE attendance_partitioned RENAME TO attendance")
+    op.execute("ALTER TABLE attendance RENAME CONSTRAINT attendance_partitioned_pkey TO attendance_pkey")
+    op.execute(f"ALTER TABLE attendance RENAME CONSTRAINT uq_attendance_partitioned TO {UNIQUE}")
+    for name, _ in INDEXES:
+        op.execute(f"ALTER INDEX {name}_partitioned RENAME TO {name}")
+    op.execute(f"ALTER TABLE attendance ATTACH PARTITION {HISTORY} FOR VALUES FROM (MINVALUE) TO ('{boundary}')")
+    op.execute(f"ALTER TABLE {HISTORY} DROP CONSTRAINT {BOUNDS_CHECK}")
+    op.execute("ALTER SEQUENCE attendance_id_seq OWNED BY attendance.id")
+    op.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF attendance DEFAULT")
+    if not context.as_sql:
+        ensure_partitions(op.get_bind())
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    # Not online: copies every row into a plain table
+    op.execute("CREATE TABLE attendance_plain (LIKE attendance INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO attendance_plain SELECT * FROM attendance")
+    op.execute("ALTER SEQUENCE attendance_id_seq OWNED BY attendance_plain.id")
+    op.execute("DROP TABLE attendance")  # Drops every partition with it
+    op.execute("ALTER TABLE attendance_plain RENAME TO attendance")
+    op.create_primary_key("attendance_pkey", "attendance", ["id"])
+    op.create_foreign_key(FOREIGN_KEY, "attendance", "employees", ["employee_pk"], ["id"], ondelete="CASCADE")
+    op.create_unique_constraint(UNIQUE, "attendance", ["employee_pk", "date"])
+    for name, columns in INDEXES:
+        op.create_index(name, "attendance", columns)
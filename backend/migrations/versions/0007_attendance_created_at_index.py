@@ -0,0 +1,57 @@
+"""Index attendance on created_at for incremental exports, built online
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+export.py fetches rows created since the previous run by created_at. PostgreSQL
+can't build an index on a partitioned table CONCURRENTLY, so when attendance is
+partitioned (0006) the parent's index is created ON ONLY, each partition's index is
+built concurrently and attached, and partitions created later get theirs when they
+are attached. Offline (--sql) scripts build the index directly, blocking writes.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import create_index_online, drop_index_online
+from partitions import is_partitioned
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+INDEX = "ix_attendance_created_at"
+
+
+def _partitions():
+    return op.get_bind().execute(sa.text("""
+        SELECT child.relname
+        FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'attendance'::regclass
+    """)).scalars().all()
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or not (op.get_context().as_sql or is_partitioned(bind)):
+        create_index_online(INDEX, "attendance", ["created_at"])
+        return
+    if op.get_context().as_sql:
+        op.create_index(INDEX, "attendance", ["created_at"])
+        return
+    op.execute(f"CREATE INDEX IF NOT EXISTS {INDEX} ON ONLY attendance (created_at)")
+    for partition in _partitions():
+        child = f"{partition}_created_at_idx"
+        with op.get_context().autocommit_block():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition} (created_at)")
+        op.execute(f"ALTER INDEX {INDEX} ATTACH PARTITION {child}")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql" and (op.get_context().as_sql or is_partitioned(bind)):
+        # Dropping a partitioned index drops its partitions' indexes; not CONCURRENTLY
+        op.drop_index(INDEX, table_name="attendance", if_exists=True)
+    else:
+        drop_index_online(INDEX, "attendance")
@@ -0,0 +1,36 @@
+"""Idempotency-Key store shared by every worker
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+The default Idempotency-Key store (see idempotency.py) keeps reservations and stored
+responses in this table, so a retry that reaches another worker is still replayed.
+The table is new and empty, so creating it doesn't block anything.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases adopted from create_all (see migrate.py) already have the table
+    if not op.get_context().as_sql and "idempotency_keys" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("value", sa.Text(), nullable=False),
+        sa.Column("expires_at", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index("ix_idempotency_keys_expires_at", "idempotency_keys", ["expires_at"])
+
+
+def downgrade():
+    op.drop_index("ix_idempotency_keys_expires_at", table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
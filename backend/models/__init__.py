@@ -2,7 +2,7 @@
 # Note: order matters due to foreign key relationships
 from .employee import Employee
 from .attendance import Attendance
+from .rollup import AttendanceDailyRollup, AttendanceMonthlyRollup
+from .idempotency import IdempotencyKey
 
-__all__ = ["Employee", "Attendance"]
-
-
+__all__ = ["Employee", "Attendance", "AttendanceDailyRollup", "AttendanceMonthlyRollup", "IdempotencyKey"]
@@ -1,22 +1,68 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, SmallInteger, Date, ForeignKey, DateTime, UniqueConstraint, Index, case, type_coerce
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 from database import Base
 
+# Stored SMALLINT code of each status; the digits match the attendance calendar legend
+STATUS_CODES = {"Present": 1, "Absent": 2}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+
+class StatusCode(TypeDecorator):
+    """An attendance status stored as a SMALLINT code; Python code and the API see "Present"/"Absent"."""
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        # AttendanceStatus members are str enums; their hash isn't the string's
+        name = getattr(value, "value", value)
+        if name not in STATUS_CODES:
+            raise ValueError(f"Unknown attendance status {name!r}")
+        return STATUS_CODES[name]
+
+    def process_literal_param(self, value, dialect):
+        return str(self.process_bind_param(value, dialect))
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else STATUS_NAMES[value]
+
+
+def status_name(status):
+    """SQL expression for the status string of a StatusCode column, for copying into string columns in SQL."""
+    return case(STATUS_NAMES, value=type_coerce(status, SmallInteger))
+
 
 class Attendance(Base):
     __tablename__ = "attendance"
 
-    id = Column(Integer, primary_key=True, index=True)
-    employee_id = Column(String, ForeignKey("employees.employee_id"), nullable=False)
+    id = Column(Integer, primary_key=True)
+    # The employee's integer primary key rather than the employee_id string: a fixed four
+    # bytes in every row and index entry. The API still speaks employee_id; routes join
+    # employees (or resolve the key once) to translate.
+    # Named as PostgreSQL names it by default, so violations can be mapped on every dialect.
+    # Deleting an employee deletes their history in the database, without loading it.
+    employee_pk = Column(
+        Integer,
+        ForeignKey("employees.id", name="attendance_employee_pk_fkey", ondelete="CASCADE"),
+        nullable=False
+    )
     date = Column(Date, nullable=False)
-    status = Column(String, nullable=False)  # "Present" or "Absent"
+    status = Column(StatusCode, nullable=False)  # "Present" or "Absent"
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     employee = relationship("Employee", back_populates="attendance_records")
 
     __table_args__ = (
-        UniqueConstraint('employee_id', 'date', name='uq_employee_attendance_date'),
+        UniqueConstraint('employee_pk', 'date', name='uq_employee_attendance_date'),
+        # Date-range reports across all employees, optionally narrowed by status
+        Index('ix_attendance_date_status', 'date', 'status'),
+        # Per-employee history and summaries; includes status so they never touch the table
+        Index('ix_attendance_employee_date_status', 'employee_pk', 'date', 'status'),
+        # Incremental exports of the rows created since the previous run (see export.py)
+        Index('ix_attendance_created_at', 'created_at'),
     )
 
     def __repr__(self):
-        return f"<Attendance(employee_id={self.employee_id}, date={self.date}, status={self.status})>"
+        return f"<Attendance(employee_pk={self.employee_pk}, date={self.date}, status={self.status})>"
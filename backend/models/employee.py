@@ -9,13 +9,18 @@ class Employee(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(String, unique=True, index=True, nullable=False)
-    full_name = Column(String, nullable=False)
+    full_name = Column(String, index=True, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
-    department = Column(String, nullable=False)
+    department = Column(String, index=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set when a background delete starts; the row and its history are purged later (see purge.py)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
 
-    # Relationship with attendance records - using string reference to avoid circular imports at import time
-    attendance_records = relationship("Attendance", back_populates="employee", cascade="all, delete-orphan")
+    # Relationship with attendance records - using string reference to avoid circular imports at import time.
+    # passive_deletes leaves removing the records to ON DELETE CASCADE instead of loading them
+    attendance_records = relationship(
+        "Attendance", back_populates="employee", cascade="all, delete-orphan", passive_deletes=True
+    )
 
     def __repr__(self):
         return f"<Employee(employee_id={self.employee_id}, full_name={self.full_name})>"
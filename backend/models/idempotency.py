@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Float, String, Text
+from database import Base
+
+
+# Reservations and stored responses of the Idempotency-Key store (see idempotency.py)
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String, primary_key=True)
+    value = Column(Text, nullable=False)  # JSON
+    expires_at = Column(Float, index=True, nullable=False)  # Unix time
+
+    def __repr__(self):
+        return f"<IdempotencyKey(key={self.key}, expires_at={self.expires_at})>"
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Date
+from database import Base
+
+
+# Attendance counts per (date, department, status), maintained on every attendance write
+class AttendanceDailyRollup(Base):
+    __tablename__ = "attendance_daily_rollup"
+
+    date = Column(Date, primary_key=True)
+    department = Column(String, primary_key=True)
+    status = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<AttendanceDailyRollup(date={self.date}, department={self.department}, status={self.status}, count={self.count})>"
+
+
+# Attendance counts per (employee_id, month, status); `month` is the first day of the month
+class AttendanceMonthlyRollup(Base):
+    __tablename__ = "attendance_monthly_rollup"
+
+    employee_id = Column(String, primary_key=True)
+    month = Column(Date, primary_key=True)
+    status = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<AttendanceMonthlyRollup(employee_id={self.employee_id}, month={self.month}, status={self.status}, count={self.count})>"
@@ -0,0 +1,40 @@
+"""
+Keyset (cursor) pagination helpers.
+Cursors are opaque URL-safe tokens wrapping the sort key of the last row returned,
+so the next page is a range seek on an index instead of an OFFSET scan.
+"""
+import base64
+import json
+from datetime import date
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*values):
+    """Encode the sort key values of the last row on a page."""
+    payload = [value.isoformat() if isinstance(value, date) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def _parse_key(value, kind):
+    """`value` from a decoded cursor as a `kind` (int, str or date); ValueError if it isn't one."""
+    if kind is date:
+        if isinstance(value, str):
+            return date.fromisoformat(value)
+    elif isinstance(value, kind) and not isinstance(value, bool):
+        return value
+    raise ValueError(f"Expected {kind.__name__}, got {value!r}")
+
+
+def decode_cursor(cursor, *kinds):
+    """Decode a cursor into its key values, one of each of `kinds` (int, str or date); 400 if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if isinstance(values, list) and len(values) == len(kinds):
+            return [_parse_key(value, kind) for value, kind in zip(values, kinds)]
+    except (ValueError, TypeError):
+        pass
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor"
+    )
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+Monthly attendance partitions for HRMS Lite on PostgreSQL.
+
+Migration 0006 turns attendance into a table range partitioned on date: the rows
+that existed then live in attendance_history, every later month gets its own
+partition (attendance_y2026m03 for March 2026) and attendance_default catches
+dates no partition covers yet. Queries over a date range only touch the partitions
+it overlaps, and archive.py drops a month's partition once it is archived instead
+of deleting its rows one by one.
+
+Partitions are created PARTITION_MONTHS_AHEAD months ahead. Run this script in the
+release phase and monthly (cron); rows that reached attendance_default for a month
+are moved into the month's partition when it is created. SQLite has no
+partitioning, so this is a no-op there; the models describe the logical table.
+"""
+import argparse
+import os
+import re
+from datetime import date
+
+from sqlalchemy import text
+
+from database import engine
+
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", 3))
+DEFAULT_PARTITION = "attendance_default"
+_BOUND = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"attendance_y{month.year}m{month.month:02d}"
+
+
+def is_partitioned(connection):
+    if connection.dialect.name != "postgresql":
+        return False
+    return connection.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass('attendance')")
+    ).scalar() == "p"
+
+
+def partition_bounds(connection):
+    """Range partitions of attendance as name -> (from, to); None stands for MINVALUE."""
+    rows = connection.execute(text("""
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+        FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'attendance'::regclass
+    """))
+    bounds = {}
+    for name, bound in rows:
+        match = _BOUND.search(bound)
+        if match is None:  # The DEFAULT partition
+            continue
+        low, high = (
+            None if value == "MINVALUE" else date.fromisoformat(value.strip("'")) for value in match.groups()
+        )
+        bounds[name] = (low, high)
+    return bounds
+
+
+def create_partition(connection, month):
+    """
+    Create `month`'s partition, moving its rows out of the default partition, without
+    committing. Building it detached and attaching it afterwards keeps the parent
+    locked only for the attach.
+    """
+    name, end = partition_name(month), add_months(month, 1)
+    in_month = "date >= :start AND date < :end"
+    connection.execute(text(f"CREATE TABLE {name} (LIKE attendance INCLUDING DEFAULTS)"))
+    connection.execute(
+        text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_month}"), {"start": month, "end": end}
+    )
+    connection.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_month}"), {"start": month, "end": end})
+    connection.execute(text(
+        f"ALTER TABLE attendance ATTACH PARTITION {name} FOR VALUES FROM ('{month}') TO ('{end}')"
+    ))
+    return name
+
+
+def ensure_partitions(connection, months_ahead=PARTITION_MONTHS_AHEAD, today=None):
+    """
+    Create monthly partitions from the end of the last one through `months_ahead`
+    months past the current month, without committing. Returns the names created;
+    none unless attendance is partitioned.
+    """
+    if not is_partitioned(connection):
+        return []
+    this_month = (today or date.today()).replace(day=1)
+    # Starts where the existing partitions end, so months missed since then are created too
+    month = max((high for _, high in partition_bounds(connection).values()), default=this_month)
+    created = []
+    while month <= add_months(this_month, months_ahead):
+        created.append(create_partition(connection, month))
+        month = add_months(month, 1)
+    return created
+
+
+def drop_month(connection, month, max_id):
+    """
+    Detach and drop `month`'s partition if it has one of its own and no row newer than
+    `max_id` (a write racing the archive), without committing. Returns whether it did;
+    callers delete the month's rows otherwise.
+    """
+    name = partition_name(month)
+    if not is_partitioned(connection) or partition_bounds(connection).get(name) != (month, add_months(month, 1)):
+        return False
+    # Writes to the partition wait from here until the drop commits
+    connection.execute(text(f"LOCK TABLE {name} IN SHARE MODE"))
+    if connection.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name} WHERE id > :max_id)"), {"max_id": max_id}).scalar():
+        return False
+    connection.execute(text(f"ALTER TABLE attendance DETACH PARTITION {name}"))
+    connection.execute(text(f"DROP TABLE {name}"))
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create upcoming monthly attendance partitions (PostgreSQL)")
+    parser.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    args = parser.parse_args()
+
+    with engine.begin() as connection:
+        if not is_partitioned(connection):
+            print("attendance is not partitioned; nothing to do")
+            return
+        created = ensure_partitions(connection, args.months_ahead)
+    for name in created:
+        print(f"Created partition {name}")
+    print(f"Partitions up to date: {len(created)} created")
+
+
+if __name__ == "__main__":
+    main()
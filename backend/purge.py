@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Purge employees deleted in the background for HRMS Lite.
+
+DELETE /api/employees/{id}?mode=background only sets employees.deleted_at, which
+hides the employee everywhere, and responds. The marked rows act as the job queue.
+The API purges each one after responding: attendance is deleted PURGE_BATCH_SIZE
+rows per transaction, each batch subtracting exactly the rows it deleted from the
+rollups, so no transaction locks a long history and the rollups never drift. The
+employee row goes last. Run this script (e.g. from cron or after a deploy) to finish
+purges a restart interrupted.
+"""
+import argparse
+import logging
+import os
+
+from sqlalchemy import delete, select
+
+import rollups
+from cache import response_cache, DASHBOARD_TAG
+from dashboard_stream import dashboard_stream
+from database import SessionLocal
+from models.employee import Employee
+from models.attendance import Attendance
+from models.rollup import AttendanceMonthlyRollup
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", 5000))
+
+
+def purge_employee(session_factory, employee_id, batch_size=PURGE_BATCH_SIZE):
+    """
+    Delete a soft-deleted employee's attendance in batches, then the employee.
+    Returns the number of attendance records deleted; employees that aren't
+    marked deleted are left alone.
+    """
+    db = session_factory()
+    deleted = 0
+    try:
+        marked = db.query(Employee.id, Employee.department).filter(
+            Employee.employee_id == employee_id, Employee.deleted_at.is_not(None)
+        ).first()
+        if not marked:
+            return 0
+
+        while True:
+            batch = select(Attendance.id).where(Attendance.employee_pk == marked.id).limit(batch_size)
+            removed = db.execute(
+                delete(Attendance).where(Attendance.id.in_(batch)).returning(Attendance.date, Attendance.status)
+            ).all()
+            rollups.record_attendance(db, [
+                (employee_id, marked.department, day, record_status, -1) for day, record_status in removed
+            ])
+            db.commit()
+            response_cache.invalidate(DASHBOARD_TAG)
+            dashboard_stream.notify()
+            deleted += len(removed)
+            if len(removed) < batch_size:
+                break
+
+        # What is left counts archived records (see archive.py), as in rollups.remove_employee
+        db.execute(delete(AttendanceMonthlyRollup).where(AttendanceMonthlyRollup.employee_id == employee_id))
+        db.execute(delete(Employee).where(Employee.id == marked.id))
+        db.commit()
+        logger.info(f"Purged employee {employee_id} and {deleted} attendance record(s)")
+        return deleted
+    except Exception:
+        db.rollback()
+        logger.exception(f"Purge of employee {employee_id} failed; run purge.py to resume")
+        raise
+    finally:
+        db.close()
+
+
+def pending_employee_ids(session_factory):
+    """Employees deleted in the background whose purge hasn't finished."""
+    db = session_factory()
+    try:
+        return [employee_id for (employee_id,) in db.query(Employee.employee_id).filter(Employee.deleted_at.is_not(None))]
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Purge employees deleted in the background")
+    parser.add_argument("--batch-size", type=int, default=PURGE_BATCH_SIZE, help="Attendance rows per transaction")
+    args = parser.parse_args()
+
+    pending = pending_employee_ids(SessionLocal)
+    for employee_id in pending:
+        records = purge_employee(SessionLocal, employee_id, args.batch_size)
+        print(f"Purged {employee_id}: {records} attendance record(s)")
+    print(f"Purge complete: {len(pending)} employee(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+"""
+Rebuild or verify the attendance rollup tables for HRMS Lite
+Run after migrate.py to rebuild the rollups from scratch, or with
+--check to report any drift between the rollups and the attendance table
+(and the attendance archive, see archive.py)
+"""
+import argparse
+import sys
+from database import SessionLocal
+import rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or verify attendance rollups")
+    parser.add_argument("--check", action="store_true", help="Only compare rollups with attendance; exit 1 on drift")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.check:
+            mismatches = rollups.find_mismatches(db)
+            for table, key, stored, expected in mismatches:
+                print(f"{table} {key}: stored={stored} expected={expected}")
+            print(f"Rollup check complete: {len(mismatches)} mismatch(es)")
+            sys.exit(1 if mismatches else 0)
+
+        print("Rebuilding attendance rollups from the attendance table and archive...")
+        rollups.rebuild(db)
+        print("Rollup rebuild completed successfully!")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Read replicas for the read-only endpoints.
+
+GET endpoints take their session from `get_read_db` instead of `get_db`. With
+DATABASE_REPLICA_URLS unset that is a primary session, as before. With one or more
+replica URLs (comma-separated), each read goes to a usable replica:
+
+- Selection (REPLICA_SELECTION): "round_robin" (default), or "least_latency", which
+  picks the replica with the lowest moving average of health-check round-trips.
+- Lag: a worker checks each replica at most every REPLICA_CHECK_INTERVAL_SECONDS,
+  on the first read that finds its last check too old. A replica that fails the
+  check or lags more than REPLICA_MAX_LAG_SECONDS behind the primary is skipped
+  until a later check passes; with none usable, reads go to the primary. PostgreSQL
+  standbys report their replay lag, and fail the check while their WAL receiver is
+  down; other databases (e.g. SQLite copies standing in for replicas locally) are
+  treated as current.
+- Read-your-writes: every successful write response sets the READ_PRIMARY_COOKIE
+  cookie for REPLICA_MAX_LAG_SECONDS. Reads carrying it go to the primary, so a
+  client sees its own writes; by the time it expires, any replica still in use has
+  caught up. Clients that drop cookies may read up to REPLICA_MAX_LAG_SECONDS stale.
+  Browsers only send it cross-origin on requests made with credentials (the
+  frontend's apiFetch), and cross-site only with READ_PRIMARY_COOKIE_SAMESITE=none,
+  which also marks it Secure.
+
+Reads from a replica mark the request (request.state.read_staleness), so the
+response cache keeps their entries apart from primary ones and for at most
+REPLICA_MAX_LAG_SECONDS, and their sessions carry info["replica"], so the employee
+cache doesn't remember what a lagging replica says.
+"""
+import itertools
+import logging
+import os
+import threading
+import time
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import (
+    DB_ASYNC, READ_ONLY, AsyncReadSessionLocal, ReadSessionLocal, configure_engine, engine_options, to_async_url
+)
+
+logger = logging.getLogger(__name__)
+
+READ_PRIMARY_COOKIE = "hrms_read_primary_until"
+# "lax" covers a frontend on the same site (e.g. app.example.com and api.example.com);
+# "none" is needed when they are on different sites, and requires HTTPS
+READ_PRIMARY_COOKIE_SAMESITE = os.getenv("READ_PRIMARY_COOKIE_SAMESITE", "lax").capitalize()
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# Weight of the newest round-trip in the latency moving average
+LATENCY_SMOOTHING = 0.3
+
+# Seconds since the last replayed transaction, or 0 when the standby has replayed
+# everything it received (an idle primary sends nothing, so the timestamp ages).
+# NULL when the standby has no WAL receiver: disconnected from the primary, it has
+# replayed everything it received and would otherwise report 0 however far behind.
+POSTGRES_LAG = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver) THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+def replication_lag(connection):
+    """Seconds `connection`'s database lags behind its primary; raises if it isn't replicating."""
+    if connection.dialect.name == "postgresql":
+        lag = connection.execute(POSTGRES_LAG).scalar()
+        if lag is None:
+            raise RuntimeError("Standby is not receiving WAL from the primary")
+        return float(lag)
+    connection.execute(text("SELECT 1"))
+    return 0.0
+
+
+class Replica:
+    """One replica's engines, sessions and last health check."""
+
+    def __init__(self, name, url):
+        self.name = name
+        self.url = url
+        self.engine = configure_engine(create_engine(url, **engine_options(url)))
+        self.session_factory = sessionmaker(
+            autocommit=False, autoflush=False, bind=self.engine.execution_options(**READ_ONLY), info={"replica": name}
+        )
+        self.async_engine = None
+        self.async_session_factory = None
+        if DB_ASYNC:
+            self.async_engine = configure_engine(
+                create_async_engine(to_async_url(url), **engine_options(url, async_driver=True))
+            )
+            self.async_session_factory = async_sessionmaker(
+                self.async_engine.execution_options(**READ_ONLY), autoflush=False, expire_on_commit=False,
+                info={"replica": name}
+            )
+        self.healthy = False
+        self.lag_seconds = None
+        self.latency_seconds = None
+        self.checked_at = None
+        self.error = None
+        self.reads = 0
+        self._checking = threading.Lock()
+
+    def check(self, max_lag):
+        """Measure lag and round-trip time; the replica is usable while it lags at most `max_lag`."""
+        started = time.perf_counter()
+        try:
+            with self.engine.connect() as connection:
+                lag = replication_lag(connection)
+        except Exception as exc:
+            if self.healthy or self.checked_at is None:
+                logger.warning(f"Replica {self.name} failed its health check: {exc}")
+            self.healthy, self.error = False, str(exc)
+        else:
+            elapsed = time.perf_counter() - started
+            self.latency_seconds = elapsed if self.latency_seconds is None else (
+                LATENCY_SMOOTHING * elapsed + (1 - LATENCY_SMOOTHING) * self.latency_seconds
+            )
+            self.lag_seconds, self.error = lag, None
+            if self.healthy and lag > max_lag:
+                logger.warning(f"Replica {self.name} lags {lag:.1f}s; reading from other replicas or the primary")
+            self.healthy = lag <= max_lag
+        self.checked_at = time.monotonic()
+
+    def dispose(self):
+        self.engine.dispose()
+
+
+class ReplicaSet:
+    def __init__(self, replicas, selection="round_robin", max_lag=5.0, check_interval=5.0):
+        if selection not in ("round_robin", "least_latency"):
+            raise ValueError(f"Unknown replica selection {selection!r}")
+        self.replicas = list(replicas)
+        self.selection = selection
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.primary_reads = 0
+        self.sticky_reads = 0
+        self._turn = itertools.count()
+
+    def refresh(self):
+        """Check every replica whose last check is older than the interval and isn't being checked."""
+        now = time.monotonic()
+        for replica in self.replicas:
+            if replica.checked_at is not None and now - replica.checked_at < self.check_interval:
+                continue
+            if replica._checking.acquire(blocking=False):
+                try:
+                    replica.check(self.max_lag)
+                finally:
+                    replica._checking.release()
+
+    def choose(self):
+        """The replica to read from, or None to read from the primary."""
+        self.refresh()
+        usable = [replica for replica in self.replicas if replica.healthy]
+        if not usable:
+            self.primary_reads += 1
+            return None
+        if self.selection == "least_latency":
+            replica = min(usable, key=lambda candidate: candidate.latency_seconds)
+        else:
+            replica = usable[next(self._turn) % len(usable)]
+        replica.reads += 1
+        return replica
+
+    def stats(self):
+        return {
+            "selection": self.selection,
+            "max_lag_seconds": self.max_lag,
+            "primary_reads": self.primary_reads,
+            "sticky_reads": self.sticky_reads,
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "healthy": replica.healthy,
+                    "lag_seconds": replica.lag_seconds,
+                    "latency_ms": round(replica.latency_seconds * 1000, 3) if replica.latency_seconds else None,
+                    "reads": replica.reads,
+                    "error": replica.error,
+                }
+                for replica in self.replicas
+            ],
+        }
+
+    def dispose(self):
+        for replica in self.replicas:
+            replica.dispose()
+
+
+def build_replica_set():
+    """The replicas listed in DATABASE_REPLICA_URLS, or None when there are none."""
+    urls = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    if not urls:
+        return None
+    urls = [url.replace("postgres://", "postgresql://", 1) for url in urls]
+    logger.info(f"Reading from {len(urls)} replica(s)")
+    return ReplicaSet(
+        [Replica(f"replica{index}", url) for index, url in enumerate(urls, start=1)],
+        selection=os.getenv("REPLICA_SELECTION", "round_robin").lower(),
+        max_lag=float(os.getenv("REPLICA_MAX_LAG_SECONDS", 5)),
+        check_interval=float(os.getenv("REPLICA_CHECK_INTERVAL_SECONDS", 5)),
+    )
+
+
+replica_set = build_replica_set()
+
+
+def _reads_primary(request):
+    """Whether the client wrote recently enough that only the primary is sure to show it."""
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def choose_replica(request):
+    """The replica serving `request`, or None for the primary; marks the request as read-only."""
+    request.state.read_only = True
+    if replica_set is None:
+        return None
+    if _reads_primary(request):
+        replica_set.sticky_reads += 1
+        return None
+    replica = replica_set.choose()
+    if replica is not None:
+        request.state.read_staleness = replica_set.max_lag
+    return replica
+
+
+def read_session_factory(request):
+    """Sync session factory for reads outside the request scope, e.g. streaming responses."""
+    replica = choose_replica(request)
+    return ReadSessionLocal if replica is None else replica.session_factory
+
+
+def is_replica(db):
+    """Whether session `db` reads from a replica."""
+    return bool(db.info.get("replica"))
+
+
+def _get_sync_read_db(request: Request):
+    """Dependency for read-only routes: a replica session, or a primary one (see the module docstring)."""
+    replica = choose_replica(request)
+    db = ReadSessionLocal() if replica is None else replica.session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def _get_async_read_db(request: Request):
+    """Async counterpart of _get_sync_read_db; health checks run in the threadpool."""
+    replica = await run_in_threadpool(choose_replica, request)
+    async with (AsyncReadSessionLocal if replica is None else replica.async_session_factory)() as db:
+        yield db
+
+
+get_read_db = _get_async_read_db if DB_ASYNC else _get_sync_read_db
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware sending clients to the primary for a while after they write; see the module docstring."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS or replica_set is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            # Read-only POSTs (e.g. batch summaries) don't make the client sticky
+            if (
+                message["type"] == "http.response.start" and message["status"] < 400
+                and not scope.get("state", {}).get("read_only")
+            ):
+                until = time.time() + replica_set.max_lag
+                cookie = (
+                    f"{READ_PRIMARY_COOKIE}={until:.3f}; Max-Age={max(1, round(replica_set.max_lag))}; "
+                    f"Path=/; HttpOnly; SameSite={READ_PRIMARY_COOKIE_SAMESITE}"
+                )
+                if READ_PRIMARY_COOKIE_SAMESITE == "None":
+                    cookie += "; Secure"
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
@@ -0,0 +1,174 @@
+"""
+Incremental maintenance of the attendance rollup tables.
+Every attendance write applies +1/-1 deltas to attendance_daily_rollup and
+attendance_monthly_rollup inside the same transaction, so summary endpoints read
+a few pre-aggregated rows instead of scanning attendance.
+They also keep counting the records archive.py moves out of attendance, which
+`rebuild` and `find_mismatches` read back from the archive files.
+"""
+from collections import Counter
+from sqlalchemy import func, literal, select, update
+from archive import attendance_archive
+from bulk import INSERT_CHUNK_SIZE, chunked, dialect_insert
+from models.employee import Employee
+from models.attendance import Attendance, status_name
+from models.rollup import AttendanceDailyRollup, AttendanceMonthlyRollup
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def record_attendance(db, changes):
+    """
+    Apply attendance changes to both rollups without committing.
+    `changes` is an iterable of (employee_id, department, date, status, delta) tuples,
+    where delta is +1 for a new record and -1 for a removed one.
+    """
+    daily, monthly = Counter(), Counter()
+    for employee_id, department, day, status, delta in changes:
+        daily[(day, department, status)] += delta
+        monthly[(employee_id, month_start(day), status)] += delta
+
+    _upsert_counts(db, AttendanceDailyRollup, ("date", "department", "status"), daily)
+    _upsert_counts(db, AttendanceMonthlyRollup, ("employee_id", "month", "status"), monthly)
+
+
+def record_marked(db, employee_id, day, status):
+    """
+    Count one new attendance record in both rollups without committing.
+    The daily upsert selects the employee's department itself, so callers don't look it up.
+    """
+    stmt = dialect_insert(db, AttendanceDailyRollup).from_select(
+        ["date", "department", "status", "count"],
+        select(
+            literal(day, AttendanceDailyRollup.date.type), Employee.department, literal(status), literal(1)
+        ).where(Employee.employee_id == employee_id)
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["date", "department", "status"],
+        set_={"count": AttendanceDailyRollup.count + stmt.excluded.count}
+    ))
+    _upsert_counts(
+        db, AttendanceMonthlyRollup, ("employee_id", "month", "status"), {(employee_id, month_start(day), status): 1}
+    )
+
+
+def _upsert_counts(db, model, key_columns, deltas):
+    rows = [
+        dict(zip(key_columns, key), count=delta)
+        for key, delta in deltas.items() if delta
+    ]
+    for chunk in chunked(rows, INSERT_CHUNK_SIZE):
+        stmt = dialect_insert(db, model).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={"count": model.count + stmt.excluded.count}
+        )
+        db.execute(stmt)
+
+
+def remove_employee(db, employee):
+    """
+    Subtract an employee's whole attendance history from the rollups, without committing.
+    Set-based (UPDATE ... FROM the grouped history), so the cost stays in the database
+    however long the history is.
+    """
+    history = select(
+        Attendance.date, status_name(Attendance.status).label("status"), func.count(Attendance.id).label("count")
+    ).where(Attendance.employee_pk == employee.id).group_by(Attendance.date, Attendance.status).subquery()
+    db.execute(
+        update(AttendanceDailyRollup).where(
+            AttendanceDailyRollup.date == history.c.date,
+            AttendanceDailyRollup.department == employee.department,
+            AttendanceDailyRollup.status == history.c.status
+        ).values(count=AttendanceDailyRollup.count - history.c.count)
+    )
+
+    db.query(AttendanceMonthlyRollup).filter(
+        AttendanceMonthlyRollup.employee_id == employee.employee_id
+    ).delete(synchronize_session=False)
+
+
+def _expected_daily():
+    return select(
+        Attendance.date, Employee.department, status_name(Attendance.status), func.count(Attendance.id)
+    ).join(Employee, Employee.id == Attendance.employee_pk).where(*attendance_archive.hot_filters()).group_by(
+        Attendance.date, Employee.department, Attendance.status
+    )
+
+
+def _expected_monthly(db):
+    # Month bucketing is dialect specific; both forms return a value comparable to a date
+    if db.get_bind().dialect.name == "sqlite":
+        month = func.date(Attendance.date, literal("start of month"))
+    else:
+        month = func.date_trunc("month", Attendance.date).cast(AttendanceMonthlyRollup.month.type)
+    return select(
+        Employee.employee_id, month, status_name(Attendance.status), func.count(Attendance.id)
+    ).join(Employee, Employee.id == Attendance.employee_pk).where(*attendance_archive.hot_filters()).group_by(
+        Employee.employee_id, month, Attendance.status
+    )
+
+
+def _archived_counts(db):
+    """
+    Daily and monthly rollup counts of the archived records, keyed like the rollup tables.
+    Archived records of deleted employees only count in the daily rollup, as
+    `remove_employee` leaves those alone.
+    """
+    daily, monthly = Counter(), Counter()
+    if not attendance_archive.months():
+        return daily, monthly
+    for (day, department, status), count in attendance_archive.counts(("date", "department", "status")).items():
+        daily[(day, department, status)] += count
+    employee_pks = {employee_pk for (employee_pk,) in db.query(Employee.id)}
+    for (employee_pk, employee_id, day, status), count in attendance_archive.counts(
+        ("employee_pk", "employee_id", "date", "status")
+    ).items():
+        if employee_pk in employee_pks:
+            monthly[(employee_id, month_start(day), status)] += count
+    return daily, monthly
+
+
+def rebuild(db):
+    """Recompute both rollups from the attendance table and the archive, and commit."""
+    db.query(AttendanceDailyRollup).delete(synchronize_session=False)
+    db.query(AttendanceMonthlyRollup).delete(synchronize_session=False)
+    db.execute(AttendanceDailyRollup.__table__.insert().from_select(
+        ["date", "department", "status", "count"], _expected_daily()
+    ))
+    db.execute(AttendanceMonthlyRollup.__table__.insert().from_select(
+        ["employee_id", "month", "status", "count"], _expected_monthly(db)
+    ))
+    daily, monthly = _archived_counts(db)
+    _upsert_counts(db, AttendanceDailyRollup, ("date", "department", "status"), daily)
+    _upsert_counts(db, AttendanceMonthlyRollup, ("employee_id", "month", "status"), monthly)
+    db.commit()
+
+
+def find_mismatches(db):
+    """
+    Compare stored rollups with counts recomputed from attendance and the archive.
+    Returns a list of (table, key, stored, expected) tuples; empty means consistent.
+    """
+    mismatches = []
+    archived_daily, archived_monthly = _archived_counts(db)
+    checks = (
+        (AttendanceDailyRollup, (AttendanceDailyRollup.date, AttendanceDailyRollup.department,
+                                 AttendanceDailyRollup.status), _expected_daily(), archived_daily),
+        (AttendanceMonthlyRollup, (AttendanceMonthlyRollup.employee_id, AttendanceMonthlyRollup.month,
+                                   AttendanceMonthlyRollup.status), _expected_monthly(db), archived_monthly),
+    )
+    for model, key_columns, expected_query, archived in checks:
+        stored = {
+            tuple(str(value) for value in row[:-1]): row[-1]
+            for row in db.query(*key_columns, model.count) if row[-1]
+        }
+        expected = Counter({tuple(str(value) for value in row[:-1]): row[-1] for row in db.execute(expected_query)})
+        for key, count in archived.items():
+            expected[tuple(str(value) for value in key)] += count
+        for key in stored.keys() | expected.keys():
+            if stored.get(key, 0) != expected.get(key, 0):
+                mismatches.append((model.__tablename__, key, stored.get(key, 0), expected.get(key, 0)))
+    return mismatches
@@ -1,66 +1,271 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func
-from datetime import date
+from sqlalchemy import Integer, String, and_, case, cast, extract, func, insert, literal, select, tuple_
+from datetime import date, datetime, timedelta
 from typing import Optional
-from database import get_db
+import calendar
+import csv
+import heapq
+import io
+import itertools
+import json
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from database import DBSession, get_db, run_db, violated_constraint
+from bulk import INSERT_CHUNK_SIZE, chunked, dialect_insert
+from pagination import encode_cursor, decode_cursor
+from serialization import FastJSONResponse, rows_to_dicts
+import export
+import rollups
+from archive import attendance_archive
+from cache import response_cache, DASHBOARD_TAG, employee_tag
+from dashboard_stream import dashboard_stream
+from employee_cache import employee_cache
+from replicas import get_read_db, read_session_factory
 from models.employee import Employee
 from models.attendance import Attendance
-from schemas.attendance import AttendanceCreate, AttendanceResponse, AttendanceList, AttendanceSummary
+from models.rollup import AttendanceMonthlyRollup
+from schemas.attendance import (
+    AttendanceCreate, AttendanceResponse, AttendanceList, AttendanceSummary,
+    AttendanceBulkCreate, AttendanceBulkResponse, AttendanceStatus, BulkRowStatus, ConflictPolicy,
+    AttendanceSummaryBatch, AttendanceSummaryBatchRequest, ExportFormat, ColumnarExportFormat, AttendanceCalendar,
+)
 
 router = APIRouter(prefix="/api/attendance", tags=["attendance"])
 
 
 @router.post("/", response_model=AttendanceResponse, status_code=status.HTTP_201_CREATED)
-def mark_attendance(attendance: AttendanceCreate, db: Session = Depends(get_db)):
+async def mark_attendance(attendance: AttendanceCreate, db: DBSession = Depends(get_db)):
     """
     Mark attendance for an employee.
     Returns 201 on success, 404 if employee doesn't exist, 409 if duplicate entry exists.
     """
-    # Check if employee exists
-    employee = db.query(Employee).filter(Employee.employee_id == attendance.employee_id).first()
-    if not employee:
+    return await run_db(db, _mark_attendance, attendance)
+
+
+def _mark_attendance(db, attendance):
+    known, generation = employee_cache.get(attendance.employee_id)
+    if known is False:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Employee with ID '{attendance.employee_id}' not found"
         )
-
-    # Check if attendance already exists for this employee and date
-    existing_attendance = db.query(Attendance).filter(
-        (Attendance.employee_id == attendance.employee_id) & (Attendance.date == attendance.date)
-    ).first()
-
-    if existing_attendance:
+    if attendance_archive.is_archived(attendance.date):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
-            detail=f"Attendance record already exists for employee '{attendance.employee_id}' on {attendance.date}"
+            detail=f"Attendance for {attendance.date:%Y-%m} is archived and can't be changed"
         )
 
+    # The INSERT goes first: it selects the key from active employees, so an unknown or
+    # deleted employee inserts nothing, and the unique constraint rejects duplicates.
+    # RETURNING replaces refresh()
     try:
-        db_attendance = Attendance(
-            employee_id=attendance.employee_id,
-            date=attendance.date,
-            status=attendance.status
+        created = db.execute(
+            insert(Attendance).from_select(
+                ["employee_pk", "date", "status"],
+                select(
+                    Employee.id,
+                    literal(attendance.date, Attendance.date.type),
+                    literal(attendance.status.value, Attendance.status.type)
+                ).where(Employee.employee_id == attendance.employee_id, Employee.deleted_at.is_(None))
+            ).returning(Attendance.id, Attendance.employee_pk, Attendance.date, Attendance.status)
+        ).first()
+        if created is None:
+            employee_cache.put(attendance.employee_id, False, generation)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Employee with ID '{attendance.employee_id}' not found"
+            )
+        rollups.record_marked(db, attendance.employee_id, attendance.date, attendance.status.value)
+        if attendance_archive.is_archived(attendance.date):
+            # Closed since the check above; archive.py waits for writes under way, not later ones
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Attendance for {attendance.date:%Y-%m} is archived and can't be changed"
+            )
+        db.commit()
+        employee_cache.put(attendance.employee_id, created.employee_pk, generation)
+    except IntegrityError as error:
+        db.rollback()
+        constraint = violated_constraint(error, Attendance.__table__)
+        if constraint == "attendance_employee_pk_fkey":  # Employee deleted concurrently
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Employee with ID '{attendance.employee_id}' not found"
+            )
+        if constraint == "uq_employee_attendance_date":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Attendance record already exists for employee '{attendance.employee_id}' on {attendance.date}"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Duplicate attendance entry"
+        )
+    response_cache.invalidate(DASHBOARD_TAG, employee_tag(attendance.employee_id))
+    dashboard_stream.notify()
+    return {"id": created.id, "employee_id": attendance.employee_id, "date": created.date, "status": created.status}
+
+
+@router.post("/bulk", response_model=AttendanceBulkResponse)
+async def mark_attendance_bulk(payload: AttendanceBulkCreate, db: DBSession = Depends(get_db)):
+    """
+    Mark attendance for many employees in one request.
+    Employee existence and existing records are resolved with one set-based query each,
+    and rows are written with multi-row INSERT ... ON CONFLICT in a single transaction.
+    Conflicts with stored records follow `on_conflict`: skip, overwrite, or fail (409, nothing written).
+    Repeated (employee_id, date) pairs within the batch are reported as duplicates, and rows
+    dated in archived months (see archive.py) as archived.
+    """
+    return await run_db(db, _mark_attendance_bulk, payload)
+
+
+def _mark_attendance_bulk(db, payload):
+    records = payload.records
+    employee_ids = {record.employee_id for record in records}
+    dates = {record.date for record in records}
+
+    # employee_id -> (employees.id, department)
+    known_employees = {
+        employee_id: (employee_pk, department) for employee_id, employee_pk, department in
+        db.query(Employee.employee_id, Employee.id, Employee.department).filter(
+            Employee.employee_id.in_(employee_ids), Employee.deleted_at.is_(None)
         )
-        db.add(db_attendance)
+    }
+    employee_ids_by_pk = {employee_pk: employee_id for employee_id, (employee_pk, _) in known_employees.items()}
+    existing_keys = {
+        (employee_ids_by_pk[employee_pk], day): existing_status for employee_pk, day, existing_status in
+        db.query(Attendance.employee_pk, Attendance.date, Attendance.status).filter(
+            Attendance.employee_pk.in_(employee_ids_by_pk),
+            Attendance.date.in_(dates)
+        )
+    }
+
+    # Classify every row before writing anything
+    results = []
+    to_write = []
+    seen_keys = set()
+    for index, record in enumerate(records):
+        key = (record.employee_id, record.date)
+        if record.employee_id not in known_employees:
+            result = BulkRowStatus.UNKNOWN_EMPLOYEE
+        elif attendance_archive.is_archived(record.date):
+            result = BulkRowStatus.ARCHIVED
+        elif key in seen_keys:
+            result = BulkRowStatus.DUPLICATE
+        elif key in existing_keys:
+            result = (
+                BulkRowStatus.UPDATED if payload.on_conflict == ConflictPolicy.OVERWRITE
+                else BulkRowStatus.DUPLICATE
+            )
+        else:
+            result = BulkRowStatus.CREATED
+        seen_keys.add(key)
+        if result in (BulkRowStatus.CREATED, BulkRowStatus.UPDATED):
+            to_write.append(index)
+        results.append({
+            "index": index,
+            "employee_id": record.employee_id,
+            "date": record.date,
+            "result": result
+        })
+
+    if payload.on_conflict == ConflictPolicy.FAIL:
+        conflicts = [row for row in results if row["result"] == BulkRowStatus.DUPLICATE]
+        if conflicts:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={
+                    "message": f"{len(conflicts)} attendance record(s) already exist; nothing was written",
+                    "conflicts": jsonable_encoder(conflicts)
+                }
+            )
+
+    try:
+        for chunk in chunked(to_write, INSERT_CHUNK_SIZE):
+            stmt = dialect_insert(db, Attendance).values([
+                {
+                    "employee_pk": known_employees[records[index].employee_id][0],
+                    "date": records[index].date,
+                    "status": records[index].status.value
+                }
+                for index in chunk
+            ])
+            if payload.on_conflict == ConflictPolicy.OVERWRITE:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[Attendance.employee_pk, Attendance.date],
+                    set_={"status": stmt.excluded.status}
+                )
+                db.execute(stmt)
+            elif payload.on_conflict == ConflictPolicy.SKIP:
+                # Rows inserted concurrently since the lookup are skipped, not overwritten;
+                # RETURNING tells us which rows this statement actually created.
+                stmt = stmt.on_conflict_do_nothing(
+                    index_elements=[Attendance.employee_pk, Attendance.date]
+                ).returning(Attendance.employee_pk, Attendance.date)
+                inserted = {(employee_ids_by_pk[employee_pk], day) for employee_pk, day in db.execute(stmt)}
+                for index in chunk:
+                    if (records[index].employee_id, records[index].date) not in inserted:
+                        results[index]["result"] = BulkRowStatus.DUPLICATE
+            else:
+                db.execute(stmt)
+
+        rollup_changes = []
+        for index in to_write:
+            record, result = records[index], results[index]["result"]
+            department = known_employees[record.employee_id][1]
+            if result == BulkRowStatus.CREATED:
+                rollup_changes.append((record.employee_id, department, record.date, record.status.value, 1))
+            elif result == BulkRowStatus.UPDATED:
+                previous = existing_keys[(record.employee_id, record.date)]
+                if previous != record.status.value:
+                    rollup_changes.append((record.employee_id, department, record.date, previous, -1))
+                    rollup_changes.append((record.employee_id, department, record.date, record.status.value, 1))
+        rollups.record_attendance(db, rollup_changes)
+        closed = sorted({records[index].date.replace(day=1) for index in to_write
+                         if attendance_archive.is_archived(records[index].date)})
+        if closed:
+            # Closed since the rows were classified; see _mark_attendance
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Attendance for {', '.join(f'{month:%Y-%m}' for month in closed)} was archived "
+                       "while this request ran; nothing was written"
+            )
         db.commit()
-        db.refresh(db_attendance)
-        return db_attendance
+        response_cache.invalidate(
+            DASHBOARD_TAG, *{employee_tag(records[index].employee_id) for index in to_write}
+        )
+        dashboard_stream.notify()
     except IntegrityError:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
-            detail="Duplicate attendance entry"
+            detail="Duplicate attendance entry; nothing was written"
         )
 
+    counts = {row_status: 0 for row_status in BulkRowStatus}
+    for row in results:
+        counts[row["result"]] += 1
+
+    return {
+        "results": results,
+        "created": counts[BulkRowStatus.CREATED],
+        "updated": counts[BulkRowStatus.UPDATED],
+        "duplicates": counts[BulkRowStatus.DUPLICATE],
+        "unknown_employees": counts[BulkRowStatus.UNKNOWN_EMPLOYEE],
+        "archived": counts[BulkRowStatus.ARCHIVED]
+    }
+
 
 @router.get("/employee/{employee_id}", response_model=AttendanceList)
-def get_employee_attendance(
+async def get_employee_attendance(
     employee_id: str,
     start_date: Optional[date] = Query(None, description="Filter records from this date (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="Filter records until this date (YYYY-MM-DD)"),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_read_db)
 ):
     """
     Retrieve attendance records for a specific employee.
@@ -68,16 +273,21 @@ def get_employee_attendance(
     Returns 404 if employee doesn't exist.
     Example: /api/attendance/employee/EMP001?start_date=2026-02-01&end_date=2026-02-28
     """
-    # Check if employee exists
-    employee = db.query(Employee).filter(Employee.employee_id == employee_id).first()
-    if not employee:
+    return FastJSONResponse(await run_db(db, _get_employee_attendance, employee_id, start_date, end_date))
+
+
+def _get_employee_attendance(db, employee_id, start_date, end_date):
+    employee_pk = employee_cache.resolve(db, employee_id)
+    if employee_pk is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Employee with ID '{employee_id}' not found"
         )
 
-    # Build query with optional date filtering
-    query = db.query(Attendance).filter(Attendance.employee_id == employee_id)
+    # Build query with optional date filtering; the key is resolved, so no join is needed
+    query = db.query(
+        Attendance.id, literal(employee_id, String).label("employee_id"), Attendance.date, Attendance.status
+    ).filter(Attendance.employee_pk == employee_pk, *attendance_archive.hot_filters(start_date, end_date))
     
     if start_date:
         query = query.filter(Attendance.date >= start_date)
@@ -85,57 +295,464 @@ def get_employee_attendance(
     if end_date:
         query = query.filter(Attendance.date <= end_date)
     
-    records = query.all()
+    # Archived months come first; they are older than anything still writable
+    records = list(attendance_archive.rows(EXPORT_KEYS, start_date, end_date, employee_pk=employee_pk))
+    records += query.all()
     return {
-        "records": records,
-        "total": len(records)
+        "records": rows_to_dicts(records, EXPORT_KEYS),
+        "total": len(records),
+        "next_cursor": None
     }
 
 
 @router.get("/employee/{employee_id}/summary", response_model=AttendanceSummary)
-def get_attendance_summary(employee_id: str, db: Session = Depends(get_db)):
+async def get_attendance_summary(
+    employee_id: str,
+    request: Request,
+    response: Response,
+    db: DBSession = Depends(get_read_db)
+):
     """
     Get attendance summary for a specific employee.
     Returns total records, present count, absent count, and attendance percentage.
+    Responses are cached until the employee's attendance changes and carry an ETag for If-None-Match.
     """
-    # Check if employee exists
-    employee = db.query(Employee).filter(Employee.employee_id == employee_id).first()
-    if not employee:
+    cached = response_cache.lookup(
+        request, "attendance-summary", {"employee_id": employee_id}, (employee_tag(employee_id),)
+    )
+    if cached.not_modified:
+        return cached.not_modified_response()
+    cached.apply_headers(response)
+    if cached.value is not None:
+        return cached.value
+
+    return cached.store(await run_db(db, _get_attendance_summary, employee_id))
+
+
+def _get_attendance_summary(db, employee_id):
+    known, generation = employee_cache.get(employee_id)
+    # Existence check and counts in one grouped query; no rows means no such employee
+    summaries = [] if known is False else _summarize(db, [Employee.employee_id == employee_id])
+    if not summaries:
+        if not db.info.get("replica"):
+            employee_cache.put(employee_id, False, generation)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Employee with ID '{employee_id}' not found"
         )
 
-    # Get all attendance records for this employee
-    total_records = db.query(Attendance).filter(Attendance.employee_id == employee_id).count()
-    present_count = db.query(Attendance).filter(
-        (Attendance.employee_id == employee_id) & (Attendance.status == "Present")
-    ).count()
-    absent_count = db.query(Attendance).filter(
-        (Attendance.employee_id == employee_id) & (Attendance.status == "Absent")
-    ).count()
-    
-    # Calculate attendance percentage
-    attendance_percentage = (
-        (present_count / total_records * 100) if total_records > 0 else 0
+    return summaries[0]
+
+
+@router.post("/summary/batch", response_model=AttendanceSummaryBatch)
+async def get_attendance_summaries(payload: AttendanceSummaryBatchRequest, db: DBSession = Depends(get_read_db)):
+    """
+    Get attendance summaries for many employees from a single grouped query.
+    Select employees by `employee_ids`, `department`, or both (intersection), optionally
+    limited to a date range. Requested IDs that don't exist are listed in `not_found`.
+    """
+    return await run_db(db, _get_attendance_summaries, payload)
+
+
+def _get_attendance_summaries(db, payload):
+    employee_filters = []
+    if payload.employee_ids:
+        employee_filters.append(Employee.employee_id.in_(payload.employee_ids))
+    if payload.department:
+        employee_filters.append(Employee.department == payload.department)
+
+    summaries = _summarize(db, employee_filters, payload.start_date, payload.end_date)
+
+    found = {summary["employee_id"] for summary in summaries}
+    not_found = [employee_id for employee_id in dict.fromkeys(payload.employee_ids or []) if employee_id not in found]
+    return {
+        "summaries": summaries,
+        "not_found": not_found
+    }
+
+
+def _is_whole_months(start_date, end_date):
+    return (
+        start_date is not None and end_date is not None and start_date.day == 1
+        and (end_date + timedelta(days=1)).day == 1
     )
 
+
+def _summarize(db, employee_filters, start_date=None, end_date=None):
+    """
+    Build attendance summaries for the employees matching `employee_filters` with one
+    `GROUP BY employee_id, status` query. Employees without records get zero counts.
+    Uses the monthly rollup when the range is open or covers whole months, and the
+    attendance table plus any archived months it overlaps otherwise.
+    """
+    if (start_date is None and end_date is None) or _is_whole_months(start_date, end_date):
+        source = AttendanceMonthlyRollup
+        count = func.sum(source.count)
+        join_on = [source.employee_id == Employee.employee_id]
+        if start_date:
+            join_on += [source.month >= start_date, source.month <= end_date]
+    else:
+        source = Attendance
+        count = func.count(source.id)
+        join_on = [source.employee_pk == Employee.id, *attendance_archive.hot_filters(start_date, end_date)]
+        if start_date:
+            join_on.append(source.date >= start_date)
+        if end_date:
+            join_on.append(source.date <= end_date)
+
+    # Date conditions belong in the join so employees with no matching records still appear
+    rows = db.query(Employee.employee_id, Employee.id, source.status, count).outerjoin(
+        source, and_(*join_on)
+    ).filter(Employee.deleted_at.is_(None), *employee_filters).group_by(
+        Employee.employee_id, Employee.id, source.status
+    ).order_by(Employee.employee_id)
+
+    counts = {}
+    employee_ids_by_pk = {}
+    for employee_id, employee_pk, record_status, record_count in rows:
+        employee_counts = counts.setdefault(employee_id, {})
+        employee_ids_by_pk[employee_pk] = employee_id
+        if record_status is not None:
+            employee_counts[record_status] = record_count or 0
+    if source is Attendance and employee_ids_by_pk:
+        for (employee_pk, record_status), record_count in attendance_archive.counts(
+            ("employee_pk", "status"), start_date, end_date, employee_pk=set(employee_ids_by_pk)
+        ).items():
+            employee_counts = counts[employee_ids_by_pk[employee_pk]]
+            employee_counts[record_status] = employee_counts.get(record_status, 0) + record_count
+
+    summaries = []
+    for employee_id, employee_counts in counts.items():
+        present_count = employee_counts.get("Present", 0)
+        absent_count = employee_counts.get("Absent", 0)
+        total_records = present_count + absent_count
+
+        # Calculate attendance percentage
+        attendance_percentage = (
+            (present_count / total_records * 100) if total_records > 0 else 0
+        )
+
+        summaries.append({
+            "employee_id": employee_id,
+            "total_records": total_records,
+            "present": present_count,
+            "absent": absent_count,
+            "attendance_percentage": round(attendance_percentage, 2)
+        })
+    return summaries
+
+
+# Characters of AttendanceCalendar.statuses, one per day of the month
+CALENDAR_LEGEND = {"0": "Unmarked", "1": AttendanceStatus.PRESENT.value, "2": AttendanceStatus.ABSENT.value}
+
+
+@router.get("/calendar", response_model=AttendanceCalendar)
+async def get_attendance_calendar(
+    request: Request,
+    response: Response,
+    department: str = Query(..., description="Employees in this department"),
+    month: str = Query(..., pattern=r"^\d{4}-(0[1-9]|1[0-2])$", description="Month as YYYY-MM"),
+    db: DBSession = Depends(get_read_db)
+):
+    """
+    Month grid of attendance for every employee in a department, for calendar and heatmap views.
+    Each employee's `statuses` has one character per day of the month (see `legend`), so a
+    department's month costs one request and a few bytes per employee-day instead of one
+    AttendanceList per employee. Built from a single grouped query.
+    Responses are cached until the next employee or attendance write and carry an ETag for If-None-Match.
+    Example: /api/attendance/calendar?department=Engineering&month=2026-02
+    """
+    cached = response_cache.lookup(
+        request, "attendance-calendar", {"department": department, "month": month}, (DASHBOARD_TAG,)
+    )
+    if cached.not_modified:
+        return cached.not_modified_response()
+    cached.apply_headers(response)
+    if cached.value is not None:
+        return cached.value
+
+    return cached.store(await run_db(db, _get_attendance_calendar, department, month))
+
+
+def _day_bitmask(record_status):
+    """Sum of 1 << (day of month - 1) over the group's `record_status` records; days are unique, so this is a bitwise OR."""
+    day = cast(extract("day", Attendance.date), Integer)
+    return func.sum(case((Attendance.status == record_status, literal(1).op("<<")(day - 1)), else_=0))
+
+
+def _get_attendance_calendar(db, department, month):
+    year, month_number = (int(part) for part in month.split("-"))
+    days = calendar.monthrange(year, month_number)[1]
+    start_date = date(year, month_number, 1)
+    end_date = start_date.replace(day=days)
+
+    # One row per employee carrying a Present and an Absent day bitmask; the date range
+    # is part of the join so employees without records still get a row
+    rows = db.query(
+        Employee.id,
+        Employee.employee_id,
+        Employee.full_name,
+        _day_bitmask(AttendanceStatus.PRESENT.value),
+        _day_bitmask(AttendanceStatus.ABSENT.value)
+    ).outerjoin(
+        Attendance, and_(
+            Attendance.employee_pk == Employee.id,
+            Attendance.date >= start_date,
+            Attendance.date <= end_date,
+            *attendance_archive.hot_filters(start_date, end_date)
+        )
+    ).filter(Employee.department == department, Employee.deleted_at.is_(None)).group_by(
+        Employee.id, Employee.employee_id, Employee.full_name
+    ).order_by(Employee.employee_id).all()
+
+    # Records of an archived month are OR-ed into the same bitmasks
+    archived_masks = {}
+    for employee_pk, day, record_status in attendance_archive.rows(
+        ("employee_pk", "date", "status"), start_date, end_date, employee_pk={row[0] for row in rows}
+    ):
+        masks = archived_masks.setdefault(employee_pk, [0, 0])
+        masks[record_status == AttendanceStatus.ABSENT.value] |= 1 << (day.day - 1)
+
+    employees = []
+    for employee_pk, employee_id, full_name, present_mask, absent_mask in rows:
+        if employee_pk in archived_masks:
+            present_mask |= archived_masks[employee_pk][0]
+            absent_mask |= archived_masks[employee_pk][1]
+        employees.append({
+            "employee_id": employee_id,
+            "full_name": full_name,
+            "statuses": "".join(
+                "1" if present_mask >> day & 1 else "2" if absent_mask >> day & 1 else "0"
+                for day in range(days)
+            ),
+            "present": bin(present_mask).count("1"),
+            "absent": bin(absent_mask).count("1")
+        })
+
     return {
-        "employee_id": employee_id,
-        "total_records": total_records,
-        "present": present_count,
-        "absent": absent_count,
-        "attendance_percentage": round(attendance_percentage, 2)
+        "department": department,
+        "month": month,
+        "start_date": start_date,
+        "end_date": end_date,
+        "legend": CALENDAR_LEGEND,
+        "employees": employees
     }
 
 
+# Rows fetched per round-trip when streaming exports
+EXPORT_BATCH_SIZE = 1000
+# Columns of AttendanceResponse; list endpoints and exports select only these, joining
+# employees on its primary key for the employee_id (see _select_records)
+EXPORT_COLUMNS = (Attendance.id, Employee.employee_id, Attendance.date, Attendance.status)
+EXPORT_KEYS = tuple(column.key for column in EXPORT_COLUMNS)
+
+
+def _select_records(db):
+    return db.query(*EXPORT_COLUMNS).select_from(Attendance).join(Employee, Employee.id == Attendance.employee_pk)
+
+
+def _filter_attendance(query, start_date, end_date, department, status_filter, joined=False):
+    """Apply the shared list/export filters to a query over Attendance; `joined` if it already joins Employee."""
+    query = query.filter(*attendance_archive.hot_filters(start_date, end_date))
+    if start_date:
+        query = query.filter(Attendance.date >= start_date)
+    if end_date:
+        query = query.filter(Attendance.date <= end_date)
+    if status_filter:
+        query = query.filter(Attendance.status == status_filter.value)
+    if department:
+        if not joined:
+            query = query.join(Employee, Employee.id == Attendance.employee_pk)
+        query = query.filter(Employee.department == department, Employee.deleted_at.is_(None))
+    return query
+
+
+def _archived_records(start_date, end_date, department, status_filter, after=None):
+    """Archived records matching the list/export filters, ordered like the table's (see archive.py)."""
+    return attendance_archive.rows(
+        EXPORT_KEYS, start_date, end_date, after,
+        department=department, status=status_filter.value if status_filter else None
+    )
+
+
+def _record_order(record):
+    return record[2], record[0]  # (date, id)
+
+
 @router.get("/", response_model=AttendanceList)
-def get_all_attendance(db: Session = Depends(get_db)):
+async def get_all_attendance(
+    start_date: Optional[date] = Query(None, description="Filter records from this date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Filter records until this date (YYYY-MM-DD)"),
+    department: Optional[str] = Query(None, description="Only employees in this department"),
+    status_filter: Optional[AttendanceStatus] = Query(None, alias="status", description="Present or Absent"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum records per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(True, description="Set to false to skip the count query"),
+    db: DBSession = Depends(get_read_db)
+):
     """
-    Retrieve all attendance records.
+    Retrieve attendance records one page at a time, ordered by date.
+    Pass the returned `next_cursor` as `cursor` to fetch the next page; it is null on the last page.
+    Use /api/attendance/export to download every matching record in one stream.
+    Example: /api/attendance/?start_date=2026-02-01&department=Engineering&status=Absent
     """
-    records = db.query(Attendance).all()
+    return FastJSONResponse(await run_db(
+        db, _get_all_attendance, start_date, end_date, department, status_filter, limit, cursor, include_total
+    ))
+
+
+def _get_all_attendance(db, start_date, end_date, department, status_filter, limit, cursor, include_total):
+    query = _filter_attendance(_select_records(db), start_date, end_date, department, status_filter, joined=True)
+    after = None
+    if cursor:
+        after = tuple(decode_cursor(cursor, date, int))
+        query = query.filter(tuple_(Attendance.date, Attendance.id) > after)
+    records = query.order_by(Attendance.date, Attendance.id).limit(limit + 1).all()
+    # A page can span archived months and the table; both sources are in (date, id) order
+    archived = list(itertools.islice(
+        _archived_records(start_date, end_date, department, status_filter, after), limit + 1
+    ))
+    if archived:
+        records = list(itertools.islice(heapq.merge(archived, records, key=_record_order), limit + 1))
+
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        last_date, last_id = _record_order(records[-1])
+        next_cursor = encode_cursor(last_date, last_id)
+
+    total = None
+    if include_total:
+        total = _filter_attendance(
+            db.query(func.count(Attendance.id)), start_date, end_date, department, status_filter
+        ).scalar() + attendance_archive.count(
+            start_date, end_date, department=department, status=status_filter.value if status_filter else None
+        )
+
     return {
-        "records": records,
-        "total": len(records)
+        "records": rows_to_dicts(records, EXPORT_KEYS),
+        "total": total,
+        "next_cursor": next_cursor
     }
+
+
+def _export_rows(session_factory, export_format, start_date, end_date, department, status_filter):
+    """
+    Stream matching records from a server-side cursor, EXPORT_BATCH_SIZE rows at a time,
+    merged in order with the records of archived months.
+    Runs in Starlette's threadpool and owns its session, since the response outlives the request scope.
+    """
+    db = session_factory()
+    try:
+        query = heapq.merge(
+            _archived_records(start_date, end_date, department, status_filter),
+            _filter_attendance(
+                _select_records(db), start_date, end_date, department, status_filter, joined=True
+            ).order_by(Attendance.date, Attendance.id).execution_options(
+                stream_results=True, yield_per=EXPORT_BATCH_SIZE
+            ),
+            key=_record_order
+        )
+
+        if export_format == ExportFormat.CSV:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(["id", "employee_id", "date", "status"])
+            for index, (record_id, employee_id, day, record_status) in enumerate(query, start=1):
+                writer.writerow([record_id, employee_id, day.isoformat(), record_status])
+                if index % EXPORT_BATCH_SIZE == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+        else:
+            lines = []
+            for record_id, employee_id, day, record_status in query:
+                lines.append(json.dumps({
+                    "id": record_id,
+                    "employee_id": employee_id,
+                    "date": day.isoformat(),
+                    "status": record_status
+                }))
+                if len(lines) == EXPORT_BATCH_SIZE:
+                    yield "\n".join(lines) + "\n"
+                    lines.clear()
+            if lines:
+                yield "\n".join(lines) + "\n"
+    finally:
+        db.close()
+
+
+@router.get("/export")
+async def export_attendance(
+    request: Request,
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format", description="ndjson or csv"),
+    start_date: Optional[date] = Query(None, description="Filter records from this date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Filter records until this date (YYYY-MM-DD)"),
+    department: Optional[str] = Query(None, description="Only employees in this department"),
+    status_filter: Optional[AttendanceStatus] = Query(None, alias="status", description="Present or Absent"),
+):
+    """
+    Stream every matching attendance record as NDJSON or CSV.
+    Rows are read in batches from a server-side cursor, so memory stays bounded regardless of result size.
+    Example: /api/attendance/export?format=csv&start_date=2026-01-01&end_date=2026-12-31
+    """
+    media_type = "text/csv" if export_format == ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        _export_rows(
+            await run_in_threadpool(read_session_factory, request),
+            export_format, start_date, end_date, department, status_filter
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="attendance.{export_format.value}"'}
+    )
+
+
+@router.get("/export/columnar")
+async def export_attendance_columnar(
+    request: Request,
+    export_format: ColumnarExportFormat = Query(
+        ColumnarExportFormat.PARQUET, alias="format", description="parquet or arrow (Arrow IPC stream)"
+    ),
+    start_date: Optional[date] = Query(None, description="Filter records from this date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Filter records until this date (YYYY-MM-DD)"),
+    department: Optional[str] = Query(None, description="Only employees in this department"),
+    status_filter: Optional[AttendanceStatus] = Query(None, alias="status", description="Present or Absent"),
+    created_after: Optional[datetime] = Query(
+        None, description="Only records created at or after this time: the X-Export-Watermark of the previous export"
+    ),
+):
+    """
+    Stream matching records with the employee's department and created_at as Parquet or an Arrow IPC stream.
+    Rows are read in batches from a server-side cursor and filtered in SQL (see export.py).
+    Pass the X-Export-Watermark header as `created_after` next time to fetch only the
+    records created since; exports with `created_after` stop at their own watermark.
+    Example: /api/attendance/export/columnar?format=parquet&created_after=2026-10-17T00:00:00%2B00:00
+    """
+    if export.pa is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Columnar exports need pyarrow on the server"
+        )
+    session_factory = await run_in_threadpool(read_session_factory, request)
+    next_watermark = await run_in_threadpool(_export_watermark, session_factory)
+    created_after = export.as_utc(created_after)
+    return StreamingResponse(
+        export.stream_export(
+            session_factory, export_format.value, start_date=start_date, end_date=end_date, department=department,
+            status=status_filter.value if status_filter else None,
+            created_after=created_after, created_before=next_watermark if created_after else None
+        ),
+        media_type=export.MEDIA_TYPES[export_format.value],
+        headers={
+            "Content-Disposition": f'attachment; filename="attendance.{export.EXTENSIONS[export_format.value]}"',
+            "X-Export-Watermark": next_watermark.isoformat(),
+        }
+    )
+
+
+def _export_watermark(session_factory):
+    db = session_factory()
+    try:
+        return export.watermark(db)
+    finally:
+        db.close()
@@ -1,48 +1,125 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy import func
-from database import get_db
+from datetime import date, timedelta
+from typing import Optional
+from database import DBSession, run_db
+from cache import response_cache, DASHBOARD_TAG
+from dashboard_stream import dashboard_stream
+from replicas import get_read_db
 from models.employee import Employee
-from models.attendance import Attendance
-from schemas.dashboard import DashboardSummary
+from models.rollup import AttendanceDailyRollup
+from schemas.dashboard import DashboardSummary, DashboardPeriod
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
 
+def resolve_period(period, start_date, end_date, today=None):
+    """Turn a named period or explicit dates into an inclusive (start, end) range."""
+    if period and (start_date or end_date):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either period or start_date/end_date, not both"
+        )
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must be on or before end_date"
+        )
+    today = today or date.today()
+    if period == DashboardPeriod.TODAY:
+        return today, today
+    if period == DashboardPeriod.WEEK:
+        return today - timedelta(days=today.weekday()), today
+    if period == DashboardPeriod.MONTH:
+        return today.replace(day=1), today
+    return start_date, end_date
+
+
 @router.get("/summary", response_model=DashboardSummary)
-def get_dashboard_summary(db: Session = Depends(get_db)):
+async def get_dashboard_summary(
+    request: Request,
+    response: Response,
+    period: Optional[DashboardPeriod] = Query(None, description="today, week or month"),
+    start_date: Optional[date] = Query(None, description="Count attendance from this date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Count attendance until this date (YYYY-MM-DD)"),
+    db: DBSession = Depends(get_read_db)
+):
     """
     Get organization-wide dashboard summary with statistics.
     Returns total employees, attendance metrics, and breakdown by department.
+    Attendance metrics cover all history unless a period or date range is given.
+    Responses are cached until the next employee or attendance write and carry an ETag;
+    send it back as If-None-Match to get 304 Not Modified while nothing has changed.
+    Example: /api/dashboard/summary?period=week
     """
-    # Get total number of employees
-    total_employees = db.query(Employee).count()
+    start_date, end_date = resolve_period(period, start_date, end_date)
 
-    # Get total attendance records
-    total_attendance = db.query(Attendance).count()
+    cached = response_cache.lookup(
+        request, "dashboard-summary", {"start_date": start_date, "end_date": end_date}, (DASHBOARD_TAG,)
+    )
+    if cached.not_modified:
+        return cached.not_modified_response()
+    cached.apply_headers(response)
+    if cached.value is not None:
+        return cached.value
 
-    # Get present and absent counts
-    present_count = db.query(Attendance).filter(
-        Attendance.status == "Present"
-    ).count()
-    absent_count = db.query(Attendance).filter(
-        Attendance.status == "Absent"
-    ).count()
+    return cached.store(await run_db(db, _get_dashboard_summary, start_date, end_date))
 
-    # Calculate attendance rate
-    attendance_rate = (
-        (present_count / total_attendance * 100) if total_attendance > 0 else 0
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_dashboard_summary(
+    period: Optional[DashboardPeriod] = Query(None, description="today, week or month"),
+    start_date: Optional[date] = Query(None, description="Count attendance from this date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Count attendance until this date (YYYY-MM-DD)"),
+):
+    """
+    Server-Sent Events stream of the dashboard summary, for EventSource clients instead of polling.
+    Sends a `snapshot` event with the same body as /summary, then a `delta` event with
+    the changed fields after every employee or attendance write (see dashboard_stream.py).
+    Example: new EventSource("/api/dashboard/stream?period=month")
+    """
+    start_date, end_date = resolve_period(period, start_date, end_date)
+    channel = await dashboard_stream.join(start_date, end_date, _get_dashboard_summary)
+    return StreamingResponse(
+        dashboard_stream.events(channel),
+        media_type="text/event-stream",
+        # Runs however the stream ends, including a disconnect before the first event
+        background=BackgroundTask(dashboard_stream.leave, channel),
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-    # Get employee count by department
+
+def _get_dashboard_summary(db, start_date, end_date):
+    # Employee count by department; the total is their sum, so one scan of employees
     dept_counts = db.query(
         Employee.department,
         func.count(Employee.id).label("count")
-    ).group_by(Employee.department).all()
+    ).filter(Employee.deleted_at.is_(None)).group_by(Employee.department).all()
 
     employees_by_department = {
         dept: count for dept, count in dept_counts
     }
+    total_employees = sum(employees_by_department.values())
+
+    # Total, present and absent counts from the daily rollup, so cost scales with
+    # days x departments rather than with the number of attendance records
+    attendance_query = db.query(
+        func.coalesce(func.sum(AttendanceDailyRollup.count), 0),
+        func.coalesce(func.sum(AttendanceDailyRollup.count).filter(AttendanceDailyRollup.status == "Present"), 0),
+        func.coalesce(func.sum(AttendanceDailyRollup.count).filter(AttendanceDailyRollup.status == "Absent"), 0)
+    )
+    if start_date:
+        attendance_query = attendance_query.filter(AttendanceDailyRollup.date >= start_date)
+    if end_date:
+        attendance_query = attendance_query.filter(AttendanceDailyRollup.date <= end_date)
+    total_attendance, present_count, absent_count = attendance_query.one()
+
+    # Calculate attendance rate
+    attendance_rate = (
+        (present_count / total_attendance * 100) if total_attendance > 0 else 0
+    )
 
     return {
         "total_employees": total_employees,
@@ -51,5 +128,7 @@ def get_dashboard_summary(db: Session = Depends(get_db)):
         "absent": absent_count,
         "attendance_rate": round(attendance_rate, 2),
         "total_departments": len(employees_by_department),
-        "employees_by_department": employees_by_department
+        "employees_by_department": employees_by_department,
+        "start_date": start_date,
+        "end_date": end_date
     }
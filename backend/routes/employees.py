@@ -1,69 +1,453 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import codecs
+import csv
+import json
+from collections import deque
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from starlette.background import BackgroundTask
+from sqlalchemy import delete, func, insert, or_, update
 from sqlalchemy.exc import IntegrityError
-from database import get_db
+from database import DBSession, get_db, run_db, SessionLocal, violated_constraint
+from bulk import dialect_insert
 from models.employee import Employee
-from schemas.employee import EmployeeCreate, EmployeeResponse, EmployeeList
+from pagination import encode_cursor, decode_cursor
+from serialization import FastJSONResponse, rows_to_dicts
+import purge
+import rollups
+from cache import response_cache, DASHBOARD_TAG, employee_tag
+from dashboard_stream import dashboard_stream
+from employee_cache import employee_cache
+from replicas import get_read_db
+from schemas.employee import (
+    EmployeeCreate, EmployeeResponse, EmployeeList, EmployeeListItem, EmployeeSortKey, ImportFormat, DeleteMode,
+)
 
 router = APIRouter(prefix="/api/employees", tags=["employees"])
 
 
 @router.post("/", response_model=EmployeeResponse, status_code=status.HTTP_201_CREATED)
-def create_employee(employee: EmployeeCreate, db: Session = Depends(get_db)):
+async def create_employee(employee: EmployeeCreate, db: DBSession = Depends(get_db)):
     """
     Create a new employee.
     Returns 201 on success, 409 if employeeId or email already exists.
     """
-    # Check if employee already exists
-    existing_employee = db.query(Employee).filter(
-        (Employee.employee_id == employee.employee_id) | (Employee.email == employee.email)
-    ).first()
+    return await run_db(db, _create_employee, employee)
 
-    if existing_employee:
-        if existing_employee.employee_id == employee.employee_id:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Employee ID '{employee.employee_id}' already exists"
-            )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Email '{employee.email}' already exists"
-            )
 
+# Columns of EmployeeResponse, returned straight from the INSERT
+EMPLOYEE_RESPONSE_COLUMNS = tuple(getattr(Employee, field) for field in EmployeeResponse.model_fields)
+# Unique indexes on employees and the error each one maps to
+EMPLOYEE_CONFLICTS = {
+    "ix_employees_employee_id": lambda employee: f"Employee ID '{employee.employee_id}' already exists",
+    "ix_employees_email": lambda employee: f"Email '{employee.email}' already exists",
+}
+
+
+def _create_employee(db, employee):
+    # The unique indexes reject duplicates, so no lookup first; RETURNING replaces refresh()
     try:
-        db_employee = Employee(**employee.model_dump())
-        db.add(db_employee)
+        created = db.execute(
+            insert(Employee).values(**employee.model_dump()).returning(*EMPLOYEE_RESPONSE_COLUMNS)
+        ).one()
         db.commit()
-        db.refresh(db_employee)
-        return db_employee
-    except IntegrityError:
+    except IntegrityError as error:
         db.rollback()
+        conflict = EMPLOYEE_CONFLICTS.get(violated_constraint(error, Employee.__table__))
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
-            detail="Duplicate entry detected"
+            detail=conflict(employee) if conflict else "Duplicate entry detected"
         )
+    response_cache.invalidate(DASHBOARD_TAG, employee_tag(created.employee_id))
+    dashboard_stream.notify()
+    employee_cache.invalidate()
+    return created._asdict()
+
+
+class _RequestBodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator consumes the request body.
+    The stock response listens on `receive` for disconnects, which would swallow the
+    request body messages; a disconnect surfaces from request.stream() instead.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def _iter_lines(chunks):
+    """Decode a byte stream into lines without buffering more than one line."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+# Longest CSV record read, in characters and lines; past either an open quote is
+# taken to be a stray one
+CSV_MAX_RECORD_CHARS = 64 * 1024
+CSV_MAX_RECORD_LINES = 100
+
+
+def _ends_in_quoted_field(line, in_quotes):
+    """Whether a quoted field is open at the end of `line`, given whether one was at its start."""
+    if '"' not in line:
+        return in_quotes
+    field_start = not in_quotes
+    index = 0
+    while index < len(line):
+        char = line[index]
+        if in_quotes:
+            if char == '"':
+                if line.startswith('"', index + 1):  # An escaped quote
+                    index += 1
+                else:
+                    in_quotes = False
+        elif char == '"' and field_start:
+            in_quotes = True
+        # As in the csv module, only a quote that starts a field opens a quoted field
+        field_start = char == "," and not in_quotes
+        index += 1
+    return in_quotes
+
+
+class _CSVRecordReader:
+    """
+    Split CSV lines into records, tracking open quoted fields as lines arrive so each
+    record is parsed once, when it closes. A record still open past
+    CSV_MAX_RECORD_CHARS or CSV_MAX_RECORD_LINES, or at the end of the body, has its
+    first line rejected and the lines after it read again, so one stray quote costs
+    one row.
+    """
+
+    def __init__(self, header):
+        self.header = header
+        self.pending = []  # (line_number, line) of the open record
+        self.chars = 0
+        self.in_quotes = False
+
+    def feed(self, line_number, line):
+        """(line_number, row dict or ValueError) for each record `line` completes."""
+        parsed, queue = [], deque([(line_number, line)])
+        while queue:
+            line_number, line = queue.popleft()
+            self.pending.append((line_number, line))
+            self.chars += len(line) + 1
+            self.in_quotes = _ends_in_quoted_field(line, self.in_quotes)
+            if not self.in_quotes:
+                parsed.extend(self._parse())
+            elif self.chars > CSV_MAX_RECORD_CHARS or len(self.pending) > CSV_MAX_RECORD_LINES:
+                parsed.append(self._reject_first_line(queue))
+        return parsed
+
+    def finish(self):
+        """Records left open when the body ended."""
+        parsed, queue = [], deque()
+        while self.pending:
+            parsed.append(self._reject_first_line(queue))
+            while queue:
+                parsed.extend(self.feed(*queue.popleft()))
+        return parsed
+
+    def _reject_first_line(self, queue):
+        (line_number, _), *rest = self.pending
+        queue.extendleft(reversed(rest))
+        self.pending, self.chars, self.in_quotes = [], 0, False
+        return line_number, ValueError("Unterminated quoted field")
+
+    def _parse(self):
+        line_number = self.pending[0][0]
+        text = "\n".join(line for _, line in self.pending)
+        self.pending, self.chars = [], 0
+        try:
+            values = next(csv.reader([text], strict=True), [])
+        except csv.Error as error:
+            return [(line_number, ValueError(f"Malformed CSV: {error}"))]
+        if not values:
+            return []
+        if len(values) != len(self.header):
+            return [(line_number, ValueError(f"Expected {len(self.header)} columns, found {len(values)}"))]
+        return [(line_number, dict(zip(self.header, values)))]
+
+
+async def _iter_csv_rows(lines, header):
+    """
+    Yield (line_number, row) pairs, joining quoted fields that span lines. Malformed
+    records are yielded as a ValueError in place of the row; see _CSVRecordReader.
+    """
+    reader = _CSVRecordReader(header)
+    line_number = 1
+    async for line in lines:
+        line_number += 1
+        for parsed in reader.feed(line_number, line):
+            yield parsed
+    for parsed in reader.finish():
+        yield parsed
+
 
+async def _iter_ndjson_rows(lines):
+    """Yield (line_number, row) pairs; unparseable lines are yielded as the raw string."""
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError:
+            yield line_number, line
+
+
+def _import_batch(batch):
+    """
+    Write one batch of validated employees in its own transaction.
+    Duplicates are found with one set-based lookup on employee_id/email;
+    ON CONFLICT DO NOTHING covers rows inserted concurrently since the lookup.
+    Returns (created_count, rejections).
+    """
+    rejections = []
+    candidates = []
+    seen_ids, seen_emails = set(), set()
+    for line_number, employee in batch:
+        if employee.employee_id in seen_ids or employee.email in seen_emails:
+            rejections.append(_rejection(line_number, employee.employee_id, ["Duplicate row within file"]))
+            continue
+        seen_ids.add(employee.employee_id)
+        seen_emails.add(employee.email)
+        candidates.append((line_number, employee))
+
+    if not candidates:
+        return 0, rejections
+
+    db = SessionLocal()
+    try:
+        existing = db.query(Employee.employee_id, Employee.email).filter(
+            or_(Employee.employee_id.in_(seen_ids), Employee.email.in_(seen_emails))
+        ).all()
+        existing_ids = {employee_id for employee_id, _ in existing}
+        existing_emails = {email for _, email in existing}
+
+        rows = []
+        for line_number, employee in candidates:
+            if employee.employee_id in existing_ids:
+                rejections.append(_rejection(
+                    line_number, employee.employee_id, [f"Employee ID '{employee.employee_id}' already exists"]
+                ))
+            elif employee.email in existing_emails:
+                rejections.append(_rejection(
+                    line_number, employee.employee_id, [f"Email '{employee.email}' already exists"]
+                ))
+            else:
+                rows.append((line_number, employee))
+
+        if not rows:
+            return 0, rejections
+
+        stmt = dialect_insert(db, Employee).values(
+            [employee.model_dump() for _, employee in rows]
+        ).on_conflict_do_nothing().returning(Employee.employee_id)
+        inserted = {employee_id for (employee_id,) in db.execute(stmt)}
+        db.commit()
+    finally:
+        db.close()
+    if inserted:
+        response_cache.invalidate(DASHBOARD_TAG, *(employee_tag(employee_id) for employee_id in inserted))
+        dashboard_stream.notify()
+        employee_cache.invalidate()
 
+    for line_number, employee in rows:
+        if employee.employee_id not in inserted:
+            rejections.append(_rejection(line_number, employee.employee_id, ["Duplicate entry detected"]))
+    return len(inserted), rejections
+
+
+def _rejection(line_number, employee_id, errors):
+    return {"event": "rejected", "line": line_number, "employee_id": employee_id, "errors": errors}
+
+
+def _event(payload):
+    return json.dumps(payload) + "\n"
+
+
+@router.post("/import", status_code=status.HTTP_200_OK)
+async def import_employees(
+    request: Request,
+    format: Optional[ImportFormat] = Query(None, description="csv or ndjson; inferred from Content-Type if omitted"),
+    batch_size: int = Query(1000, ge=1, le=10000, description="Rows written per commit"),
+):
+    """
+    Bulk-load employees from a CSV (with header row) or NDJSON request body.
+    The body is parsed incrementally and rows are validated with EmployeeCreate,
+    checked for duplicates and committed in batches of `batch_size`.
+    Streams back NDJSON events: one `rejected` event per bad row, a `progress`
+    event after each committed batch, and a final `complete` event with totals.
+    Example: curl -X POST --data-binary @staff.csv -H "Content-Type: text/csv" /api/employees/import
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        if "csv" in content_type:
+            format = ImportFormat.CSV
+        elif "ndjson" in content_type or "json" in content_type:
+            format = ImportFormat.NDJSON
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Send text/csv or application/x-ndjson, or pass ?format="
+            )
+
+    lines = _iter_lines(request.stream())
+    if format == ImportFormat.CSV:
+        try:
+            header = [column.strip() for column in next(csv.reader([await lines.__anext__()]))]
+        except StopAsyncIteration:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="CSV body is empty")
+        missing = set(EmployeeCreate.model_fields) - set(header)
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"CSV header is missing columns: {', '.join(sorted(missing))}"
+            )
+        rows = _iter_csv_rows(lines, header)
+    else:
+        rows = _iter_ndjson_rows(lines)
+
+    async def events():
+        processed = created = rejected = 0
+        batch = []
+
+        async def flush():
+            nonlocal created, rejected
+            batch_created, rejections = await run_in_threadpool(_import_batch, batch)
+            created += batch_created
+            rejected += len(rejections)
+            batch.clear()
+            return "".join(_event(rejection) for rejection in rejections) + _event({
+                "event": "progress", "processed": processed, "created": created, "rejected": rejected
+            })
+
+        async for line_number, row in rows:
+            processed += 1
+            try:
+                if isinstance(row, ValueError):
+                    raise row
+                if not isinstance(row, dict):
+                    raise ValueError("Row is not a JSON object")
+                batch.append((line_number, EmployeeCreate.model_validate(row)))
+            except ValidationError as exc:
+                rejected += 1
+                errors = [f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors()]
+                yield _event(_rejection(line_number, row.get("employee_id"), errors))
+            except ValueError as exc:
+                rejected += 1
+                yield _event(_rejection(line_number, None, [str(exc)]))
+            if len(batch) >= batch_size:
+                yield await flush()
+
+        if batch:
+            yield await flush()
+        yield _event({"event": "complete", "processed": processed, "created": created, "rejected": rejected})
+
+    return _RequestBodyStreamingResponse(events(), media_type="application/x-ndjson")
+
+
+EMPLOYEE_FIELDS = tuple(EmployeeListItem.model_fields)
+# Type of each sort key, as stored in cursors
+SORT_KEY_KINDS = {EmployeeSortKey.ID: int, EmployeeSortKey.EMPLOYEE_ID: str}
+
+
+# Items carry only the requested `fields`; FastJSONResponse skips response_model serialization
 @router.get("/", response_model=EmployeeList)
-def get_employees(db: Session = Depends(get_db)):
+async def get_employees(
+    limit: int = Query(100, ge=1, le=1000, description="Maximum employees per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    order_by: EmployeeSortKey = Query(EmployeeSortKey.ID, description="Keyset sort column"),
+    department: Optional[str] = Query(None, description="Exact department match"),
+    name_prefix: Optional[str] = Query(None, min_length=1, description="Full name starts with"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. employee_id,full_name"),
+    include_total: bool = Query(True, description="Set to false to skip the count query"),
+    db: DBSession = Depends(get_read_db)
+):
     """
-    Retrieve all employees.
+    Retrieve employees one page at a time using keyset pagination.
+    Pass the returned `next_cursor` as `cursor` to fetch the next page; it is null on the last page.
+    Example: /api/employees/?department=Engineering&fields=employee_id,full_name&include_total=false
     """
-    employees = db.query(Employee).all()
+    return FastJSONResponse(await run_db(
+        db, _get_employees, limit, cursor, order_by, department, name_prefix, fields, include_total
+    ))
+
+
+def _get_employees(db, limit, cursor, order_by, department, name_prefix, fields, include_total):
+    selected = EMPLOYEE_FIELDS
+    if fields is not None:
+        selected = tuple(field.strip() for field in fields.split(",") if field.strip())
+        if not selected:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="fields must name at least one column"
+            )
+        unknown = set(selected) - set(EMPLOYEE_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+
+    sort_column = getattr(Employee, order_by.value)
+    filters = [Employee.deleted_at.is_(None)]
+    if department:
+        filters.append(Employee.department == department)
+    if name_prefix:
+        filters.append(Employee.full_name.startswith(name_prefix, autoescape=True))
+
+    # Always select the sort key so the next cursor can be built from the last row
+    columns = [getattr(Employee, field) for field in selected]
+    if order_by.value not in selected:
+        columns.append(sort_column)
+
+    query = db.query(*columns).filter(*filters)
+    if cursor:
+        (last_key,) = decode_cursor(cursor, SORT_KEY_KINDS[order_by])
+        query = query.filter(sort_column > last_key)
+    rows = query.order_by(sort_column).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(getattr(rows[-1], order_by.value))
+
+    total = None
+    if include_total:
+        total = db.query(func.count(Employee.id)).filter(*filters).scalar()
+
     return {
-        "employees": employees,
-        "total": len(employees)
+        "employees": rows_to_dicts(rows, selected),
+        "total": total,
+        "next_cursor": next_cursor
     }
 
 
 @router.get("/{employee_id}", response_model=EmployeeResponse)
-def get_employee(employee_id: str, db: Session = Depends(get_db)):
+async def get_employee(employee_id: str, db: DBSession = Depends(get_read_db)):
     """
     Retrieve a specific employee by ID.
     Returns 404 if not found.
     """
-    employee = db.query(Employee).filter(Employee.employee_id == employee_id).first()
+    return await run_db(db, _get_employee, employee_id)
+
+
+def _get_employee(db, employee_id):
+    employee = db.query(Employee).filter(Employee.employee_id == employee_id, Employee.deleted_at.is_(None)).first()
     if not employee:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -72,19 +456,50 @@ def get_employee(employee_id: str, db: Session = Depends(get_db)):
     return employee
 
 
-@router.delete("/{employee_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_employee(employee_id: str, db: Session = Depends(get_db)):
+@router.delete(
+    "/{employee_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={202: {"description": "Employee hidden; attendance history is being purged"}}
+)
+async def delete_employee(
+    employee_id: str,
+    mode: DeleteMode = Query(DeleteMode.IMMEDIATE, description="immediate or background"),
+    db: DBSession = Depends(get_db)
+):
     """
-    Delete an employee by ID.
+    Delete an employee by ID, together with their attendance history.
     Returns 404 if not found, 204 on success.
+    With mode=background the employee disappears at once and 202 is returned in constant
+    time; the history is purged in batches after the response (see purge.py), and
+    dashboard totals include it until its batch is purged.
     """
-    employee = db.query(Employee).filter(Employee.employee_id == employee_id).first()
+    await run_db(db, _delete_employee, employee_id, mode)
+    if mode == DeleteMode.BACKGROUND:
+        return Response(
+            status_code=status.HTTP_202_ACCEPTED,
+            background=BackgroundTask(purge.purge_employee, SessionLocal, employee_id)
+        )
+    return None
+
+
+def _delete_employee(db, employee_id, mode):
+    employee = db.query(Employee.id, Employee.employee_id, Employee.department).filter(
+        Employee.employee_id == employee_id, Employee.deleted_at.is_(None)
+    ).first()
     if not employee:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Employee with ID '{employee_id}' not found"
         )
 
-    db.delete(employee)
+    if mode == DeleteMode.BACKGROUND:
+        # The purge removes the history, and its rollup counts, batch by batch
+        db.execute(update(Employee).where(Employee.employee_id == employee_id).values(deleted_at=func.now()))
+    else:
+        rollups.remove_employee(db, employee)
+        # Attendance goes with it through ON DELETE CASCADE, without being loaded
+        db.execute(delete(Employee).where(Employee.employee_id == employee_id))
     db.commit()
-    return None
+    response_cache.invalidate(DASHBOARD_TAG, employee_tag(employee_id))
+    dashboard_stream.notify()
+    employee_cache.invalidate()
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict
-from typing import List
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import Dict, List, Optional
 from datetime import date
 from enum import Enum
 
@@ -9,6 +9,16 @@ class AttendanceStatus(str, Enum):
     ABSENT = "Absent"
 
 
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ColumnarExportFormat(str, Enum):
+    PARQUET = "parquet"
+    ARROW = "arrow"
+
+
 class AttendanceCreate(BaseModel):
     employee_id: str
     date: date
@@ -65,7 +75,8 @@ class AttendanceResponse(BaseModel):
 
 class AttendanceList(BaseModel):
     records: List[AttendanceResponse]
-    total: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -78,7 +89,8 @@ class AttendanceList(BaseModel):
                         "status": "Present"
                     }
                 ],
-                "total": 1
+                "total": 1,
+                "next_cursor": None
             }
         }
     )
@@ -102,3 +114,149 @@ class AttendanceSummary(BaseModel):
             }
         }
     )
+
+
+class ConflictPolicy(str, Enum):
+    SKIP = "skip"            # Keep the existing record, report the row as duplicate
+    OVERWRITE = "overwrite"  # Replace the existing record's status
+    FAIL = "fail"            # Reject the whole batch if any row conflicts
+
+
+class BulkRowStatus(str, Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DUPLICATE = "duplicate"
+    UNKNOWN_EMPLOYEE = "unknown_employee"
+    ARCHIVED = "archived"  # Dated in an archived, read-only month
+
+
+class AttendanceBulkCreate(BaseModel):
+    records: List[AttendanceCreate] = Field(..., min_length=1, max_length=10000)
+    on_conflict: ConflictPolicy = ConflictPolicy.SKIP
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "records": [
+                    {"employee_id": "EMP001", "date": "2026-02-06", "status": "Present"},
+                    {"employee_id": "EMP002", "date": "2026-02-06", "status": "Absent"}
+                ],
+                "on_conflict": "skip"
+            }
+        }
+    )
+
+
+class AttendanceBulkRowResult(BaseModel):
+    index: int
+    employee_id: str
+    date: date
+    result: BulkRowStatus
+
+
+class AttendanceBulkResponse(BaseModel):
+    results: List[AttendanceBulkRowResult]
+    created: int
+    updated: int
+    duplicates: int
+    unknown_employees: int
+    archived: int
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "results": [
+                    {"index": 0, "employee_id": "EMP001", "date": "2026-02-06", "result": "created"},
+                    {"index": 1, "employee_id": "EMP999", "date": "2026-02-06", "result": "unknown_employee"}
+                ],
+                "created": 1,
+                "updated": 0,
+                "duplicates": 0,
+                "unknown_employees": 1,
+                "archived": 0
+            }
+        }
+    )
+
+
+class AttendanceSummaryBatchRequest(BaseModel):
+    employee_ids: Optional[List[str]] = Field(None, min_length=1, max_length=1000)
+    department: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+    @model_validator(mode="after")
+    def require_selection(self):
+        if not self.employee_ids and not self.department:
+            raise ValueError("Provide employee_ids, department, or both")
+        return self
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "employee_ids": ["EMP001", "EMP002"],
+                "start_date": "2026-02-01",
+                "end_date": "2026-02-28"
+            }
+        }
+    )
+
+
+class AttendanceSummaryBatch(BaseModel):
+    summaries: List[AttendanceSummary]
+    not_found: List[str]
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "summaries": [
+                    {
+                        "employee_id": "EMP001",
+                        "total_records": 20,
+                        "present": 18,
+                        "absent": 2,
+                        "attendance_percentage": 90.0
+                    }
+                ],
+                "not_found": ["EMP999"]
+            }
+        }
+    )
+
+
+class CalendarRow(BaseModel):
+    employee_id: str
+    full_name: str
+    statuses: str  # One character per day of the month, see AttendanceCalendar.legend
+    present: int
+    absent: int
+
+
+class AttendanceCalendar(BaseModel):
+    department: str
+    month: str
+    start_date: date
+    end_date: date
+    legend: Dict[str, str]
+    employees: List[CalendarRow]
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "department": "Engineering",
+                "month": "2026-02",
+                "start_date": "2026-02-01",
+                "end_date": "2026-02-28",
+                "legend": {"0": "Unmarked", "1": "Present", "2": "Absent"},
+                "employees": [
+                    {
+                        "employee_id": "EMP001",
+                        "full_name": "John Doe",
+                        "statuses": "1111200111110011111001111100",
+                        "present": 19,
+                        "absent": 1
+                    }
+                ]
+            }
+        }
+    )
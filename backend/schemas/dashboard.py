@@ -1,5 +1,14 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Dict
+from typing import Dict, Optional
+from datetime import date
+from enum import Enum
+
+
+class DashboardPeriod(str, Enum):
+    TODAY = "today"
+    WEEK = "week"    # Monday of the current week through today
+    MONTH = "month"  # First of the current month through today
+
 
 class DashboardSummary(BaseModel):
     total_employees: int
@@ -9,6 +18,8 @@ class DashboardSummary(BaseModel):
     attendance_rate: float
     total_departments: int
     employees_by_department: Dict[str, int]
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -23,7 +34,9 @@ class DashboardSummary(BaseModel):
                     "Engineering": 5,
                     "HR": 2,
                     "Sales": 3
-                }
+                },
+                "start_date": "2026-02-01",
+                "end_date": "2026-02-06"
             }
         }
     )
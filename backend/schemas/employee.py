@@ -1,5 +1,21 @@
 from pydantic import BaseModel, EmailStr, ConfigDict, Field
-from typing import List
+from typing import List, Optional
+from enum import Enum
+
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class EmployeeSortKey(str, Enum):
+    ID = "id"
+    EMPLOYEE_ID = "employee_id"
+
+
+class DeleteMode(str, Enum):
+    IMMEDIATE = "immediate"    # Delete the employee and their history in this request
+    BACKGROUND = "background"  # Hide the employee now, purge their history after responding
 
 
 class EmployeeCreate(BaseModel):
@@ -57,9 +73,19 @@ class EmployeeResponse(BaseModel):
     )
 
 
+# List rows carry only the columns requested via `fields`
+class EmployeeListItem(BaseModel):
+    id: Optional[int] = None
+    employee_id: Optional[str] = None
+    full_name: Optional[str] = None
+    email: Optional[str] = None
+    department: Optional[str] = None
+
+
 class EmployeeList(BaseModel):
-    employees: List[EmployeeResponse]
-    total: int
+    employees: List[EmployeeListItem]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -73,7 +99,8 @@ class EmployeeList(BaseModel):
                         "department": "Engineering"
                     }
                 ],
-                "total": 1
+                "total": 1,
+                "next_cursor": None
             }
         }
     )
@@ -0,0 +1,36 @@
+"""
+Fast JSON responses for list endpoints.
+
+Handlers select plain column tuples, turn them into dicts and return a
+FastJSONResponse, which encodes straight to bytes with orjson when it is installed
+(pydantic-core's Rust encoder otherwise). FastAPI passes Response objects through
+untouched, so the per-row model validation and second serialization pass that
+`response_model` would do are skipped. The route's `response_model` still describes
+the payload in OpenAPI, so the dicts must match it exactly.
+"""
+from fastapi import Response
+from pydantic_core import to_json
+
+try:
+    import orjson  # Optional dependency: faster than pydantic-core for plain dicts
+except ImportError:
+    orjson = None
+
+
+def dumps(payload):
+    """Encode dicts/lists of str, int, float, bool, None and dates to JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return to_json(payload)
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content):
+        return dumps(content)
+
+
+def rows_to_dicts(rows, keys):
+    """Plain dicts from result rows; several times cheaper per row than Row._asdict()."""
+    return [dict(zip(keys, row)) for row in rows]
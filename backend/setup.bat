@@ -19,7 +19,11 @@ REM Install dependencies
 echo Installing dependencies...
 pip install -r requirements.txt
 
-REM Create database and run
+REM Create or upgrade the database schema
+echo Applying database migrations...
+python migrate.py
+
+REM Run
 echo.
 echo ===============================================
 echo Setup complete! Starting server...
@@ -19,6 +19,10 @@ source venv/bin/activate
 echo "Installing dependencies..."
 pip install -r requirements.txt
 
+# Create or upgrade the database schema
+echo "Applying database migrations..."
+python migrate.py
+
 # Run server
 echo ""
 echo "========================================"
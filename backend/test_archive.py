@@ -0,0 +1,235 @@
+"""
+Tests for archiving closed attendance months to Parquet files, reading them back
+through the API, and monthly partitions on PostgreSQL when TEST_POSTGRES_URL points
+at a disposable database
+"""
+import os
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+pytest.importorskip("pyarrow")
+
+import archive
+import migrate
+import partitions
+import rollups
+from archive import archive_month, attendance_archive
+from cache import response_cache
+from database import Base, SessionLocal, violated_constraint
+from models.attendance import Attendance
+from models.employee import Employee
+
+JANUARY = date(2025, 1, 1)
+FEBRUARY = date(2025, 2, 1)
+
+
+def _seed(client, make_employee):
+    make_employee("EMP001", department="Engineering")
+    make_employee("EMP002", department="Sales")
+    records = []
+    for day in range(1, 32, 3):
+        records.append({"employee_id": "EMP001", "date": f"2025-01-{day:02d}",
+                        "status": "Present" if day % 2 else "Absent"})
+        records.append({"employee_id": "EMP002", "date": f"2025-01-{day:02d}", "status": "Present"})
+    for day in (3, 4, 5):
+        records.append({"employee_id": "EMP001", "date": f"2025-02-{day:02d}", "status": "Present"})
+        records.append({"employee_id": "EMP002", "date": f"2025-02-{day:02d}", "status": "Absent"})
+    assert client.post("/api/attendance/bulk", json={"records": records}).json()["created"] == 28
+
+
+def _snapshot(client):
+    """Responses of every read that combines the attendance table with the archive."""
+    response_cache.clear()
+    pages, cursor = [], None
+    while True:
+        page = client.get("/api/attendance/", params={"limit": 5, **({"cursor": cursor} if cursor else {})}).json()
+        pages.append(page)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    history = client.get("/api/attendance/employee/EMP001").json()
+    return {
+        "pages": pages,
+        "filtered": client.get(
+            "/api/attendance/", params={"department": "Sales", "status": "Present", "start_date": "2025-01-10"}
+        ).json(),
+        "history": (history["total"], sorted(history["records"], key=lambda record: record["id"])),
+        "export": client.get("/api/attendance/export?format=csv").text,
+        "partial summary": client.post("/api/attendance/summary/batch", json={
+            "department": "Engineering", "start_date": "2025-01-10", "end_date": "2025-02-03"
+        }).json(),
+        "summary": client.get("/api/attendance/employee/EMP002/summary").json(),
+        "calendar": client.get("/api/attendance/calendar?department=Engineering&month=2025-01").json(),
+        "dashboard": client.get("/api/dashboard/summary?start_date=2025-01-01&end_date=2025-02-28").json(),
+    }
+
+
+def _mismatches():
+    db = SessionLocal()
+    try:
+        return rollups.find_mismatches(db)
+    finally:
+        db.close()
+
+
+def test_archived_month_reads_like_before(client, make_employee):
+    _seed(client, make_employee)
+    before = _snapshot(client)
+    assert sum(len(page["records"]) for page in before["pages"]) == 28
+
+    assert archive_month(SessionLocal, JANUARY) == 22
+    db = SessionLocal()
+    try:
+        assert db.query(Attendance).count() == 6
+        assert rollups.find_mismatches(db) == []
+        rollups.rebuild(db)
+        assert rollups.find_mismatches(db) == []
+    finally:
+        db.close()
+    assert attendance_archive.months()[JANUARY]["state"] == archive.ARCHIVED
+    assert _snapshot(client) == before
+
+
+def test_archived_months_are_read_only(client, make_employee):
+    _seed(client, make_employee)
+    archive_month(SessionLocal, JANUARY)
+
+    response = client.post("/api/attendance/", json={"employee_id": "EMP001", "date": "2025-01-02", "status": "Present"})
+    assert response.status_code == 409
+    assert "archived" in response.json()["detail"]
+
+    body = client.post("/api/attendance/bulk", json={"records": [
+        {"employee_id": "EMP001", "date": "2025-01-02", "status": "Present"},
+        {"employee_id": "EMP001", "date": "2025-02-06", "status": "Present"},
+    ]}).json()
+    assert [row["result"] for row in body["results"]] == ["archived", "created"]
+    assert (body["created"], body["archived"]) == (1, 1)
+    assert _mismatches() == []
+
+
+def test_interrupted_archive_resumes_without_double_counting(client, make_employee, monkeypatch):
+    _seed(client, make_employee)
+    before = _snapshot(client)
+
+    def interrupted(*args):
+        raise RuntimeError("interrupted")
+
+    monkeypatch.setattr(archive, "_delete_archived_rows", interrupted)
+    with pytest.raises(RuntimeError):
+        archive_month(SessionLocal, JANUARY)
+    # The records are in the file and still in the table
+    assert attendance_archive.months()[JANUARY]["state"] == archive.ARCHIVING
+    assert _snapshot(client) == before
+    assert _mismatches() == []
+
+    monkeypatch.undo()
+    assert archive.pending_months(SessionLocal, FEBRUARY) == [JANUARY]
+    assert archive_month(SessionLocal, JANUARY) == 22
+    assert attendance_archive.months()[JANUARY]["state"] == archive.ARCHIVED
+    assert _snapshot(client) == before
+
+
+def test_writes_racing_the_archive_are_rejected_not_lost(client, make_employee, monkeypatch):
+    _seed(client, make_employee)
+    before = _snapshot(client)
+    write_file = archive._write_file
+    responses = []
+
+    def racing_writes(db, store, month):
+        entry = write_file(db, store, month)
+        # Written after the snapshot: an overwrite, and a mark that checked before the month closed
+        responses.append(client.post("/api/attendance/bulk", json={"on_conflict": "overwrite", "records": [
+            {"employee_id": "EMP001", "date": "2025-01-01", "status": "Absent"},
+            {"employee_id": "EMP002", "date": "2025-01-02", "status": "Present"},
+        ]}).json())
+        closed, checks = attendance_archive.is_archived, []
+
+        def checked_before_closing(day):
+            checks.append(day)
+            return len(checks) > 1 and closed(day)
+
+        monkeypatch.setattr(attendance_archive, "is_archived", checked_before_closing)
+        responses.append(client.post(
+            "/api/attendance/", json={"employee_id": "EMP001", "date": "2025-01-02", "status": "Present"}
+        ))
+        monkeypatch.setattr(attendance_archive, "is_archived", closed)
+        return entry
+
+    monkeypatch.setattr(archive, "_write_file", racing_writes)
+    assert archive_month(SessionLocal, JANUARY) == 22
+    bulk, mark = responses
+    assert (bulk["archived"], bulk["updated"], bulk["created"]) == (2, 0, 0)
+    assert mark.status_code == 409
+    assert _snapshot(client) == before
+    assert _mismatches() == []
+
+
+def test_deleting_employees_keeps_rollups_consistent_with_the_archive(client, make_employee):
+    _seed(client, make_employee)
+    archive_month(SessionLocal, JANUARY)
+
+    assert client.delete("/api/employees/EMP001").status_code == 204
+    assert client.delete("/api/employees/EMP002?mode=background").status_code == 202
+    assert _mismatches() == []
+    # Archived records are a snapshot and outlive the employees
+    assert client.get("/api/attendance/").json()["total"] == 22
+
+
+def test_retention_window_selects_months_to_archive(client, make_employee):
+    assert archive.retention_start(date(2026, 10, 18), 3) == date(2026, 7, 1)
+    assert archive.retention_start(date(2026, 2, 1), 2) == date(2025, 12, 1)
+    assert archive.retention_start(date(2026, 10, 18), 0) is None
+
+    _seed(client, make_employee)
+    assert archive.pending_months(SessionLocal, date(2025, 3, 1)) == [JANUARY, FEBRUARY]
+    archive_month(SessionLocal, JANUARY)
+    assert archive.pending_months(SessionLocal, date(2025, 3, 1)) == [FEBRUARY]
+
+
+def test_postgresql_archives_a_month_by_dropping_its_partition(tmp_path):
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE IF EXISTS alembic_version")
+    migrate.run_migrations(url)
+    session_factory = sessionmaker(bind=engine)
+    # The migration creates partitions from the month after the current one
+    month = partitions.add_months(date.today().replace(day=1), 1)
+    name = partitions.partition_name(month)
+
+    with session_factory() as db:
+        assert partitions.is_partitioned(db.connection())
+        assert name in partitions.partition_bounds(db.connection())
+        employee = Employee(
+            employee_id="EMP001", full_name="Employee EMP001", email="emp001@example.com", department="Engineering"
+        )
+        db.add(employee)
+        db.flush()
+        db.add_all([
+            Attendance(employee_pk=employee.id, date=month.replace(day=day), status="Present") for day in (1, 2, 3)
+        ])
+        db.commit()
+
+        # The partition's unique index has its own name; it maps back to the table's constraint
+        db.add(Attendance(employee_pk=employee.id, date=month, status="Absent"))
+        with pytest.raises(IntegrityError) as error:
+            db.commit()
+        db.rollback()
+        assert violated_constraint(error.value, Attendance.__table__) == "uq_employee_attendance_date"
+
+    store = archive.Archive(str(tmp_path))
+    assert archive_month(session_factory, month, archive=store) == 3
+    with session_factory() as db:
+        assert name not in partitions.partition_bounds(db.connection())
+        assert db.query(Attendance).count() == 0
+    assert [day.day for (day,) in store.rows(("date",))] == [1, 2, 3]
+
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
@@ -0,0 +1,61 @@
+"""
+Tests for POST /api/attendance/bulk
+"""
+
+
+def _row(employee_id, day, status="Present"):
+    return {"employee_id": employee_id, "date": f"2026-02-{day:02d}", "status": status}
+
+
+def test_bulk_reports_created_duplicate_and_unknown(client, make_employee):
+    make_employee("EMP001")
+    make_employee("EMP002")
+    client.post("/api/attendance/", json=_row("EMP001", 6))
+
+    response = client.post("/api/attendance/bulk", json={"records": [
+        _row("EMP001", 6),
+        _row("EMP002", 6),
+        _row("EMP002", 6, "Absent"),
+        _row("EMP999", 6),
+    ]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [row["result"] for row in body["results"]] == [
+        "duplicate", "created", "duplicate", "unknown_employee"
+    ]
+    assert (body["created"], body["duplicates"], body["unknown_employees"]) == (1, 2, 1)
+    records = client.get("/api/attendance/employee/EMP002").json()["records"]
+    assert [record["status"] for record in records] == ["Present"]
+
+
+def test_bulk_overwrite_updates_existing_status(client, make_employee):
+    make_employee("EMP001")
+    client.post("/api/attendance/", json=_row("EMP001", 6))
+
+    response = client.post("/api/attendance/bulk", json={
+        "records": [_row("EMP001", 6, "Absent"), _row("EMP001", 7)],
+        "on_conflict": "overwrite"
+    })
+
+    body = response.json()
+    assert (body["created"], body["updated"]) == (1, 1)
+    records = client.get("/api/attendance/employee/EMP001").json()["records"]
+    assert {record["date"]: record["status"] for record in records} == {
+        "2026-02-06": "Absent",
+        "2026-02-07": "Present"
+    }
+
+
+def test_bulk_fail_policy_writes_nothing_on_conflict(client, make_employee):
+    make_employee("EMP001")
+    client.post("/api/attendance/", json=_row("EMP001", 6))
+
+    response = client.post("/api/attendance/bulk", json={
+        "records": [_row("EMP001", 7), _row("EMP001", 6)],
+        "on_conflict": "fail"
+    })
+
+    assert response.status_code == 409
+    assert response.json()["detail"]["conflicts"][0]["index"] == 1
+    assert client.get("/api/attendance/employee/EMP001").json()["total"] == 1
@@ -0,0 +1,72 @@
+"""
+Tests for the department month calendar report
+"""
+
+
+def _mark(client, employee_id, day, status):
+    response = client.post("/api/attendance/", json={"employee_id": employee_id, "date": day, "status": status})
+    assert response.status_code == 201
+
+
+def test_calendar_encodes_one_character_per_day(client, make_employee):
+    make_employee("EMP002", department="Sales")
+    make_employee("EMP001", department="Sales")
+    make_employee("EMP003", department="Engineering")
+    _mark(client, "EMP001", "2026-02-01", "Present")
+    _mark(client, "EMP001", "2026-02-03", "Absent")
+    _mark(client, "EMP001", "2026-02-28", "Present")
+    _mark(client, "EMP001", "2026-03-01", "Absent")  # Next month, not in the grid
+    _mark(client, "EMP003", "2026-02-02", "Present")  # Other department
+
+    response = client.get("/api/attendance/calendar?department=Sales&month=2026-02")
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["start_date"], body["end_date"]) == ("2026-02-01", "2026-02-28")
+    assert body["legend"] == {"0": "Unmarked", "1": "Present", "2": "Absent"}
+    assert body["employees"] == [
+        {"employee_id": "EMP001", "full_name": "Employee EMP001",
+         "statuses": "102" + "0" * 24 + "1", "present": 2, "absent": 1},
+        {"employee_id": "EMP002", "full_name": "Employee EMP002",
+         "statuses": "0" * 28, "present": 0, "absent": 0},
+    ]
+
+    # 31-day months use the highest bit
+    _mark(client, "EMP002", "2026-03-31", "Absent")
+    march = client.get("/api/attendance/calendar?department=Sales&month=2026-03").json()
+    assert [row["statuses"] for row in march["employees"]] == ["2" + "0" * 30, "0" * 30 + "2"]
+
+    assert client.get("/api/attendance/calendar?department=Nobody&month=2026-02").json()["employees"] == []
+    for bad_month in ("2026-13", "2026-2", "february"):
+        assert client.get(f"/api/attendance/calendar?department=Sales&month={bad_month}").status_code == 422
+
+
+def test_calendar_is_cached_until_attendance_changes(client, make_employee):
+    make_employee("EMP001")
+    url = "/api/attendance/calendar?department=Engineering&month=2026-02"
+
+    first = client.get(url)
+    etag = first.headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    _mark(client, "EMP001", "2026-02-05", "Present")
+    refreshed = client.get(url, headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.json()["employees"][0]["statuses"][4] == "1"
+
+
+def test_calendar_is_smaller_than_per_employee_lists(client, make_employee):
+    records = [
+        {"employee_id": f"EMP{number:03d}", "date": f"2026-02-{day:02d}", "status": "Present" if day % 7 else "Absent"}
+        for number in range(1, 21) for day in range(1, 29)
+    ]
+    for number in range(1, 21):
+        make_employee(f"EMP{number:03d}")
+    assert client.post("/api/attendance/bulk", json={"records": records}).json()["created"] == len(records)
+
+    calendar = client.get("/api/attendance/calendar?department=Engineering&month=2026-02")
+    lists = [
+        client.get(f"/api/attendance/employee/EMP{number:03d}?start_date=2026-02-01&end_date=2026-02-28")
+        for number in range(1, 21)
+    ]
+    assert sum(row["present"] + row["absent"] for row in calendar.json()["employees"]) == len(records)
+    assert len(calendar.content) * 10 < sum(len(response.content) for response in lists)
@@ -0,0 +1,65 @@
+"""
+Tests for paginated GET /api/attendance/ and the streaming export
+"""
+import json
+
+from pagination import encode_cursor
+
+
+def _seed(client, make_employee):
+    make_employee("EMP001", department="Sales")
+    make_employee("EMP002", department="Engineering")
+    client.post("/api/attendance/bulk", json={"records": [
+        {"employee_id": employee_id, "date": f"2026-02-0{day}", "status": "Present" if day % 2 else "Absent"}
+        for day in (1, 2, 3) for employee_id in ("EMP001", "EMP002")
+    ]})
+
+
+def test_keyset_pages_cover_every_record_in_date_order(client, make_employee):
+    _seed(client, make_employee)
+
+    records, cursor = [], None
+    while True:
+        body = client.get("/api/attendance/?limit=4" + (f"&cursor={cursor}" if cursor else "")).json()
+        assert body["total"] == 6
+        records += body["records"]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [record["date"] for record in records] == sorted(record["date"] for record in records)
+    assert len({record["id"] for record in records}) == 6
+
+
+def test_malformed_cursors_are_rejected(client, make_employee):
+    _seed(client, make_employee)
+    for values in ([1, 2], [None, None], ["notadate", 1], ["2026-01-01", "x"], ["2026-01-01", True], ["2026-01-01"]):
+        response = client.get("/api/attendance/", params={"cursor": encode_cursor(*values)})
+        assert response.status_code == 400, values
+        assert response.json()["detail"] == "Invalid pagination cursor"
+    assert client.get("/api/attendance/", params={"cursor": encode_cursor("2026-02-02", 0)}).json()["total"] == 6
+
+
+def test_filters_apply_to_list_and_export(client, make_employee):
+    _seed(client, make_employee)
+
+    body = client.get("/api/attendance/?department=Sales&status=Absent").json()
+    assert [(record["employee_id"], record["date"]) for record in body["records"]] == [("EMP001", "2026-02-02")]
+
+    exported = client.get("/api/attendance/export?department=Sales&start_date=2026-02-02").text
+    assert [json.loads(line)["date"] for line in exported.splitlines()] == ["2026-02-02", "2026-02-03"]
+
+    csv_lines = client.get("/api/attendance/export?format=csv&status=Present").text.splitlines()
+    assert csv_lines[0] == "id,employee_id,date,status"
+    assert len(csv_lines) == 5
+
+
+def test_fast_json_responses_match_the_response_model(client, make_employee):
+    from schemas.attendance import AttendanceList
+    _seed(client, make_employee)
+
+    for url in ("/api/attendance/?limit=2", "/api/attendance/employee/EMP001?start_date=2026-02-02"):
+        response = client.get(url)
+        assert response.headers["content-type"] == "application/json"
+        body = response.json()
+        assert AttendanceList.model_validate(body).model_dump(mode="json") == body
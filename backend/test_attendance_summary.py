@@ -0,0 +1,44 @@
+"""
+Tests for per-employee and batch attendance summaries
+"""
+
+
+def _mark(client, employee_id, day, status):
+    response = client.post("/api/attendance/", json={"employee_id": employee_id, "date": day, "status": status})
+    assert response.status_code == 201
+
+
+def test_single_summary_and_missing_employee(client, make_employee):
+    make_employee("EMP001")
+    _mark(client, "EMP001", "2026-02-02", "Present")
+    _mark(client, "EMP001", "2026-02-03", "Absent")
+    _mark(client, "EMP001", "2026-02-04", "Present")
+
+    assert client.get("/api/attendance/employee/EMP001/summary").json() == {
+        "employee_id": "EMP001", "total_records": 3, "present": 2, "absent": 1, "attendance_percentage": 66.67
+    }
+    assert client.get("/api/attendance/employee/EMP999/summary").status_code == 404
+
+
+def test_batch_summaries_by_ids_department_and_range(client, make_employee):
+    make_employee("EMP001", department="Sales")
+    make_employee("EMP002", department="Sales")
+    make_employee("EMP003", department="Engineering")
+    _mark(client, "EMP001", "2026-01-31", "Absent")
+    _mark(client, "EMP001", "2026-02-02", "Present")
+    _mark(client, "EMP003", "2026-02-02", "Present")
+
+    by_ids = client.post("/api/attendance/summary/batch", json={"employee_ids": ["EMP001", "EMP002", "EMP404"]}).json()
+    assert [(s["employee_id"], s["present"], s["absent"]) for s in by_ids["summaries"]] == [
+        ("EMP001", 1, 1), ("EMP002", 0, 0)
+    ]
+    assert by_ids["not_found"] == ["EMP404"]
+
+    # Whole-month range (served from the monthly rollup) and an arbitrary range (attendance table)
+    for start, end in (("2026-02-01", "2026-02-28"), ("2026-02-01", "2026-02-10")):
+        body = client.post("/api/attendance/summary/batch", json={
+            "department": "Sales", "start_date": start, "end_date": end
+        }).json()
+        assert [(s["employee_id"], s["total_records"]) for s in body["summaries"]] == [("EMP001", 1), ("EMP002", 0)]
+
+    assert client.post("/api/attendance/summary/batch", json={}).status_code == 422
@@ -0,0 +1,131 @@
+"""
+Tests for the response cache, ETag revalidation and write invalidation
+"""
+import time
+from cache import MemoryBackend, RedisBackend, ResponseCache, file_tag_signals, response_cache
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of the redis client the cache uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at < time.monotonic():
+            return None
+        return value
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and self.get(key) is not None:
+            return None
+        self.data[key] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def incr(self, key):
+        value = int(self.get(key) or 0) + 1
+        self.set(key, str(value))
+        return value
+
+
+def test_dashboard_revalidates_with_304_until_a_write(client, make_employee):
+    make_employee("EMP001")
+    first = client.get("/api/dashboard/summary")
+    etag = first.headers["etag"]
+
+    repeat = client.get("/api/dashboard/summary", headers={"If-None-Match": etag})
+    assert repeat.status_code == 304
+
+    client.post("/api/attendance/", json={"employee_id": "EMP001", "date": "2026-02-06", "status": "Present"})
+    after_write = client.get("/api/dashboard/summary", headers={"If-None-Match": etag})
+    assert after_write.status_code == 200
+    assert after_write.json()["total_attendance"] == 1
+    assert after_write.headers["etag"] != etag
+
+
+def test_employee_summary_invalidated_only_by_its_own_writes(client, make_employee):
+    make_employee("EMP001")
+    make_employee("EMP002")
+    etag = client.get("/api/attendance/employee/EMP001/summary").headers["etag"]
+
+    client.post("/api/attendance/", json={"employee_id": "EMP002", "date": "2026-02-06", "status": "Present"})
+    assert client.get("/api/attendance/employee/EMP001/summary").headers["etag"] == etag
+
+    client.post("/api/attendance/", json={"employee_id": "EMP001", "date": "2026-02-06", "status": "Absent"})
+    refreshed = client.get("/api/attendance/employee/EMP001/summary")
+    assert refreshed.headers["etag"] != etag
+    assert refreshed.json()["absent"] == 1
+    assert response_cache.stats()["hits"] >= 1
+
+
+def test_memory_backend_evicts_lru_and_expires():
+    backend = MemoryBackend(max_entries=2)
+    backend.set("a", 1, ttl=60)
+    backend.set("b", 2, ttl=60)
+    backend.get("a")
+    backend.set("c", 3, ttl=60)
+    assert (backend.get("a"), backend.get("b"), backend.evictions) == (1, None, 1)
+
+    backend.set("short", 1, ttl=0)
+    assert backend.get("short") is None
+
+
+def test_backends_add_only_when_absent():
+    for backend in (MemoryBackend(), RedisBackend(FakeRedis())):
+        assert backend.add("key", {"n": 1}, ttl=60)
+        assert not backend.add("key", {"n": 2}, ttl=60)
+        assert backend.get("key") == {"n": 1}
+        backend.delete("key")
+        assert backend.add("key", {"n": 3}, ttl=60)
+        assert backend.get("key") == {"n": 3}
+
+
+def test_redis_backend_shares_invalidation_between_workers():
+    shared = FakeRedis()
+    worker_a, worker_b = ResponseCache(RedisBackend(shared)), ResponseCache(RedisBackend(shared))
+
+    class Request:
+        headers = {}
+
+    entry = worker_a.lookup(Request, "summary", {"id": 1}, ("dashboard",))
+    entry.store({"total": 1})
+    assert worker_b.lookup(Request, "summary", {"id": 1}, ("dashboard",)).value == {"total": 1}
+
+    worker_b.invalidate("dashboard")
+    assert worker_a.lookup(Request, "summary", {"id": 1}, ("dashboard",)).value is None
+
+
+def test_memory_backend_shares_invalidation_between_workers_through_signals(tmp_path):
+    signals = file_tag_signals(str(tmp_path / "signals"))
+    worker_a, worker_b = (ResponseCache(MemoryBackend(signals=signals)) for _ in range(2))
+
+    class Request:
+        headers = {}
+
+    for worker in (worker_a, worker_b):
+        worker.lookup(Request, "dashboard", {}, ("dashboard",)).store({"total": 1})
+        worker.lookup(Request, "summary", {"id": 1}, ("employee:EMP001",)).store({"present": 1})
+
+    worker_a.invalidate("dashboard")
+    # The other worker drops its dashboard entry too, and only that one
+    assert worker_b.lookup(Request, "dashboard", {}, ("dashboard",)).value is None
+    assert worker_b.lookup(Request, "summary", {"id": 1}, ("employee:EMP001",)).value == {"present": 1}
+    assert worker_a.lookup(Request, "dashboard", {}, ("dashboard",)).value is None
+
+    # A stale ETag from the other worker isn't confirmed either
+    etag = worker_b.lookup(Request, "dashboard", {}, ("dashboard",)).etag
+    worker_b.lookup(Request, "dashboard", {}, ("dashboard",)).store({"total": 2})
+
+    class Revalidation:
+        headers = {"if-none-match": etag}
+
+    assert worker_b.lookup(Revalidation, "dashboard", {}, ("dashboard",)).not_modified
+    worker_a.invalidate("dashboard")
+    assert not worker_b.lookup(Revalidation, "dashboard", {}, ("dashboard",)).not_modified
@@ -0,0 +1,92 @@
+"""
+Tests for GET /api/dashboard/summary: period bounds and attendance counts
+"""
+from datetime import date
+from functools import partial
+
+import pytest
+from fastapi import HTTPException
+
+from routes import dashboard
+from routes.dashboard import resolve_period
+from schemas.dashboard import DashboardPeriod
+
+TODAY = date(2026, 2, 11)  # A Wednesday
+RECORDS = [
+    ("EMP001", "2026-01-31", "Present"),  # Last month
+    ("EMP002", "2026-02-02", "Present"),
+    ("EMP001", "2026-02-08", "Present"),  # Sunday of last week
+    ("EMP001", "2026-02-09", "Absent"),
+    ("EMP002", "2026-02-10", "Present"),
+    ("EMP001", "2026-02-11", "Present"),
+    ("EMP002", "2026-02-11", "Absent"),
+    ("EMP001", "2026-02-12", "Present"),  # Tomorrow
+]
+
+
+def test_named_periods_end_today():
+    cases = {
+        (DashboardPeriod.TODAY, TODAY): (TODAY, TODAY),
+        (DashboardPeriod.WEEK, TODAY): (date(2026, 2, 9), TODAY),
+        (DashboardPeriod.WEEK, date(2026, 2, 9)): (date(2026, 2, 9), date(2026, 2, 9)),  # Monday
+        (DashboardPeriod.WEEK, date(2026, 2, 15)): (date(2026, 2, 9), date(2026, 2, 15)),  # Sunday
+        (DashboardPeriod.WEEK, date(2026, 3, 3)): (date(2026, 3, 2), date(2026, 3, 3)),
+        (DashboardPeriod.WEEK, date(2027, 1, 1)): (date(2026, 12, 28), date(2027, 1, 1)),  # Across New Year
+        (DashboardPeriod.MONTH, TODAY): (date(2026, 2, 1), TODAY),
+        (DashboardPeriod.MONTH, date(2026, 3, 1)): (date(2026, 3, 1), date(2026, 3, 1)),
+        (DashboardPeriod.MONTH, date(2026, 12, 31)): (date(2026, 12, 1), date(2026, 12, 31)),
+    }
+    for (period, today), expected in cases.items():
+        assert resolve_period(period, None, None, today=today) == expected, (period, today)
+
+
+def test_explicit_dates_pass_through_and_exclude_periods():
+    start, end = date(2026, 1, 1), date(2026, 1, 31)
+    assert resolve_period(None, start, end, today=TODAY) == (start, end)
+    assert resolve_period(None, start, None, today=TODAY) == (start, None)
+    assert resolve_period(None, None, end, today=TODAY) == (None, end)
+    assert resolve_period(None, None, None, today=TODAY) == (None, None)
+    for dates in ((start, None), (None, end), (start, end)):
+        with pytest.raises(HTTPException) as error:
+            resolve_period(DashboardPeriod.MONTH, *dates, today=TODAY)
+        assert error.value.status_code == 400
+
+
+def test_reversed_dates_are_rejected(client):
+    with pytest.raises(HTTPException) as error:
+        resolve_period(None, date(2026, 2, 1), date(2026, 1, 31), today=TODAY)
+    assert error.value.status_code == 400
+    assert resolve_period(None, TODAY, TODAY, today=TODAY) == (TODAY, TODAY)
+
+    response = client.get("/api/dashboard/summary?start_date=2026-02-01&end_date=2026-01-31")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "start_date must be on or before end_date"
+
+
+def test_summary_counts_attendance_in_the_requested_range(client, make_employee, monkeypatch):
+    make_employee("EMP001")
+    make_employee("EMP002", department="Sales")
+    records = [
+        {"employee_id": employee_id, "date": day, "status": record_status}
+        for employee_id, day, record_status in RECORDS
+    ]
+    assert client.post("/api/attendance/bulk", json={"records": records}).json()["created"] == len(RECORDS)
+    monkeypatch.setattr(dashboard, "resolve_period", partial(resolve_period, today=TODAY))
+
+    def counts(query):
+        summary = client.get(f"/api/dashboard/summary{query}").json()
+        return summary["total_attendance"], summary["present"], summary["absent"], summary["start_date"]
+
+    assert counts("") == (8, 6, 2, None)
+    assert counts("?period=today") == (2, 1, 1, "2026-02-11")
+    assert counts("?period=week") == (4, 2, 2, "2026-02-09")
+    assert counts("?period=month") == (6, 4, 2, "2026-02-01")
+    assert counts("?start_date=2026-01-31&end_date=2026-02-08") == (3, 3, 0, "2026-01-31")
+    assert counts("?start_date=2026-02-10") == (4, 3, 1, "2026-02-10")
+    assert counts("?end_date=2026-02-01") == (1, 1, 0, None)
+
+    summary = client.get("/api/dashboard/summary?period=week").json()
+    assert (summary["end_date"], summary["attendance_rate"]) == ("2026-02-11", 50.0)
+    assert summary["employees_by_department"] == {"Engineering": 1, "Sales": 1}
+    assert client.get("/api/dashboard/summary?period=week&start_date=2026-02-01").status_code == 400
+    assert client.get("/api/dashboard/summary?period=year").status_code == 422
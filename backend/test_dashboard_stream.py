@@ -0,0 +1,146 @@
+"""
+Tests for the live dashboard stream: one shared computation per change, deltas and
+the cross-worker signal
+"""
+import asyncio
+import json
+
+from dashboard_stream import DashboardStream, dashboard_stream, summary_delta
+from employee_cache import FileSignal
+from routes.dashboard import _get_dashboard_summary
+
+
+def _parse(message):
+    fields = dict(line.split(": ", 1) for line in message.strip().splitlines() if not line.startswith("retry"))
+    return fields["event"], json.loads(fields["data"])
+
+
+async def _next(stream):
+    return _parse(await asyncio.wait_for(anext(stream), 5))
+
+
+def test_subscribers_share_one_computation_per_change(client, make_employee):
+    make_employee("EMP001", department="Engineering")
+    make_employee("EMP002", department="Sales")
+
+    async def scenario():
+        channels = [await dashboard_stream.join(None, None, _get_dashboard_summary) for _ in range(50)]
+        streams = [dashboard_stream.events(channel) for channel in channels]
+        try:
+            stats = dashboard_stream.stats()
+            assert (stats["subscribers"], stats["channels"]) == (50, 1)
+            computed = dashboard_stream.computations
+            event, snapshot = await _next(streams[0])
+            assert event == "snapshot"
+            assert snapshot["employees_by_department"] == {"Engineering": 1, "Sales": 1}
+            for stream in streams[1:]:
+                assert await _next(stream) == (event, snapshot)
+
+            await asyncio.to_thread(make_employee, "EMP003", "Engineering")
+            assert {json.dumps(await _next(stream)) for stream in streams} == {json.dumps(
+                ("delta", {"total_employees": 3, "employees_by_department": {"Engineering": 2}})
+            )}
+            assert dashboard_stream.computations == computed + 1
+
+            await asyncio.to_thread(client.delete, "/api/employees/EMP002")
+            assert await _next(streams[0]) == (
+                "delta", {"total_employees": 2, "total_departments": 1, "employees_by_department": {"Sales": None}}
+            )
+        finally:
+            for channel in channels:
+                await dashboard_stream.leave(channel)
+        assert dashboard_stream.stats()["channels"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_lagging_subscribers_get_a_snapshot(client, make_employee):
+    async def scenario():
+        channel = await dashboard_stream.join(None, None, _get_dashboard_summary)
+        stream = dashboard_stream.events(channel)
+        try:
+            assert (await _next(stream))[1]["total_employees"] == 0
+            for employee_id in ("EMP001", "EMP002"):
+                await asyncio.to_thread(make_employee, employee_id)
+                await asyncio.sleep(dashboard_stream.min_interval + 0.2)
+            # Two changes went by while the subscriber wasn't reading
+            assert channel.version == 3
+            event, summary = await _next(stream)
+            assert (event, summary["total_employees"]) == ("snapshot", 2)
+        finally:
+            await dashboard_stream.leave(channel)
+
+    asyncio.run(scenario())
+
+
+def test_changes_in_other_workers_arrive_through_the_signal(client, make_employee, tmp_path):
+    worker_a = DashboardStream(FileSignal(str(tmp_path / "signal")), poll_interval=0.05, min_interval=0)
+    worker_b = DashboardStream(FileSignal(str(tmp_path / "signal")))
+
+    async def scenario():
+        channel = await worker_a.join(None, None, _get_dashboard_summary)
+        stream = worker_a.events(channel)
+        try:
+            await _next(stream)
+            make_employee("EMP001")  # Notifies the app's own stream, not worker_a
+            worker_b.notify()
+            assert await _next(stream) == (
+                "delta", {"total_employees": 1, "total_departments": 1, "employees_by_department": {"Engineering": 1}}
+            )
+            assert worker_a.notifications == 0
+        finally:
+            await worker_a.leave(channel)
+
+    asyncio.run(scenario())
+
+
+def test_summary_delta():
+    old = {"total": 2, "rate": 50.0, "by_department": {"Engineering": 1, "Sales": 1}}
+    assert summary_delta(old, old) == {}
+    assert summary_delta(old, {"total": 2, "rate": 75.0, "by_department": {"Engineering": 2, "HR": 1}}) == {
+        "rate": 75.0, "by_department": {"Engineering": 2, "HR": 1, "Sales": None}
+    }
+
+
+def test_stream_rejects_conflicting_periods(client):
+    response = client.get("/api/dashboard/stream?period=week&start_date=2026-01-01")
+    assert response.status_code == 400
+    assert dashboard_stream.stats()["channels"] == 0
+
+
+def test_stream_endpoint_sends_a_snapshot_and_releases_on_disconnect(client, make_employee):
+    # TestClient waits for the whole body, so drive the endpoint as an ASGI server would
+    from main import app
+    make_employee("EMP001")
+    messages, requested = [], []
+
+    async def scenario():
+        first_chunk = asyncio.Event()
+
+        async def receive():
+            if not requested:
+                requested.append(True)
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await first_chunk.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+            if message["type"] == "http.response.body" and message.get("body"):
+                first_chunk.set()
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+            "path": "/api/dashboard/stream", "raw_path": b"/api/dashboard/stream", "root_path": "",
+            "query_string": b"period=month", "headers": [(b"host", b"testserver")],
+            "client": ("testclient", 50000), "server": ("testserver", 80),
+        }
+        await asyncio.wait_for(app(scope, receive, send), 5)
+
+    asyncio.run(scenario())
+    start, body = messages[0], messages[1]
+    assert start["status"] == 200
+    assert dict(start["headers"])[b"content-type"].startswith(b"text/event-stream")
+    event, summary = _parse(body["body"].decode())
+    assert (event, summary["total_employees"]) == ("snapshot", 1)
+    assert dashboard_stream.stats()["channels"] == 0
@@ -0,0 +1,93 @@
+"""
+Tests for engine configuration: pool profiles, SQLite pragmas and pool metrics
+"""
+import threading
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+
+import database
+from models.attendance import Attendance
+from models.employee import Employee
+
+
+def test_sqlite_connections_get_tuning_pragmas(tmp_path):
+    url = f"sqlite:///{tmp_path / 'pragmas.db'}"
+    engine = database.configure_engine(create_engine(url, **database.engine_options(url)))
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == database.SQLITE_PRAGMAS["busy_timeout"]
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert connection.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+    engine.dispose()
+
+
+def test_sqlite_writers_queue_instead_of_failing(tmp_path):
+    url = f"sqlite:///{tmp_path / 'writers.db'}"
+    engine = database.configure_engine(create_engine(url, **database.engine_options(url)))
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE counter (value INTEGER)")
+        connection.exec_driver_sql("INSERT INTO counter VALUES (0)")
+
+    def increment():
+        # Reads, then writes: a deferred transaction would fail to upgrade its lock
+        with engine.begin() as connection:
+            value = connection.exec_driver_sql("SELECT value FROM counter").scalar()
+            connection.exec_driver_sql(f"UPDATE counter SET value = {value + 1}")
+
+    with engine.begin() as holder:
+        holder.exec_driver_sql("UPDATE counter SET value = value + 1")
+        writers = [threading.Thread(target=increment) for _ in range(4)]
+        for writer in writers:
+            writer.start()
+        time.sleep(0.2)
+        # A read-only transaction doesn't wait for the write lock
+        with engine.execution_options(**database.READ_ONLY).begin() as reader:
+            assert reader.exec_driver_sql("SELECT value FROM counter").scalar() == 0
+    for writer in writers:
+        writer.join()
+
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT value FROM counter").scalar() == 5
+    engine.dispose()
+
+
+def test_engine_options_use_dialect_profile_with_env_overrides(monkeypatch):
+    options = database.engine_options("postgresql://user@localhost/hrms")
+    assert options["pool_size"] == database.POOL_PROFILES["postgresql"]["pool_size"]
+    assert options["pool_pre_ping"] is False
+
+    monkeypatch.setenv("DB_POOL_SIZE", "2")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "true")
+    options = database.engine_options("postgresql+psycopg2://user@localhost/hrms")
+    assert (options["pool_size"], options["pool_pre_ping"]) == (2, True)
+
+
+def test_pool_health_reports_checkouts(client, make_employee):
+    make_employee("EMP001")
+    stats = client.get("/health/pool").json()["sync"]
+    assert stats["checkouts"] > 0
+    assert stats["checked_out"] == 0
+    assert {"size", "overflow", "wait_seconds_max", "timeouts"} <= stats.keys()
+
+
+def test_violated_constraint_names_postgres_and_sqlite_errors():
+    def violation(orig):
+        return IntegrityError("INSERT ...", {}, orig)
+
+    class SQLiteError(Exception):
+        pass
+
+    postgres = SimpleNamespace(diag=SimpleNamespace(constraint_name="ix_employees_email"))
+    assert database.violated_constraint(violation(postgres), Employee.__table__) == "ix_employees_email"
+
+    cases = {
+        "UNIQUE constraint failed: employees.email": (Employee, "ix_employees_email"),
+        "UNIQUE constraint failed: attendance.employee_pk, attendance.date": (Attendance, "uq_employee_attendance_date"),
+        "FOREIGN KEY constraint failed": (Attendance, "attendance_employee_pk_fkey"),
+        "NOT NULL constraint failed: employees.email": (Employee, None),
+    }
+    for message, (model, expected) in cases.items():
+        assert database.violated_constraint(violation(SQLiteError(message)), model.__table__) == expected
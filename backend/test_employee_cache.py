@@ -0,0 +1,101 @@
+"""
+Tests for the per-worker employee existence cache and its cross-worker invalidation
+"""
+import re
+
+from employee_cache import EmployeeExistenceCache, FileSignal, employee_cache
+
+MARK = {"employee_id": "EMP001", "date": "2026-02-06", "status": "Present"}
+
+
+def _queries(response):
+    return int(re.search(r'desc="(\d+) queries"', response.headers["server-timing"]).group(1))
+
+
+def test_unknown_employee_is_answered_from_the_cache(client):
+    first = client.post("/api/attendance/", json=MARK)
+    second = client.post("/api/attendance/", json=MARK)
+    assert (first.status_code, second.status_code) == (404, 404)
+    assert second.json() == first.json()
+    assert _queries(second) == 0
+
+    history = client.get("/api/attendance/employee/EMP001")
+    summary = client.get("/api/attendance/employee/EMP001/summary")
+    assert (history.status_code, summary.status_code) == (404, 404)
+    assert _queries(history) == _queries(summary) == 0
+    assert employee_cache.stats()["negative_hits"] == 3
+
+
+def test_known_employee_history_skips_the_lookup(client, make_employee):
+    make_employee("EMP001")
+    make_employee("EMP002")
+
+    first = client.get("/api/attendance/employee/EMP001")
+    second = client.get("/api/attendance/employee/EMP001?start_date=2026-02-01")
+    assert _queries(first) == 2
+    assert _queries(second) == 1
+
+    # Marking attendance caches the employee's key as a side effect
+    client.post("/api/attendance/", json={**MARK, "employee_id": "EMP002"})
+    history = client.get("/api/attendance/employee/EMP002")
+    assert (history.json()["total"], _queries(history)) == (1, 1)
+
+
+def test_create_and_delete_invalidate_the_cache(client, make_employee):
+    assert client.post("/api/attendance/", json=MARK).status_code == 404
+    make_employee("EMP001")
+    assert client.post("/api/attendance/", json=MARK).status_code == 201
+    assert client.get("/api/attendance/employee/EMP001").status_code == 200
+
+    assert client.delete("/api/employees/EMP001").status_code == 204
+    assert client.get("/api/attendance/employee/EMP001").status_code == 404
+    assert client.post("/api/attendance/", json=MARK).status_code == 404
+
+    imported = client.post(
+        "/api/employees/import",
+        content=b"employee_id,full_name,email,department\nEMP001,Jane Doe,jane@example.com,Sales\n",
+        headers={"Content-Type": "text/csv"}
+    )
+    assert imported.status_code == 200
+    assert client.post("/api/attendance/", json=MARK).status_code == 201
+    assert employee_cache.stats()["invalidations"] == 3
+
+
+def test_invalidation_reaches_other_workers(tmp_path):
+    signal_path = str(tmp_path / "signal")
+    worker_a = EmployeeExistenceCache(FileSignal(signal_path))
+    worker_b = EmployeeExistenceCache(FileSignal(signal_path))
+    for worker in (worker_a, worker_b):
+        _, generation = worker.get("EMP001")
+        worker.put("EMP001", False, generation)
+
+    worker_a.invalidate()
+    assert worker_a.get("EMP001")[0] is None
+    assert worker_b.get("EMP001")[0] is None
+    assert worker_b.stats()["invalidations"] == 0
+
+
+def test_lookup_racing_an_invalidation_is_not_stored():
+    cache = EmployeeExistenceCache()
+    _, generation = cache.get("EMP001")
+    cache.invalidate()
+    cache.put("EMP001", False, generation)
+    assert cache.get("EMP001")[0] is None
+
+
+def test_entries_expire_and_are_evicted(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("employee_cache.time.monotonic", lambda: now[0])
+    cache = EmployeeExistenceCache(max_entries=2, ttl=300, negative_ttl=30)
+    for employee_id, employee_pk in (("EMP001", 1), ("EMP002", False)):
+        cache.put(employee_id, employee_pk, cache.get(employee_id)[1])
+
+    now[0] += 60
+    assert cache.get("EMP001")[0] == 1
+    assert cache.get("EMP002")[0] is None
+
+    cache.put("EMP002", False, cache.get("EMP002")[1])
+    cache.put("EMP003", 3, cache.get("EMP003")[1])
+    # EMP001 was used least recently
+    assert cache.get("EMP001")[0] is None
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,106 @@
+"""
+Tests for immediate (ON DELETE CASCADE) and background (soft delete + batched purge)
+employee deletion
+"""
+import re
+from datetime import date, timedelta
+
+from sqlalchemy.orm import Session
+
+import purge
+import rollups
+from database import SessionLocal, engine
+from models.attendance import Attendance
+from models.employee import Employee
+
+
+def _queries(response):
+    return int(re.search(r'desc="(\d+) queries"', response.headers["server-timing"]).group(1))
+
+
+def _mark_days(client, employee_id, days):
+    records = [
+        {"employee_id": employee_id, "date": str(date(2026, 1, 1) + timedelta(days=day)),
+         "status": "Present" if day % 5 else "Absent"}
+        for day in range(days)
+    ]
+    assert client.post("/api/attendance/bulk", json={"records": records}).json()["created"] == days
+
+
+def _attendance_count(employee_id):
+    with Session(engine) as db:
+        return db.query(Attendance).join(Attendance.employee).filter(Employee.employee_id == employee_id).count()
+
+
+def test_immediate_delete_cascades_in_constant_statements(client, make_employee):
+    make_employee("EMP001")
+    make_employee("EMP002")
+    make_employee("EMP003")
+    _mark_days(client, "EMP001", 3)
+    _mark_days(client, "EMP002", 300)
+
+    short = client.delete("/api/employees/EMP001")
+    long = client.delete("/api/employees/EMP002")
+    assert (short.status_code, long.status_code) == (204, 204)
+    # History is removed by the database, so the statement count doesn't grow with it
+    assert _queries(short) == _queries(long)
+    assert _attendance_count("EMP001") == _attendance_count("EMP002") == 0
+
+    assert client.get("/api/employees/EMP002").status_code == 404
+    assert client.delete("/api/employees/EMP002").status_code == 404
+    assert client.get("/api/dashboard/summary").json()["total_attendance"] == 0
+    with Session(engine) as db:
+        assert rollups.find_mismatches(db) == []
+
+
+def test_background_delete_hides_employee_then_purges_in_batches(client, make_employee, monkeypatch):
+    make_employee("EMP001", department="Sales")
+    make_employee("EMP002", department="Sales")
+    _mark_days(client, "EMP001", 10)
+    _mark_days(client, "EMP002", 2)
+
+    # Hold the purge back to observe the soft-deleted state
+    queued = []
+    monkeypatch.setattr(purge, "purge_employee", lambda *args: queued.append(args))
+    response = client.delete("/api/employees/EMP001?mode=background")
+    assert response.status_code == 202
+    assert queued == [(SessionLocal, "EMP001")]
+
+    assert client.get("/api/employees/EMP001").status_code == 404
+    assert client.delete("/api/employees/EMP001?mode=background").status_code == 404
+    assert [row["employee_id"] for row in client.get("/api/employees/").json()["employees"]] == ["EMP002"]
+    assert client.get("/api/attendance/employee/EMP001").status_code == 404
+    mark = {"employee_id": "EMP001", "date": "2026-03-01", "status": "Present"}
+    assert client.post("/api/attendance/", json=mark).status_code == 404
+    assert client.post("/api/attendance/bulk", json={"records": [mark]}).json()["unknown_employees"] == 1
+    summary = client.get("/api/dashboard/summary").json()
+    # Headcount drops at once; attendance totals follow as batches are purged
+    assert (summary["total_employees"], summary["total_attendance"]) == (1, 12)
+    calendar = client.get("/api/attendance/calendar?department=Sales&month=2026-01").json()
+    assert [row["employee_id"] for row in calendar["employees"]] == ["EMP002"]
+    assert _attendance_count("EMP001") == 10
+
+    monkeypatch.undo()
+    assert purge.pending_employee_ids(SessionLocal) == ["EMP001"]
+    assert purge.purge_employee(SessionLocal, "EMP001", batch_size=3) == 10
+    assert _attendance_count("EMP001") == 0
+    assert client.get("/api/dashboard/summary").json()["total_attendance"] == 2
+    with Session(engine) as db:
+        assert rollups.find_mismatches(db) == []
+    assert purge.pending_employee_ids(SessionLocal) == []
+    # Active employees are never purged
+    assert purge.purge_employee(SessionLocal, "EMP002") == 0
+    assert _attendance_count("EMP002") == 2
+
+    # The ID is free again once the purge finishes
+    make_employee("EMP001", department="Sales")
+
+
+def test_background_delete_purges_after_responding(client, make_employee):
+    make_employee("EMP001")
+    _mark_days(client, "EMP001", 5)
+
+    assert client.delete("/api/employees/EMP001?mode=background").status_code == 202
+    # TestClient runs background tasks before returning
+    assert _attendance_count("EMP001") == 0
+    assert purge.pending_employee_ids(SessionLocal) == []
@@ -0,0 +1,112 @@
+"""
+Tests for POST /api/employees/import
+"""
+import json
+import time
+
+from routes import employees
+
+
+def _events(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_csv_import_commits_batches_and_reports_rejections(client, make_employee):
+    make_employee("EMP001")
+    body = "\n".join([
+        "employee_id,full_name,email,department",
+        "EMP001,Taken Id,new@example.com,Sales",
+        'EMP002,"Doe, Jane",jane@example.com,Sales',
+        "EMP003,Bad Email,not-an-email,Sales",
+        "EMP004,Quoted Name,emp004@example.com,\"Research\nand Development\"",
+        "EMP005,Dup In File,jane@example.com,Sales",
+    ])
+
+    response = client.post(
+        "/api/employees/import?batch_size=2",
+        content=body.encode(),
+        headers={"Content-Type": "text/csv"}
+    )
+
+    assert response.status_code == 200
+    events = _events(response)
+    rejected = {event["line"]: event for event in events if event["event"] == "rejected"}
+    assert sorted(rejected) == [2, 4, 7]
+    assert "already exists" in rejected[2]["errors"][0]
+    assert [event["event"] for event in events].count("progress") == 2
+    assert events[-1] == {"event": "complete", "processed": 5, "created": 2, "rejected": 3}
+    assert client.get("/api/employees/EMP004").json()["department"] == "Research\nand Development"
+
+
+def test_csv_import_rejects_malformed_records_and_keeps_going(client, monkeypatch):
+    monkeypatch.setattr(employees, "CSV_MAX_RECORD_CHARS", 200)
+    body = "\n".join([
+        "employee_id,full_name,email,department",
+        'EMP001,Bob 5" tall,bob@example.com,Sales',
+        'EMP002,"Stray quote,stray@example.com,Sales',
+        "EMP003,Too Few,few@example.com",
+        "EMP004,Too Many,many@example.com,Sales,Extra",
+        *(f"EMP1{index:02d},Employee {index},emp1{index:02d}@example.com,Sales" for index in range(10)),
+        'EMP005,"Unterminated,unterminated@example.com,Sales',
+        "EMP006,Last Row,last@example.com,Sales",
+    ])
+
+    response = client.post("/api/employees/import", content=body.encode(), headers={"Content-Type": "text/csv"})
+
+    events = _events(response)
+    rejected = {event["line"]: event["errors"] for event in events if event["event"] == "rejected"}
+    assert rejected == {
+        3: ["Unterminated quoted field"],
+        4: ["Expected 4 columns, found 3"],
+        5: ["Expected 4 columns, found 5"],
+        16: ["Unterminated quoted field"],
+    }
+    assert events[-1] == {"event": "complete", "processed": 16, "created": 12, "rejected": 4}
+    assert client.get("/api/employees/EMP001").json()["full_name"] == 'Bob 5" tall'
+    assert client.get("/api/employees/EMP006").status_code == 200
+
+
+def test_csv_import_recovers_from_a_stray_quote_in_linear_time(client):
+    rows = 3000
+    body = "\n".join([
+        "employee_id,full_name,email,department",
+        'EMP0000,"Stray quote,stray@example.com,Sales',
+        *(f"EMP{index:04d},Employee {index},emp{index:04d}@example.com,Sales" for index in range(1, rows)),
+    ])
+
+    started = time.perf_counter()
+    response = client.post(
+        "/api/employees/import?batch_size=1000", content=body.encode(), headers={"Content-Type": "text/csv"}
+    )
+    elapsed = time.perf_counter() - started
+
+    events = _events(response)
+    assert [event["line"] for event in events if event["event"] == "rejected"] == [2]
+    assert events[-1] == {"event": "complete", "processed": rows, "created": rows - 1, "rejected": 1}
+    # Re-parsing the open record on every line took minutes here
+    assert elapsed < 10
+
+
+def test_ndjson_import_rejects_malformed_lines(client):
+    lines = [
+        json.dumps({"employee_id": "EMP010", "full_name": "A", "email": "a@example.com", "department": "HR"}),
+        "{not json",
+        "",
+        json.dumps({"employee_id": "EMP011", "full_name": "B", "email": "b@example.com"}),
+    ]
+
+    response = client.post("/api/employees/import?format=ndjson", content="\n".join(lines).encode())
+
+    events = _events(response)
+    assert [(event["event"], event.get("line")) for event in events] == [
+        ("rejected", 2), ("rejected", 4), ("progress", None), ("complete", None)
+    ]
+    assert events[-1]["created"] == 1
+
+
+def test_csv_import_requires_header_columns(client):
+    response = client.post(
+        "/api/employees/import", content=b"employee_id,email\nEMP1,a@example.com", headers={"Content-Type": "text/csv"}
+    )
+
+    assert response.status_code == 400
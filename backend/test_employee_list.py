@@ -0,0 +1,44 @@
+"""
+Tests for keyset pagination, filters and sparse fields on GET /api/employees/
+"""
+from pagination import encode_cursor
+
+
+def test_pages_follow_cursor_until_exhausted(client, make_employee):
+    for index in range(5):
+        make_employee(f"EMP{index:03d}")
+
+    seen = []
+    cursor = None
+    while True:
+        url = "/api/employees/?limit=2&order_by=employee_id" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(url).json()
+        assert body["total"] == 5
+        seen += [employee["employee_id"] for employee in body["employees"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [f"EMP{index:03d}" for index in range(5)]
+
+
+def test_filters_and_sparse_fields(client, make_employee):
+    make_employee("EMP001", department="Sales")
+    make_employee("EMP002", department="Engineering")
+
+    body = client.get(
+        "/api/employees/?department=Sales&name_prefix=Employee&fields=employee_id&include_total=false"
+    ).json()
+
+    assert body == {"employees": [{"employee_id": "EMP001"}], "total": None, "next_cursor": None}
+
+
+def test_rejects_unknown_fields_and_bad_cursor(client):
+    assert client.get("/api/employees/?fields=salary").status_code == 400
+    for empty in ("", " , ", ","):
+        response = client.get("/api/employees/", params={"fields": empty})
+        assert response.status_code == 400, empty
+        assert response.json()["detail"] == "fields must name at least one column"
+    assert client.get("/api/employees/?cursor=not-a-cursor").status_code == 400
+    assert client.get("/api/employees/", params={"cursor": encode_cursor("EMP001")}).status_code == 400
+    assert client.get("/api/employees/", params={"order_by": "employee_id", "cursor": encode_cursor(1)}).status_code == 400
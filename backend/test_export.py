@@ -0,0 +1,133 @@
+"""
+Tests for columnar attendance exports: Parquet and Arrow IPC over the API and the
+CLI, filters, archived months and incremental exports on created_at
+"""
+import csv
+import io
+import sys
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq
+
+import export
+from archive import archive_month
+from database import SessionLocal
+from models.attendance import Attendance
+from models.employee import Employee
+
+OLD = datetime(2025, 3, 1, tzinfo=timezone.utc)
+NEW = datetime(2025, 3, 2, 12, tzinfo=timezone.utc)
+
+
+def _seed(client, make_employee):
+    make_employee("EMP001", department="Engineering")
+    make_employee("EMP002", department="Sales")
+    records = [
+        {"employee_id": employee_id, "date": f"2025-{month:02d}-{day:02d}", "status": "Present" if day % 2 else "Absent"}
+        for employee_id in ("EMP001", "EMP002") for month in (1, 2) for day in (3, 4, 5)
+    ]
+    assert client.post("/api/attendance/bulk", json={"records": records}).json()["created"] == 12
+
+
+def _created_at(employee_id, value):
+    db = SessionLocal()
+    try:
+        db.execute(update(Attendance).where(
+            Attendance.employee_pk == db.query(Employee.id).filter_by(employee_id=employee_id).scalar_subquery()
+        ).values(created_at=value))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _parquet(response):
+    assert response.status_code == 200, response.text
+    return pq.read_table(io.BytesIO(response.content))
+
+
+def test_parquet_export_matches_the_csv_export(client, make_employee):
+    _seed(client, make_employee)
+    response = client.get("/api/attendance/export/columnar")
+    assert response.headers["content-type"] == "application/vnd.apache.parquet"
+    table = _parquet(response)
+    assert table.schema == export.export_schema()
+
+    rows = list(csv.DictReader(io.StringIO(client.get("/api/attendance/export?format=csv").text)))
+    assert table.select(["id", "employee_id", "date", "status"]).to_pylist() == [
+        {"id": int(row["id"]), "employee_id": row["employee_id"], "date": date.fromisoformat(row["date"]),
+         "status": row["status"]}
+        for row in rows
+    ]
+    assert set(table.column("department").to_pylist()) == {"Engineering", "Sales"}
+    assert None not in table.column("created_at").to_pylist()
+
+
+def test_filters_apply_to_columnar_exports(client, make_employee):
+    _seed(client, make_employee)
+    response = client.get("/api/attendance/export/columnar", params={
+        "format": "arrow", "department": "Sales", "status": "Absent", "start_date": "2025-02-01"
+    })
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.select(["employee_id", "date", "status"]).to_pylist() == [
+        {"employee_id": "EMP002", "date": date(2025, 2, 4), "status": "Absent"}
+    ]
+
+    # Archived months are read from their files with the same filters
+    archive_month(SessionLocal, date(2025, 1, 1))
+    table = _parquet(client.get("/api/attendance/export/columnar", params={"department": "Sales", "status": "Absent"}))
+    assert [(row["date"], row["created_at"]) for row in table.to_pylist()] == [
+        (date(2025, 1, 4), None), (date(2025, 2, 4), table.column("created_at")[1].as_py())
+    ]
+
+
+def test_incremental_exports_fetch_rows_created_since_the_watermark(client, make_employee, monkeypatch):
+    _seed(client, make_employee)
+    archive_month(SessionLocal, date(2025, 1, 1))
+    _created_at("EMP001", OLD)
+    _created_at("EMP002", NEW)
+
+    full = client.get("/api/attendance/export/columnar")
+    watermark = datetime.fromisoformat(full.headers["x-export-watermark"])
+    assert watermark > NEW
+    assert _parquet(full).num_rows == 12
+
+    since = client.get("/api/attendance/export/columnar", params={"created_after": "2025-03-02T00:00:00Z"})
+    table = _parquet(since)
+    assert set(table.column("employee_id").to_pylist()) == {"EMP002"}
+    # Archived months are skipped: their rows were created before they closed
+    assert table.column("date").to_pylist() == [date(2025, 2, day) for day in (3, 4, 5)]
+    assert set(table.column("created_at").to_pylist()) == {NEW}
+
+    # Incremental exports stop at their watermark, leaving rows that may still be committing to the next one
+    _created_at("EMP001", watermark + timedelta(seconds=30))
+    response = client.get("/api/attendance/export/columnar", params={"created_after": watermark.isoformat()})
+    assert _parquet(response).num_rows == 0
+    monkeypatch.setattr(export, "EXPORT_SETTLE_SECONDS", 0)
+    response = client.get("/api/attendance/export/columnar", params={"created_after": watermark.isoformat()})
+    assert set(_parquet(response).column("employee_id").to_pylist()) == {"EMP001"}
+
+
+def test_cli_keeps_the_watermark_between_runs(client, make_employee, monkeypatch, tmp_path, capsys):
+    _seed(client, make_employee)
+    output, watermark_file = tmp_path / "attendance.parquet", tmp_path / "attendance.watermark"
+    argv = ["export.py", "--output", str(output), "--watermark-file", str(watermark_file), "--department", "Sales"]
+
+    monkeypatch.setattr(sys, "argv", argv)
+    export.main()
+    assert pq.read_table(output).num_rows == 6
+    assert "Exported 6 attendance record(s)" in capsys.readouterr().out
+
+    # Created since the first run, but before the second run's watermark
+    _created_at("EMP002", datetime.fromisoformat(watermark_file.read_text()))
+    monkeypatch.setattr(export, "EXPORT_SETTLE_SECONDS", 0)
+    export.main()
+    assert pq.read_table(output).column("employee_id").to_pylist() == ["EMP002"] * 6
+
+    export.main()
+    assert pq.read_table(output).num_rows == 0
+    assert sorted(tmp_path.iterdir()) == sorted([output, watermark_file])
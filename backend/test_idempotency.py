@@ -0,0 +1,137 @@
+"""
+Tests for Idempotency-Key replay of write requests
+"""
+import json
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from cache import MemoryBackend
+from database import Base
+from idempotency import DatabaseBackend, IdempotencyMiddleware, IdempotencyStore, _fingerprint
+from models.idempotency import IdempotencyKey
+
+MARK = {"employee_id": "EMP001", "date": "2026-02-06", "status": "Present"}
+
+
+def test_retried_mark_replays_the_original_response(client, make_employee):
+    make_employee("EMP001")
+    headers = {"Idempotency-Key": "check-in-1"}
+
+    first = client.post("/api/attendance/", json=MARK, headers=headers)
+    retry = client.post("/api/attendance/", json=MARK, headers=headers)
+    assert (first.status_code, retry.status_code) == (201, 201)
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    # Answered from the key store (the idempotency_keys table) without running the route
+    assert 'desc="2 queries"' in retry.headers["server-timing"]
+
+    assert client.get("/api/attendance/employee/EMP001").json()["total"] == 1
+    # A new key is a new request, which is a real duplicate
+    assert client.post("/api/attendance/", json=MARK, headers={"Idempotency-Key": "check-in-2"}).status_code == 409
+    assert client.post("/api/attendance/", json=MARK).status_code == 409
+
+
+def test_key_reuse_for_a_different_request_is_rejected(client, make_employee):
+    make_employee("EMP001")
+    headers = {"Idempotency-Key": "reused"}
+    assert client.post("/api/attendance/", json=MARK, headers=headers).status_code == 201
+
+    assert client.post("/api/attendance/", json={**MARK, "date": "2026-02-07"}, headers=headers).status_code == 422
+    assert client.post("/api/attendance/bulk", json={"records": [MARK]}, headers=headers).status_code == 422
+    assert client.post("/api/attendance/", json=MARK, headers={"Idempotency-Key": "x" * 256}).status_code == 400
+
+
+def test_server_errors_are_not_stored():
+    calls = []
+    app = FastAPI()
+
+    @app.post("/flaky")
+    async def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise HTTPException(status_code=503, detail="try again")
+        return {"calls": len(calls)}
+
+    store = IdempotencyStore(MemoryBackend())
+    app.add_middleware(IdempotencyMiddleware, store=store)
+    flaky_client = TestClient(app)
+    headers = {"Idempotency-Key": "retry-me"}
+
+    assert flaky_client.post("/flaky", headers=headers).status_code == 503
+    assert flaky_client.post("/flaky", headers=headers).json() == {"calls": 2}
+    assert flaky_client.post("/flaky", headers=headers).json() == {"calls": 2}
+    assert len(calls) == 2
+
+    # A reservation without a stored response means the first request is still running
+    fingerprint = _fingerprint({"method": "POST", "path": "/flaky", "query_string": b""}, b"")
+    store.backend.add(store.storage_key("pending"), {"fingerprint": fingerprint}, ttl=60)
+    pending = flaky_client.post("/flaky", headers={"Idempotency-Key": "pending"})
+    assert (pending.status_code, pending.headers["retry-after"]) == (409, "1")
+
+
+def test_streamed_responses_are_not_stored(client):
+    body = b"employee_id,full_name,email,department\nEMP001,Ann,ann@example.com,Sales"
+    headers = {"Idempotency-Key": "import-1", "Content-Type": "text/csv"}
+
+    first = client.post("/api/employees/import", content=body, headers=headers)
+    retry = client.post("/api/employees/import", content=body, headers=headers)
+    assert json.loads(first.text.splitlines()[-1])["created"] == 1
+    # The retry runs again instead of replaying a stored stream
+    assert "idempotent-replayed" not in retry.headers
+    assert json.loads(retry.text.splitlines()[-1])["rejected"] == 1
+
+
+def test_oversized_bodies_are_rejected():
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(payload: dict):
+        return payload
+
+    app.add_middleware(IdempotencyMiddleware, store=IdempotencyStore(MemoryBackend()), max_body_bytes=64)
+    echo_client = TestClient(app)
+
+    small = echo_client.post("/echo", json={"a": 1}, headers={"Idempotency-Key": "small"})
+    assert small.json() == {"a": 1}
+    large = echo_client.post("/echo", json={"a": "x" * 100}, headers={"Idempotency-Key": "large"})
+    assert large.status_code == 413
+    # Without a key the body isn't buffered, so there's no limit
+    assert echo_client.post("/echo", json={"a": "x" * 100}).status_code == 200
+
+
+def test_retries_reaching_another_worker_are_replayed(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'keys.db'}")
+    Base.metadata.create_all(bind=engine, tables=[IdempotencyKey.__table__])
+    calls = []
+
+    def worker():
+        # Each worker has its own store over the shared database
+        app = FastAPI()
+
+        @app.post("/orders", status_code=201)
+        async def create_order():
+            calls.append(1)
+            return {"order": len(calls)}
+
+        app.add_middleware(IdempotencyMiddleware, store=IdempotencyStore(DatabaseBackend(sessionmaker(bind=engine))))
+        return TestClient(app)
+
+    worker_a, worker_b = worker(), worker()
+    headers = {"Idempotency-Key": "order-1"}
+    first = worker_a.post("/orders", headers=headers)
+    retry = worker_b.post("/orders", headers=headers)
+    assert (first.status_code, retry.status_code) == (201, 201)
+    assert retry.json() == {"order": 1}
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert len(calls) == 1
+
+    # An expired key is claimed again, and its row replaced
+    store = IdempotencyStore(DatabaseBackend(sessionmaker(bind=engine)), ttl=0)
+    key = store.storage_key("expired")
+    store.complete(key, "fingerprint", 201, None, b"{}")
+    assert store.reserve(key, "fingerprint") is None
+    engine.dispose()
@@ -0,0 +1,56 @@
+"""
+Tests for per-request query instrumentation: Server-Timing, /metrics and slow-query logs
+"""
+import logging
+import re
+
+import instrumentation
+
+
+def test_server_timing_reports_queries_for_the_request(client, make_employee):
+    make_employee("EMP001")
+    response = client.get("/api/attendance/employee/EMP001/summary")
+
+    timing = response.headers["server-timing"]
+    assert re.match(r'db;dur=[\d.]+;desc="1 queries", app;dur=[\d.]+$', timing)
+
+
+def test_metrics_aggregate_by_route_template(client, make_employee):
+    instrumentation.metrics.reset()
+    make_employee("EMP001")
+    client.get("/api/employees/EMP001")
+    client.get("/api/employees/NOPE")
+
+    body = client.get("/metrics").text
+    assert 'hrms_http_requests_total{method="GET",route="/api/employees/{employee_id}",status="200"} 1' in body
+    assert 'hrms_http_requests_total{method="GET",route="/api/employees/{employee_id}",status="404"} 1' in body
+    assert 'hrms_db_queries_per_request_count{route="/api/employees/{employee_id}"} 2' in body
+    assert 'hrms_db_pool_checked_out{pool="sync"}' in body
+
+
+def test_slow_queries_are_logged_with_parameter_types_only(client, make_employee, monkeypatch, caplog):
+    make_employee("EMP001")
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_MS", 0)
+
+    with caplog.at_level(logging.WARNING, logger="instrumentation"):
+        client.get("/api/attendance/employee/EMP001?start_date=2026-02-01")
+
+    slow = [record.getMessage() for record in caplog.records if record.getMessage().startswith("Slow query")]
+    assert any("FROM attendance" in message and "parameters=['str', 'int', 'str']" in message for message in slow)
+    assert not any("EMP001" in message for message in slow)
+
+
+def test_idempotent_replays_are_counted_under_their_route(client, make_employee):
+    make_employee("EMP001")
+    instrumentation.metrics.reset()
+    mark = {"employee_id": "EMP001", "date": "2026-02-11", "status": "Present"}
+    headers = {"Idempotency-Key": "metrics-replay"}
+    assert client.post("/api/attendance/", json=mark, headers=headers).status_code == 201
+    replay = client.post("/api/attendance/", json=mark, headers=headers)
+    assert replay.headers["idempotent-replayed"] == "true"
+    client.post("/api/attendance/", json={**mark, "status": "Absent"}, headers=headers)
+
+    body = client.get("/metrics").text
+    assert 'hrms_http_requests_total{method="POST",route="/api/attendance/",status="201"} 2' in body
+    assert 'hrms_http_requests_total{method="POST",route="/api/attendance/",status="422"} 1' in body
+    assert 'route="unmatched"' not in body
@@ -0,0 +1,127 @@
+"""
+Tests for the Alembic migrations: they must produce exactly the schema the models
+declare, backfill rollups correctly, and adopt databases created by create_all
+"""
+import os
+import tempfile
+from datetime import date
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import column, create_engine, insert, inspect, table
+from sqlalchemy.orm import Session
+
+import migrate
+import rollups
+from database import Base
+from migrations import online
+from models.employee import Employee
+from models.attendance import Attendance
+
+# attendance before revision 0005 stored the employee_id string and status name
+LEGACY_ATTENDANCE = table("attendance", column("employee_id"), column("date"), column("status"))
+EMPLOYEES = [
+    {"employee_id": "EMP001", "full_name": "A", "email": "a@example.com", "department": "Sales"},
+    {"employee_id": "EMP002", "full_name": "B", "email": "b@example.com", "department": "Engineering"},
+]
+
+
+@pytest.fixture
+def db_url():
+    path = os.path.join(tempfile.mkdtemp(prefix="hrms-migrate-"), "migrate.db")
+    return f"sqlite:///{path}"
+
+
+def _upgrade(url, revision):
+    engine = create_engine(url)
+    with engine.connect() as connection:
+        command.upgrade(migrate.alembic_config(connection), revision)
+        connection.commit()
+    return engine
+
+
+def test_migrations_match_models_and_downgrade_cleanly(db_url):
+    engine = _upgrade(db_url, "head")
+    with engine.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), Base.metadata) == []
+        command.downgrade(migrate.alembic_config(connection), "base")
+        connection.commit()
+    assert inspect(engine).get_table_names() == ["alembic_version"]
+
+
+def test_rollup_migration_backfills_existing_attendance(db_url):
+    engine = _upgrade(db_url, "0001")
+    with engine.begin() as connection:
+        connection.execute(insert(Employee.__table__), EMPLOYEES)
+        connection.execute(insert(LEGACY_ATTENDANCE), [
+            {"employee_id": employee_id, "date": day, "status": "Present" if day.day % 2 else "Absent"}
+            for employee_id in ("EMP001", "EMP002")
+            for day in (date(2025, 12, 30), date(2026, 1, 2), date(2026, 1, 3), date(2026, 3, 1))
+        ])
+
+    _upgrade(db_url, "head")
+
+    with Session(engine) as db:
+        assert db.query(rollups.AttendanceDailyRollup).count() > 0
+        assert rollups.find_mismatches(db) == []
+
+
+def test_run_migrations_adopts_database_created_by_create_all(db_url):
+    engine = create_engine(db_url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Employee.__table__), [
+            {"employee_id": "EMP001", "full_name": "A", "email": "a@example.com", "department": "Sales"},
+        ])
+
+    migrate.run_migrations(db_url)
+
+    with engine.connect() as connection:
+        assert MigrationContext.configure(connection).get_current_revision() == "0008"
+        assert connection.execute(Employee.__table__.select()).all()
+
+
+def test_compact_attendance_migration_converts_rows_in_batches(db_url, monkeypatch):
+    engine = _upgrade(db_url, "0004")
+    with engine.begin() as connection:
+        connection.execute(insert(Employee.__table__), EMPLOYEES)
+        connection.execute(insert(LEGACY_ATTENDANCE), [
+            {"employee_id": employee_id, "date": date(2026, 2, day), "status": "Present" if day % 3 else "Absent"}
+            for employee_id in ("EMP002", "EMP001") for day in range(1, 6)
+        ])
+        legacy = connection.execute(LEGACY_ATTENDANCE.select().order_by("employee_id", "date")).all()
+
+    monkeypatch.setattr(online, "BACKFILL_BATCH_ROWS", 3)
+    _upgrade(db_url, "head")
+
+    with Session(engine) as db:
+        converted = db.query(Employee.employee_id, Attendance.date, Attendance.status).join(
+            Attendance.employee
+        ).order_by(Employee.employee_id, Attendance.date).all()
+        assert [tuple(row) for row in converted] == [
+            (employee_id, date.fromisoformat(str(day)), record_status) for employee_id, day, record_status in legacy
+        ]
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT DISTINCT typeof(status) FROM attendance").scalar() == "integer"
+        assert "attendance_compact" not in inspect(connection).get_table_names()
+
+
+def test_compact_attendance_migration_stops_on_orphaned_attendance(db_url):
+    engine = _upgrade(db_url, "0004")
+    with engine.begin() as connection:
+        connection.execute(insert(Employee.__table__), EMPLOYEES[:1])
+        # Written without foreign keys enforced, as SQLite does by default
+        connection.execute(insert(LEGACY_ATTENDANCE), [
+            {"employee_id": employee_id, "date": date(2026, 2, day), "status": "Present"}
+            for employee_id in ("EMP001", "GONE") for day in (1, 2)
+        ])
+
+    with pytest.raises(RuntimeError, match=r"2 attendance rows .* GONE \(2\)"):
+        _upgrade(db_url, "head")
+
+    with engine.connect() as connection:
+        # Nothing was swapped; the next run starts over
+        assert connection.exec_driver_sql("SELECT COUNT(*) FROM attendance WHERE employee_id = 'GONE'").scalar() == 2
+        assert MigrationContext.configure(connection).get_current_revision() == "0004"
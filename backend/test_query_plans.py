@@ -0,0 +1,123 @@
+"""
+Query-plan regression tests for the hot attendance paths.
+Each path runs the route's query code, captures the SELECTs it issues and EXPLAINs
+them; a full scan of attendance or a rollup table fails the test. Runs on SQLite,
+and also on PostgreSQL when TEST_POSTGRES_URL points at a disposable database
+(its tables are dropped and recreated).
+"""
+import os
+import re
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+import rollups
+from database import Base
+from models.employee import Employee
+from models.attendance import Attendance
+from routes.attendance import (
+    _get_employee_attendance, _get_attendance_summary, _get_attendance_summaries, _get_all_attendance,
+    _get_attendance_calendar,
+)
+from routes.dashboard import _get_dashboard_summary
+from schemas.attendance import AttendanceStatus, AttendanceSummaryBatchRequest
+
+HOT_TABLES = ("attendance", "attendance_daily_rollup", "attendance_monthly_rollup")
+FEB_START, FEB_MID, FEB_END = date(2026, 2, 1), date(2026, 2, 14), date(2026, 2, 28)
+
+HOT_PATHS = {
+    "employee history": lambda db: _get_employee_attendance(db, "EMP001", FEB_START, FEB_MID),
+    "employee summary": lambda db: _get_attendance_summary(db, "EMP001"),
+    "batch summary, partial month": lambda db: _get_attendance_summaries(db, AttendanceSummaryBatchRequest(
+        department="Engineering", start_date=FEB_START, end_date=FEB_MID
+    )),
+    "batch summary, whole months": lambda db: _get_attendance_summaries(db, AttendanceSummaryBatchRequest(
+        employee_ids=["EMP001", "EMP002"], start_date=FEB_START, end_date=FEB_END
+    )),
+    "list by date and status": lambda db: _get_all_attendance(
+        db, FEB_START, FEB_MID, None, AttendanceStatus.ABSENT, 100, None, True
+    ),
+    "list by department and date": lambda db: _get_all_attendance(
+        db, FEB_START, FEB_END, "Engineering", None, 100, None, True
+    ),
+    "department calendar": lambda db: _get_attendance_calendar(db, "Engineering", "2026-02"),
+    "dashboard range": lambda db: _get_dashboard_summary(db, FEB_START, FEB_MID),
+}
+
+
+def _seed(engine):
+    with Session(engine) as db:
+        employees = {
+            number: Employee(employee_id=f"EMP00{number}", full_name=f"Employee {number}",
+                             email=f"emp00{number}@example.com", department=department)
+            for number, department in ((1, "Engineering"), (2, "Engineering"), (3, "Sales"))
+        }
+        db.add_all(employees.values())
+        db.flush()
+        for day in range(1, 11):
+            for number in (1, 2, 3):
+                db.add(Attendance(employee=employees[number], date=date(2026, 2, day),
+                                  status="Present" if (day + number) % 3 else "Absent"))
+        db.commit()
+        rollups.rebuild(db)
+
+
+def _sqlite_full_scans(connection, statement, parameters):
+    plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    details = [row[-1] for row in plan]
+    pattern = re.compile(rf"^SCAN ({'|'.join(HOT_TABLES)})\b")
+    return [detail for detail in details if pattern.match(detail)], details
+
+
+def _postgres_full_scans(connection, statement, parameters):
+    # With seq scans disabled the planner only picks one when no index can serve the query
+    connection.exec_driver_sql("SET enable_seqscan = off")
+    details = [row[0] for row in connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)]
+    pattern = re.compile(rf"Seq Scan on ({'|'.join(HOT_TABLES)})\b")
+    return [detail.strip() for detail in details if pattern.search(detail)], details
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def plan_engine(request):
+    if request.param == "sqlite":
+        request.getfixturevalue("client")  # fresh schema on the app's SQLite database
+        from database import engine
+        _seed(engine)
+        yield engine, _sqlite_full_scans
+        return
+
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    _seed(engine)
+    yield engine, _postgres_full_scans
+    engine.dispose()
+
+
+@pytest.mark.parametrize("path", HOT_PATHS)
+def test_hot_path_avoids_full_scans(plan_engine, path):
+    engine, full_scans = plan_engine
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with Session(engine) as db:
+            HOT_PATHS[path](db)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert captured
+    with engine.connect() as connection:
+        for statement, parameters in captured:
+            scans, plan = full_scans(connection, statement, parameters)
+            assert not scans, f"{path} does a full scan:\n{statement}\n" + "\n".join(plan)
+
@@ -0,0 +1,172 @@
+"""
+Tests for routing reads to replicas, with copies of the test database standing in
+for replicas that stopped replicating when they were taken
+"""
+import sqlite3
+import time
+from contextlib import closing
+from types import SimpleNamespace
+
+import pytest
+
+import replicas
+from database import engine
+from employee_cache import employee_cache
+from replicas import READ_PRIMARY_COOKIE, Replica, ReplicaSet
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    """Copy the primary's current state into a new replica; every set built here is disposed afterwards."""
+    sets = []
+
+    def _snapshot(name="replica1"):
+        path = str(tmp_path / f"{name}.db")
+        with closing(sqlite3.connect(engine.url.database)) as primary, closing(sqlite3.connect(path)) as replica:
+            primary.backup(replica)
+        return Replica(name, f"sqlite:///{path}")
+
+    def _use(*replica_list, **options):
+        replica_set = ReplicaSet(replica_list, **options)
+        sets.append(replica_set)
+        return replica_set
+
+    _snapshot.use = _use
+    yield _snapshot
+    for replica_set in sets:
+        replica_set.dispose()
+
+
+def _names(client):
+    return [employee["employee_id"] for employee in client.get("/api/employees/").json()["employees"]]
+
+
+def test_writes_make_the_client_read_its_own_writes(client, make_employee, snapshot, monkeypatch):
+    make_employee("EMP001")
+    monkeypatch.setattr(replicas, "replica_set", snapshot.use(snapshot()))
+
+    make_employee("EMP002")
+    cookie = client.cookies.get(READ_PRIMARY_COOKIE)
+    assert float(cookie) > time.time()
+    assert _names(client) == ["EMP001", "EMP002"]
+    assert replicas.replica_set.stats()["sticky_reads"] == 1
+
+    # Other clients read the replica, which hasn't seen the write
+    client.cookies.clear()
+    assert _names(client) == ["EMP001"]
+    client.cookies.set(READ_PRIMARY_COOKIE, str(time.time() - 1))
+    assert _names(client) == ["EMP001"]
+    assert replicas.replica_set.stats()["replicas"][0]["reads"] == 2
+    client.cookies.clear()
+
+    # Failed writes and read-only POSTs don't pin the client to the primary
+    assert client.post("/api/employees/", json={"employee_id": "EMP001"}).status_code == 422
+    assert client.post("/api/attendance/summary/batch", json={"employee_ids": ["EMP001"]}).status_code == 200
+    assert READ_PRIMARY_COOKIE not in client.cookies
+
+
+def test_lagging_or_unreachable_replicas_fall_back_to_the_primary(client, make_employee, snapshot, monkeypatch, tmp_path):
+    make_employee("EMP001")
+    lagging = snapshot()
+    broken = Replica("broken", f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    monkeypatch.setattr(replicas, "replica_set", snapshot.use(lagging, broken, max_lag=5, check_interval=0))
+    make_employee("EMP002")
+    client.cookies.clear()
+
+    monkeypatch.setattr(replicas, "replication_lag", lambda connection: 30.0)
+    assert _names(client) == ["EMP001", "EMP002"]
+    stats = replicas.replica_set.stats()
+    assert stats["primary_reads"] == 1
+    assert [(replica["healthy"], replica["lag_seconds"]) for replica in stats["replicas"]] == [(False, 30.0), (False, None)]
+    assert stats["replicas"][1]["error"]
+
+    # The next check finds the replica caught up (here: a copy that's merely old) and uses it again
+    monkeypatch.setattr(replicas, "replication_lag", lambda connection: 0.0)
+    assert _names(client) == ["EMP001"]
+    assert client.get("/health/replicas").json()["replicas"][0]["healthy"] is True
+    assert 'hrms_replica_lag_seconds{replica="replica1"} 0.0' in client.get("/metrics").text
+
+
+def test_standby_without_a_wal_receiver_is_not_current():
+    class Standby:
+        dialect = SimpleNamespace(name="postgresql")
+
+        def __init__(self, lag):
+            self.lag = lag
+
+        def execute(self, statement):
+            assert statement is replicas.POSTGRES_LAG
+            return SimpleNamespace(scalar=lambda: self.lag)
+
+    assert replicas.replication_lag(Standby(0)) == 0.0
+    # The query reports NULL rather than 0 once the standby stops receiving WAL
+    with pytest.raises(RuntimeError, match="not receiving WAL"):
+        replicas.replication_lag(Standby(None))
+    assert "pg_stat_wal_receiver" in str(replicas.POSTGRES_LAG)
+
+
+def test_replica_selection(snapshot):
+    def _ready(replica, latency):
+        replica.healthy, replica.latency_seconds, replica.checked_at = True, latency, time.monotonic()
+        return replica
+
+    slow, fast = _ready(snapshot("slow"), 0.02), _ready(snapshot("fast"), 0.001)
+    round_robin = snapshot.use(slow, fast, check_interval=60)
+    assert [round_robin.choose().name for _ in range(4)] == ["slow", "fast", "slow", "fast"]
+    least_latency = snapshot.use(slow, fast, selection="least_latency", check_interval=60)
+    assert {least_latency.choose().name for _ in range(3)} == {"fast"}
+    fast.healthy = False
+    assert least_latency.choose().name == "slow"
+    with pytest.raises(ValueError):
+        ReplicaSet([slow], selection="random")
+
+
+def test_replica_reads_stay_out_of_shared_caches(client, make_employee, snapshot, monkeypatch):
+    make_employee("EMP001")
+    monkeypatch.setattr(replicas, "replica_set", snapshot.use(snapshot()))
+    make_employee("EMP002")
+    sticky = client.cookies.get(READ_PRIMARY_COOKIE)
+    client.cookies.clear()
+
+    # Cached from the replica: stale, but never served to a client that needs the primary
+    assert client.get("/api/dashboard/summary").json()["total_employees"] == 1
+    assert client.get("/api/dashboard/summary").json()["total_employees"] == 1
+    client.cookies.set(READ_PRIMARY_COOKIE, sticky)
+    assert client.get("/api/dashboard/summary").json()["total_employees"] == 2
+    client.cookies.clear()
+
+    # The replica doesn't know EMP002 yet; the employee cache mustn't remember that
+    assert client.get("/api/attendance/employee/EMP002/summary").status_code == 404
+    assert client.get("/api/attendance/employee/EMP002").status_code == 404
+    assert employee_cache.stats()["entries"] == 0
+    client.cookies.set(READ_PRIMARY_COOKIE, sticky)
+    assert client.get("/api/attendance/employee/EMP002").status_code == 200
+
+
+def test_read_your_writes_cookie_works_for_a_cross_origin_frontend(client, make_employee, snapshot, monkeypatch):
+    make_employee("EMP001")
+    monkeypatch.setattr(replicas, "replica_set", snapshot.use(snapshot()))
+    origin = {"Origin": "http://localhost:5173"}
+
+    preflight = client.options(
+        "/api/employees/", headers={**origin, "Access-Control-Request-Method": "POST"}
+    )
+    assert preflight.headers["access-control-allow-credentials"] == "true"
+
+    created = client.post(
+        "/api/employees/",
+        json={"employee_id": "EMP002", "full_name": "B", "email": "b@example.com", "department": "HR"},
+        headers=origin
+    )
+    assert created.status_code == 201
+    # A credentialed response must name the origin; the browser then keeps the cookie
+    assert created.headers["access-control-allow-origin"] == origin["Origin"]
+    assert created.headers["access-control-allow-credentials"] == "true"
+    assert "SameSite=Lax" in created.headers["set-cookie"]
+    assert client.get("/api/employees/", headers=origin).json()["total"] == 2
+
+    # Frontends on another site need SameSite=None, which browsers only accept with Secure
+    client.cookies.clear()
+    monkeypatch.setattr(replicas, "READ_PRIMARY_COOKIE_SAMESITE", "None")
+    response = client.delete("/api/employees/EMP002", headers=origin)
+    assert response.headers["set-cookie"].endswith("SameSite=None; Secure")
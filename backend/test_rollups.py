@@ -0,0 +1,49 @@
+"""
+Tests that attendance writes keep the rollup tables consistent with attendance
+"""
+import pytest
+import rollups
+from database import SessionLocal
+
+
+@pytest.fixture
+def db(client):
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def test_writes_and_deletes_keep_rollups_consistent(client, make_employee, db):
+    make_employee("EMP001", department="Sales")
+    make_employee("EMP002", department="Engineering")
+    client.post("/api/attendance/", json={"employee_id": "EMP001", "date": "2026-02-02", "status": "Present"})
+    client.post("/api/attendance/bulk", json={"on_conflict": "overwrite", "records": [
+        {"employee_id": "EMP001", "date": "2026-02-02", "status": "Absent"},
+        {"employee_id": "EMP001", "date": "2026-03-02", "status": "Present"},
+        {"employee_id": "EMP002", "date": "2026-02-02", "status": "Present"},
+    ]})
+
+    assert rollups.find_mismatches(db) == []
+    db.rollback()  # On SQLite the open transaction holds the write lock
+    dashboard = client.get("/api/dashboard/summary?start_date=2026-02-01&end_date=2026-02-28").json()
+    assert (dashboard["total_attendance"], dashboard["present"], dashboard["absent"]) == (2, 1, 1)
+    summary = client.get("/api/attendance/employee/EMP001/summary").json()
+    assert (summary["total_records"], summary["present"], summary["absent"]) == (2, 1, 1)
+
+    client.delete("/api/employees/EMP001")
+
+    assert rollups.find_mismatches(db) == []
+    dashboard = client.get("/api/dashboard/summary").json()
+    assert (dashboard["total_attendance"], dashboard["present"], dashboard["absent"]) == (1, 1, 0)
+
+
+def test_rebuild_backfills_from_attendance(client, make_employee, db):
+    make_employee("EMP001")
+    client.post("/api/attendance/", json={"employee_id": "EMP001", "date": "2026-02-02", "status": "Present"})
+    db.query(rollups.AttendanceDailyRollup).delete()
+    db.commit()
+    assert rollups.find_mismatches(db)
+
+    rollups.rebuild(db)
+
+    assert rollups.find_mismatches(db) == []
@@ -0,0 +1,53 @@
+"""
+Tests that single-statement writes keep their 404/409 semantics, now that they come
+from constraint violations instead of lookups before the INSERT
+"""
+import re
+
+EMPLOYEE = {"employee_id": "EMP001", "full_name": "Jane Doe", "email": "jane@example.com", "department": "Sales"}
+MARK = {"employee_id": "EMP001", "date": "2026-02-06", "status": "Present"}
+
+
+def _queries(response):
+    return int(re.search(r'desc="(\d+) queries"', response.headers["server-timing"]).group(1))
+
+
+def test_create_employee_is_one_statement_and_maps_each_unique_index(client):
+    created = client.post("/api/employees/", json=EMPLOYEE)
+    assert created.status_code == 201
+    assert created.json() == {"id": created.json()["id"], **EMPLOYEE}
+    assert _queries(created) == 1
+
+    duplicate_id = client.post("/api/employees/", json={**EMPLOYEE, "email": "other@example.com"})
+    assert (duplicate_id.status_code, duplicate_id.json()["detail"]) == (409, "Employee ID 'EMP001' already exists")
+
+    duplicate_email = client.post("/api/employees/", json={**EMPLOYEE, "employee_id": "EMP002"})
+    assert (duplicate_email.status_code, duplicate_email.json()["detail"]) == (
+        409, "Email 'jane@example.com' already exists"
+    )
+
+    # The failed inserts left nothing behind
+    assert client.get("/api/employees/").json()["total"] == 1
+    assert client.get("/api/employees/EMP001").json()["full_name"] == "Jane Doe"
+
+
+def test_mark_attendance_maps_foreign_key_and_unique_violations(client):
+    unknown = client.post("/api/attendance/", json=MARK)
+    assert (unknown.status_code, unknown.json()["detail"]) == (404, "Employee with ID 'EMP001' not found")
+
+    client.post("/api/employees/", json=EMPLOYEE)
+    marked = client.post("/api/attendance/", json=MARK)
+    assert marked.status_code == 201
+    assert marked.json() == {"id": marked.json()["id"], **MARK}
+    # The attendance INSERT plus the daily and monthly rollup upserts
+    assert _queries(marked) == 3
+
+    duplicate = client.post("/api/attendance/", json={**MARK, "status": "Absent"})
+    assert (duplicate.status_code, duplicate.json()["detail"]) == (
+        409, "Attendance record already exists for employee 'EMP001' on 2026-02-06"
+    )
+
+    # Rollups only counted the record that was written
+    summary = client.get("/api/dashboard/summary").json()
+    assert (summary["total_attendance"], summary["present"], summary["absent"]) == (1, 1, 0)
+    assert client.get("/api/attendance/employee/EMP001/summary").json()["present"] == 1
@@ -32,6 +32,15 @@ function getDefaultApiUrl(env) {
 export const API_URL = API_BASE_URL.endsWith('/') ? API_BASE_URL.slice(0, -1) : API_BASE_URL;
 export const APP_ENVIRONMENT = ENVIRONMENT;
 
+/**
+ * fetch() for API requests. Sends cookies even when the API is on another origin,
+ * so the backend's read-your-writes cookie comes back after a write.
+ * @param {string} url - Request URL
+ * @param {RequestInit} options - fetch options
+ * @returns {Promise<Response>}
+ */
+export const apiFetch = (url, options = {}) => fetch(url, { credentials: 'include', ...options });
+
 // API Endpoints
 export const API_ENDPOINTS = {
   employees: {
@@ -1,9 +1,14 @@
 import React, { useState, useEffect } from 'react'
-import { API_URL } from '../config'
+import { API_URL, apiFetch } from '../config'
+
+const EMPLOYEE_PAGE_SIZE = 50
 
 export default function Attendance() {
   const [employees, setEmployees] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
+  const [employeeSearch, setEmployeeSearch] = useState('')
   const [selectedEmployee, setSelectedEmployee] = useState('')
+  const [selectedName, setSelectedName] = useState('')
   const [attendanceRecords, setAttendanceRecords] = useState([])
   const [summary, setSummary] = useState(null)
   const [loading, setLoading] = useState(false)
@@ -25,9 +30,11 @@ export default function Attendance() {
     }
   }, [message])
 
+  // Search by name once typing pauses
   useEffect(() => {
-    fetchEmployees()
-  }, [])
+    const timer = setTimeout(() => fetchEmployees(employeeSearch.trim()), 300)
+    return () => clearTimeout(timer)
+  }, [employeeSearch])
 
   useEffect(() => {
     if (selectedEmployee) {
@@ -36,12 +43,21 @@ export default function Attendance() {
     }
   }, [selectedEmployee])
 
-  const fetchEmployees = async () => {
+  const fetchEmployees = async (search, cursor = null) => {
     try {
-      const response = await fetch(`${API_URL}/api/employees/`)
+      // The dropdown only needs ids and names; skip the count query and load a page at a time
+      const params = new URLSearchParams({
+        fields: 'employee_id,full_name',
+        include_total: 'false',
+        limit: String(EMPLOYEE_PAGE_SIZE)
+      })
+      if (search) params.append('name_prefix', search)
+      if (cursor) params.append('cursor', cursor)
+      const response = await apiFetch(`${API_URL}/api/employees/?${params.toString()}`)
       if (!response.ok) throw new Error('Failed to fetch employees')
       const data = await response.json()
-      setEmployees(data.employees)
+      setEmployees(prev => (cursor ? prev.concat(data.employees) : data.employees))
+      setNextCursor(data.next_cursor)
     } catch (error) {
       setMessage({ type: 'error', text: error.message })
     }
@@ -49,7 +65,7 @@ export default function Attendance() {
 
   const fetchSummary = async (employeeId) => {
     try {
-      const response = await fetch(`${API_URL}/api/attendance/employee/${employeeId}/summary`)
+      const response = await apiFetch(`${API_URL}/api/attendance/employee/${employeeId}/summary`)
       if (!response.ok) throw new Error('Failed to fetch summary')
       const data = await response.json()
       setSummary(data)
@@ -67,7 +83,7 @@ export default function Attendance() {
       if (endDate) params.append('end_date', endDate)
       if (params.toString()) url += '?' + params.toString()
 
-      const response = await fetch(url)
+      const response = await apiFetch(url)
       if (!response.ok) throw new Error('Failed to fetch attendance records')
       const data = await response.json()
       setAttendanceRecords(data.records)
@@ -87,6 +103,8 @@ export default function Attendance() {
   const handleEmployeeChange = (e) => {
     const employeeId = e.target.value
     setSelectedEmployee(employeeId)
+    // Kept apart from the list, which changes as the search does
+    setSelectedName(employees.find(emp => emp.employee_id === employeeId)?.full_name || '')
     setFormData(prev => ({ ...prev, employee_id: employeeId }))
     setFilterStartDate('')
     setFilterEndDate('')
@@ -119,7 +137,7 @@ export default function Attendance() {
 
     setLoading(true)
     try {
-      const response = await fetch(`${API_URL}/api/attendance/`, {
+      const response = await apiFetch(`${API_URL}/api/attendance/`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
@@ -170,6 +188,15 @@ export default function Attendance() {
           <div className="form-row">
             <div className="form-group">
               <label className="form-label" htmlFor="employeeId">Select Employee</label>
+              <input
+                type="search"
+                className="form-input"
+                placeholder="Search by name..."
+                aria-label="Search employees by name"
+                value={employeeSearch}
+                onChange={(e) => setEmployeeSearch(e.target.value)}
+                onKeyDown={(e) => e.key === 'Enter' && e.preventDefault()}
+              />
               <select
                 id="employeeId"
                 name="employeeId"
@@ -179,12 +206,24 @@ export default function Attendance() {
                 required
               >
                 <option value="">-- Choose an employee --</option>
+                {selectedEmployee && !employees.some(emp => emp.employee_id === selectedEmployee) && (
+                  <option value={selectedEmployee}>{selectedName} ({selectedEmployee})</option>
+                )}
                 {employees.map(emp => (
                   <option key={emp.employee_id} value={emp.employee_id}>
                     {emp.full_name} ({emp.employee_id})
                   </option>
                 ))}
               </select>
+              {nextCursor && (
+                <button
+                  type="button"
+                  className="btn-secondary"
+                  onClick={() => fetchEmployees(employeeSearch.trim(), nextCursor)}
+                >
+                  Load more employees
+                </button>
+              )}
             </div>
             <div className="form-group">
               <label className="form-label" htmlFor="date">Date</label>
@@ -229,7 +268,7 @@ export default function Attendance() {
           {summary && (
             <div className="attendance-summary">
               <h3 className="section-title" style={{ marginBottom: '1rem' }}>
-                📊 Attendance Summary for {employees.find(e => e.employee_id === selectedEmployee)?.full_name}
+                📊 Attendance Summary for {selectedName}
               </h3>
               <div className="summary-cards">
                 <div className="summary-card present-card">
@@ -1,5 +1,20 @@
 import React, { useState, useEffect } from 'react'
-import { API_URL } from '../config'
+import { API_URL, apiFetch } from '../config'
+
+// Merge a delta event into the summary; departments with a null count were removed
+function applyDelta(dashboard, delta) {
+  const { employees_by_department: departments, ...fields } = delta
+  const next = { ...dashboard, ...fields }
+  if (departments) {
+    const merged = { ...dashboard.employees_by_department }
+    for (const [dept, count] of Object.entries(departments)) {
+      if (count === null) delete merged[dept]
+      else merged[dept] = count
+    }
+    next.employees_by_department = merged
+  }
+  return next
+}
 
 export default function Dashboard() {
   const [dashboard, setDashboard] = useState(null)
@@ -7,14 +22,36 @@ export default function Dashboard() {
   const [error, setError] = useState(null)
 
   useEffect(() => {
-    fetchDashboard()
+    if (typeof EventSource === 'undefined') {
+      fetchDashboard()
+      return
+    }
+    // The server sends the whole summary, then only what changed after each write;
+    // EventSource reconnects on its own and gets a fresh snapshot
+    setLoading(true)
+    const stream = new EventSource(`${API_URL}/api/dashboard/stream`, { withCredentials: true })
+    stream.addEventListener('snapshot', (event) => {
+      setDashboard(JSON.parse(event.data))
+      setError(null)
+      setLoading(false)
+    })
+    stream.addEventListener('delta', (event) => {
+      setDashboard((current) => applyDelta(current, JSON.parse(event.data)))
+    })
+    stream.onerror = () => {
+      if (stream.readyState === EventSource.CLOSED) {
+        setError('Lost connection to the dashboard stream')
+        setLoading(false)
+      }
+    }
+    return () => stream.close()
   }, [])
 
   const fetchDashboard = async () => {
     setLoading(true)
     setError(null)
     try {
-      const response = await fetch(`${API_URL}/api/dashboard/summary`)
+      const response = await apiFetch(`${API_URL}/api/dashboard/summary`)
       if (!response.ok) throw new Error('Failed to fetch dashboard summary')
       const data = await response.json()
       setDashboard(data)
@@ -1,8 +1,10 @@
 import React, { useState, useEffect } from 'react'
-import { API_URL } from '../config'
+import { API_URL, apiFetch } from '../config'
 
 export default function Employees() {
   const [employees, setEmployees] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
+  const [totalEmployees, setTotalEmployees] = useState(0)
   const [loading, setLoading] = useState(false)
   const [message, setMessage] = useState(null)
   const [showForm, setShowForm] = useState(false)
@@ -25,13 +27,18 @@ export default function Employees() {
     }
   }, [message])
 
-  const fetchEmployees = async () => {
+  const fetchEmployees = async (cursor = null) => {
     setLoading(true)
     try {
-      const response = await fetch(`${API_URL}/api/employees/`)
+      const url = cursor
+        ? `${API_URL}/api/employees/?cursor=${cursor}&include_total=false`
+        : `${API_URL}/api/employees/`
+      const response = await apiFetch(url)
       if (!response.ok) throw new Error('Failed to fetch employees')
       const data = await response.json()
-      setEmployees(data.employees)
+      setEmployees(prev => (cursor ? prev.concat(data.employees) : data.employees))
+      if (!cursor) setTotalEmployees(data.total)
+      setNextCursor(data.next_cursor)
     } catch (error) {
       setMessage({ type: 'error', text: error.message })
     } finally {
@@ -49,7 +56,7 @@ export default function Employees() {
     setLoading(true)
 
     try {
-      const response = await fetch(`${API_URL}/api/employees/`, {
+      const response = await apiFetch(`${API_URL}/api/employees/`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(formData)
@@ -76,7 +83,7 @@ export default function Employees() {
 
     setLoading(true)
     try {
-      const response = await fetch(`${API_URL}/api/employees/${employeeId}`, {
+      const response = await apiFetch(`${API_URL}/api/employees/${employeeId}`, {
         method: 'DELETE'
       })
 
@@ -222,6 +229,11 @@ export default function Employees() {
               ))}
             </tbody>
           </table>
+          {nextCursor && (
+            <button className="btn-secondary" onClick={() => fetchEmployees(nextCursor)} disabled={loading}>
+              Load more ({employees.length} of {totalEmployees})
+            </button>
+          )}
         </div>
       )}
     </div>